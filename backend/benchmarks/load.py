@@ -0,0 +1,216 @@
+"""Load benchmark that drives the FastAPI app in-process
+
+Tasks are submitted over HTTP at a fixed rate (open loop) against the
+offline fake LLM backend, and each task is followed through its SSE
+event stream until the final result. The run reports throughput,
+end-to-end latency percentiles, memory growth and event-loop lag, and
+compares them with the stored baseline.
+
+Run from backend/:
+
+    uv run python -m benchmarks.load                     # compare to baseline
+    uv run python -m benchmarks.load --rps 50 --duration 60
+    uv run python -m benchmarks.load --update-baseline
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+# Offline, unthrottled defaults; variables already set in the environment win
+BENCHMARK_ENV = {
+    "LLM_BACKEND": "fake",
+    "FAKE_LLM_LATENCY": "lognormal",
+    "FAKE_LLM_LATENCY_MEAN": "0.05",
+    "LLM_REQUESTS_PER_MINUTE": "0",
+    "LLM_TOKENS_PER_MINUTE": "0",
+    "LLM_CACHE_ENABLED": "false",
+    "SEMANTIC_CACHE_ENABLED": "false",
+    "TASK_STORE_BACKEND": "memory",
+    "CHECKPOINT_BACKEND": "memory",
+    "LOG_LEVEL": "WARNING",
+}
+
+# Allowed relative change before a metric counts as a regression
+TOLERANCES = {
+    "throughput": 0.15,
+    "latency_p50": 0.25,
+    "latency_p95": 0.30,
+    "latency_p99": 0.40,
+    "loop_lag_p99": 1.0,
+}
+HIGHER_IS_BETTER = {"throughput"}
+
+PROMPTS = (
+    "Summarize the benefits of unit testing in one paragraph ({i})",
+    "Research three caching strategies, then compare them for a web API ({i})",
+    "Translate 'good morning' into French ({i})",
+    "Outline the steps to migrate a service to a new database ({i})",
+)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of a list (0-1)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up a periodic sleeper"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started - self.interval))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
+async def run_benchmark(rps: float, duration: float, seed: int = 0) -> Dict[str, Any]:
+    """Run the load against a freshly started app and collect results"""
+    for key, value in BENCHMARK_ENV.items():
+        os.environ.setdefault(key, value)
+    os.environ.setdefault("FAKE_LLM_SEED", str(seed))
+
+    import httpx
+
+    from src.main import app
+    from src.services.retention import get_process_memory
+
+    latencies: List[float] = []
+    outcomes = {"completed": 0, "failed": 0, "rejected": 0}
+
+    async def run_task(client: httpx.AsyncClient, i: int):
+        prompt = PROMPTS[i % len(PROMPTS)].format(i=i)
+        started = time.perf_counter()
+        response = await client.post("/api/v1/tasks", json={"prompt": prompt})
+        if response.status_code == 429:
+            outcomes["rejected"] += 1
+            return
+        response.raise_for_status()
+        task_id = response.json()["id"]
+        # The event stream ends with the task's result event
+        events = await client.get(f"/api/v1/tasks/{task_id}/events")
+        status = None
+        for line in events.text.splitlines():
+            if line.startswith("data:"):
+                data = json.loads(line[5:])
+                status = data.get("status", status)
+        if status == "completed":
+            latencies.append(time.perf_counter() - started)
+            outcomes["completed"] += 1
+        else:
+            outcomes["failed"] += 1
+
+    memory_before = get_process_memory()["rss_bytes"] or 0
+    monitor = LoopLagMonitor()
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://benchmark", timeout=None
+        ) as client:
+            monitor.start()
+            total = int(rps * duration)
+            started = time.perf_counter()
+            running = []
+            for i in range(total):
+                delay = started + i / rps - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                running.append(asyncio.create_task(run_task(client, i)))
+            await asyncio.gather(*running)
+            elapsed = time.perf_counter() - started
+            await monitor.stop()
+    memory_after = get_process_memory()["rss_bytes"] or 0
+
+    return {
+        "config": {"rps": rps, "duration": duration, "seed": seed},
+        "tasks": total,
+        **outcomes,
+        "throughput": outcomes["completed"] / elapsed if elapsed else 0.0,
+        "latency_p50": percentile(latencies, 0.50),
+        "latency_p95": percentile(latencies, 0.95),
+        "latency_p99": percentile(latencies, 0.99),
+        "loop_lag_p99": percentile(monitor.samples, 0.99),
+        "loop_lag_max": max(monitor.samples, default=0.0),
+        "rss_growth_mb": (memory_after - memory_before) / (1024 * 1024),
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Describe every metric that is worse than the baseline beyond tolerance"""
+    regressions = []
+    for metric, tolerance in TOLERANCES.items():
+        expected = baseline.get(metric)
+        actual = results.get(metric)
+        if not expected or actual is None:
+            continue
+        change = (actual - expected) / expected
+        if metric in HIGHER_IS_BETTER:
+            change = -change
+        if change > tolerance:
+            regressions.append(
+                f"{metric}: {actual:.4f} vs baseline {expected:.4f} "
+                f"({change:+.0%}, tolerance {tolerance:.0%})"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rps", type=float, default=20.0, help="tasks per second")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="store this run as the new baseline",
+    )
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run_benchmark(args.rps, args.duration, args.seed))
+    print(json.dumps(results, indent=2))
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print("No baseline to compare against, run with --update-baseline")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("config") != results["config"]:
+        print(f"Baseline was recorded with {baseline.get('config')}, not comparable")
+        return 0
+    regressions = compare(results, baseline)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print("No regressions against the baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
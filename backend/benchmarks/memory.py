@@ -0,0 +1,147 @@
+"""Memory benchmark for the in-memory task store
+
+Fills the store with finished tasks shaped like real ones (planning and
+execution steps, a plan and an output of configurable size) and reports
+the bytes held per task, measured with tracemalloc. The same tasks are
+also held the way the store kept them before slotted records: Pydantic
+TaskResult and StepLog models, with the running and completed records of
+each step kept side by side as the store appended them.
+
+Run from backend/:
+
+    uv run python -m benchmarks.memory
+    uv run python -m benchmarks.memory --tasks 5000 --output-chars 8000
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import random
+import sys
+import tracemalloc
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from src.integrations.fake_llm import WORDS
+from src.schemas.step import StepLog, StepStatus
+from src.schemas.task import TaskResult, TaskStatus
+from src.storage.task_store import TaskStore
+
+
+def make_text(rng: random.Random, chars: int) -> str:
+    """Word salad of about `chars` characters"""
+    words = []
+    size = 0
+    while size < chars:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)
+
+
+def make_steps(task_id: str, plan: str) -> List[StepLog]:
+    now = datetime.utcnow()
+    steps = []
+    for name, message in (("Planning", plan), ("Execution", "Task executed")):
+        for status in (StepStatus.RUNNING, StepStatus.COMPLETED):
+            steps.append(
+                StepLog(
+                    id=f"{task_id}_{name.lower()}",
+                    task_id=task_id,
+                    step_name=name,
+                    status=status,
+                    message=message if status == StepStatus.COMPLETED else name,
+                    details={"prompt_tokens": 120, "completion_tokens": 300},
+                    started_at=now,
+                    completed_at=now if status == StepStatus.COMPLETED else None,
+                )
+            )
+    return steps
+
+
+def make_tasks(count: int, output_chars: int, seed: int) -> Iterator[Dict[str, str]]:
+    """Task contents, generated fresh so each layout owns its strings"""
+    rng = random.Random(seed)
+    for i in range(count):
+        yield {
+            "id": f"task-{i:08d}",
+            "plan": make_text(rng, output_chars // 4),
+            "output": make_text(rng, output_chars),
+        }
+
+
+async def fill_store(tasks: Iterable[Dict[str, str]]) -> TaskStore:
+    store = TaskStore()
+    for task in tasks:
+        await store.create_task(task["id"], None)
+        for step in make_steps(task["id"], task["plan"]):
+            await store.add_step(task["id"], step)
+        await store.update_task_status(
+            task["id"],
+            TaskStatus.COMPLETED,
+            output=task["output"],
+            metadata={"route": "plan", "tokens": {"total_tokens": 840}},
+            completed_at=datetime.utcnow(),
+        )
+    return store
+
+
+def fill_models(tasks: Iterable[Dict[str, str]]) -> Dict[str, Any]:
+    """The same tasks held as Pydantic models"""
+    results = {}
+    steps = {}
+    for task in tasks:
+        results[task["id"]] = TaskResult(
+            id=task["id"],
+            status=TaskStatus.COMPLETED,
+            output=task["output"],
+            metadata={"route": "plan", "tokens": {"total_tokens": 840}},
+            started_at=datetime.utcnow(),
+            completed_at=datetime.utcnow(),
+        )
+        steps[task["id"]] = make_steps(task["id"], task["plan"])
+    return {"tasks": results, "steps": steps}
+
+
+def measure(build) -> int:
+    """Bytes still allocated by what `build()` returns"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return after - before
+
+
+def run_benchmark(tasks: int, output_chars: int, seed: int = 0) -> Dict[str, Any]:
+    """Bytes per task for Pydantic models and for the task store"""
+    models = measure(lambda: fill_models(make_tasks(tasks, output_chars, seed)))
+    store = measure(
+        lambda: asyncio.run(fill_store(make_tasks(tasks, output_chars, seed)))
+    )
+    return {
+        "config": {"tasks": tasks, "output_chars": output_chars, "seed": seed},
+        "pydantic_bytes_per_task": models // tasks,
+        "store_bytes_per_task": store // tasks,
+        "reduction": 1 - store / models if models else 0.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--output-chars", type=int, default=6000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.tasks, args.output_chars, args.seed)
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import re
+from typing import Any, Dict, Optional
+
+from ..core.config import settings
+from ..utils.tokens import count_tokens
+
+# Routes through the workflow
+DIRECT = "direct"  # execute only
+PLANNED = "plan"  # plan, then execute
+FULL = "full"  # plan, execute, then reflect inline
+ROUTES = (DIRECT, PLANNED, FULL)
+
+# Wording that suggests a multi-step task worth planning
+MULTI_STEP_PATTERN = re.compile(
+    r"\b(steps?|plan|first|then|finally|compare|analy[sz]e|design|outline|"
+    r"research|evaluate|strategy|architecture)\b"
+    r"|\n\s*(\d+[.)]|[-*])\s",
+    re.IGNORECASE,
+)
+
+
+class TaskRouter:
+    """Chooses a route through the workflow from cheap local signals
+
+    An explicit `options.route` wins, except that the full route becomes
+    the planned one when reflection is off. Otherwise short prompts
+    without multi-step wording skip planning, and inline reflection
+    means the full route. Per-route counts and latencies are kept, along
+    with the average planning latency, which is what a direct route
+    saves.
+    """
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {route: 0 for route in ROUTES}
+        self.latency: Dict[str, float] = {route: 0.0 for route in ROUTES}
+        self.plan_calls = 0
+        self.plan_latency = 0.0
+
+    def choose(self, state: Dict[str, Any]) -> str:
+        """Pick the route for a task without calling the LLM"""
+        requested = state.get("options", {}).get("route")
+        if requested == FULL and state.get("reflection_mode") == "off":
+            # Reflection was turned off or sampled out, so plan and execute only
+            return PLANNED
+        if requested in ROUTES:
+            return requested
+        if not settings.ROUTER_ENABLED or state.get("plan"):
+            needs_plan = True
+        else:
+            needs_plan = self.needs_plan(state["prompt"], state.get("model"))
+        if not needs_plan:
+            return DIRECT
+        return FULL if state.get("reflection_mode") == "inline" else PLANNED
+
+    @staticmethod
+    def needs_plan(prompt: str, model: Optional[str] = None) -> bool:
+        """Whether a prompt looks long or structured enough to plan"""
+        if MULTI_STEP_PATTERN.search(prompt):
+            return True
+        return count_tokens(prompt, model) > settings.ROUTER_DIRECT_MAX_TOKENS
+
+    def record(self, route: str, seconds: float):
+        """Count a finished workflow run on a route"""
+        self.counts[route] += 1
+        self.latency[route] += seconds
+
+    def record_plan(self, seconds: float):
+        """Record how long a planning LLM call took"""
+        self.plan_calls += 1
+        self.plan_latency += seconds
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get per-route counts, average latency and estimated time saved"""
+        average_plan = self.plan_latency / self.plan_calls if self.plan_calls else 0
+        return {
+            "routes": {
+                route: {
+                    "count": self.counts[route],
+                    "average_latency": (
+                        self.latency[route] / self.counts[route]
+                        if self.counts[route]
+                        else 0
+                    ),
+                }
+                for route in ROUTES
+            },
+            "average_plan_latency": average_plan,
+            "saved_seconds": self.counts[DIRECT] * average_plan,
+        }
@@ -0,0 +1,21 @@
+from typing import Any, Dict, List, Optional, TypedDict
+
+
+class TaskState(TypedDict, total=False):
+    """State passed between the nodes of the task workflow"""
+
+    task_id: str
+    prompt: str
+    model: Optional[str]
+    temperature: Optional[float]
+    max_tokens: Optional[int]
+    system_prompt: Optional[str]
+    options: Dict[str, Any]
+    steps: List[Any]
+    plan: Optional[str]
+    output: Optional[str]
+    reflection: Optional[str]
+    reflection_mode: str
+    route: str
+    usage: Dict[str, Dict[str, Any]]
+    error: Optional[str]
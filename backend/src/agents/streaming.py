@@ -0,0 +1,64 @@
+import time
+from typing import Awaitable, Callable, List, Optional
+
+from ..core.config import settings
+
+FlushCallback = Callable[[str, int], Awaitable[None]]
+
+
+class StreamInterrupted(Exception):
+    """A stream failed after part of its output was published"""
+
+
+class OutputBuffer:
+    """Coalesces streamed LLM chunks into fewer, larger writes
+
+    Chunks are held until `max_chars` have accumulated or `interval`
+    seconds have passed since the last flush, then handed to the flush
+    callback together with the offset of the text in the full output.
+    """
+
+    def __init__(
+        self,
+        on_flush: FlushCallback,
+        interval: Optional[float] = None,
+        max_chars: Optional[int] = None,
+    ):
+        self.on_flush = on_flush
+        self.interval = (
+            interval if interval is not None else settings.STREAM_FLUSH_INTERVAL
+        )
+        self.max_chars = max_chars or settings.STREAM_FLUSH_CHARS
+        self.chunks: List[str] = []
+        self.pending_chars = 0
+        self.offset = 0
+        self.last_flush = time.monotonic()
+        self.parts: List[str] = []
+
+    async def append(self, text: str):
+        """Add a chunk, flushing if the buffer is due"""
+        if not text:
+            return
+        self.chunks.append(text)
+        self.parts.append(text)
+        self.pending_chars += len(text)
+        due = time.monotonic() - self.last_flush >= self.interval
+        if self.pending_chars >= self.max_chars or due:
+            await self.flush()
+
+    async def flush(self):
+        """Hand buffered text to the callback"""
+        self.last_flush = time.monotonic()
+        if not self.chunks:
+            return
+        text = "".join(self.chunks)
+        offset = self.offset
+        self.chunks = []
+        self.pending_chars = 0
+        self.offset += len(text)
+        await self.on_flush(text, offset)
+
+    @property
+    def text(self) -> str:
+        """Everything appended so far"""
+        return "".join(self.parts)
@@ -1,14 +1,39 @@
+import asyncio
 import logging
+import random
+import time
 from datetime import datetime
-from typing import Dict, Any, List
-from langchain_openai import ChatOpenAI
+from functools import partial
+from typing import Dict, Any, List, Optional
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
 
 from ..schemas.task import TaskRequest, TaskStatus
 from ..schemas.step import StepLog, StepStatus
-from ..storage.task_store import TaskStore
+from ..storage.base import BaseTaskStore
+from ..services.event_hub import EventHub
+from .router import DIRECT, FULL, TaskRouter
+from .state import TaskState
+from .streaming import OutputBuffer, StreamInterrupted
 from ..core.config import settings
+from ..core.deadlines import DeadlinePolicy, make_deadline, node_timeout
+from ..core.llm_cache import LLMCache, make_cache_key
+from ..core.logging import log_context
+from ..core.metrics import LLM_CALL_DURATION, LLM_IN_FLIGHT, LLM_TOKENS, NODE_DURATION
+from ..core.rate_limiter import LLMGovernor
+from ..core.tracing import span
+from ..db.checkpointer import SQLiteCheckpointer
+from ..integrations.llm_clients import LLMClientRegistry
+from ..integrations.semantic_cache import SemanticCache, SemanticMatch
+from ..utils.tokens import (
+    TokenUsage,
+    completion_limit,
+    count_tokens,
+    get_encoding,
+    trim_to_tokens,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -16,22 +41,70 @@ logger = logging.getLogger(__name__)
 class TaskExecutor:
     """LangGraph-based task executor"""
 
-    def __init__(self):
-        self.llm = None
-        self.task_store = TaskStore()
-        self.memory = MemorySaver()
+    def __init__(self, task_store: BaseTaskStore, event_hub: EventHub):
+        self.llm_clients = LLMClientRegistry()
+        self.task_store = task_store
+        self.event_hub = event_hub
+        self.memory = self._create_checkpointer()
         self.workflow = None
+        self.router = TaskRouter()
+        self.deadlines = DeadlinePolicy()
+        self.governor = LLMGovernor()
+        self.token_usage = TokenUsage()
+        # task_id -> step id -> start time of steps still running
+        self.step_starts: Dict[str, Dict[str, datetime]] = {}
+        self.llm_cache = LLMCache() if settings.LLM_CACHE_ENABLED else None
+        self.semantic_cache = (
+            SemanticCache() if settings.SEMANTIC_CACHE_ENABLED else None
+        )
 
-    def _get_llm(self):
-        """Lazy initialization of LLM"""
-        if self.llm is None:
-            self.llm = ChatOpenAI(
-                model=settings.OPENAI_MODEL,
-                temperature=settings.OPENAI_TEMPERATURE,
-                max_tokens=settings.OPENAI_MAX_TOKENS,
-                api_key=settings.OPENAI_API_KEY,
-            )
-        return self.llm
+    @staticmethod
+    def _create_checkpointer() -> MemorySaver:
+        """Checkpointer for graph state, durable when configured"""
+        if settings.CHECKPOINT_BACKEND == "sqlite":
+            return SQLiteCheckpointer()
+        return MemorySaver()
+
+    async def start(self):
+        """Load persisted graph checkpoints and the token encodings"""
+        if isinstance(self.memory, SQLiteCheckpointer):
+            await self.memory.start()
+        # Loading may download the encoding, so keep it off the event loop
+        await asyncio.to_thread(get_encoding)
+        await asyncio.to_thread(get_encoding, settings.OPENAI_MODEL)
+
+    async def close(self):
+        """Release executor resources"""
+        if isinstance(self.memory, SQLiteCheckpointer):
+            await self.memory.close()
+        if self.llm_cache is not None:
+            self.llm_cache.close()
+        if self.semantic_cache is not None:
+            await self.semantic_cache.close()
+        await self.llm_clients.close()
+
+    async def release(self, task_id: str):
+        """Drop the checkpoints of a finished task's graph thread"""
+        self.discard_steps(task_id)
+        await self.memory.adelete_thread(task_id)
+
+    def discard_steps(self, task_id: str):
+        """Forget the start times of a task's unfinished steps"""
+        self.step_starts.pop(task_id, None)
+
+    def checkpoint_threads(self) -> int:
+        """Number of graph threads with stored checkpoints"""
+        return len(self.memory.storage)
+
+    def _get_llm(self, state: Dict[str, Any]):
+        """Get the model client matching the task's settings
+
+        Calls pass their own, possibly clipped, max_tokens, so every node
+        of a task shares one client.
+        """
+        return self.llm_clients.get(
+            state.get("model"), state.get("temperature"), state.get("max_tokens")
+        )
 
     def _get_workflow(self):
         """Lazy initialization of workflow"""
@@ -41,36 +114,69 @@ class TaskExecutor:
 
     def _build_workflow(self) -> StateGraph:
         """Build the LangGraph workflow"""
-        workflow = StateGraph(StateType=Dict)
+        workflow = StateGraph(TaskState)
 
         # Add nodes
-        workflow.add_node("plan", self._plan_task)
-        workflow.add_node("execute", self._execute_task)
-        workflow.add_node("reflect", self._reflect_task)
+        workflow.add_node("plan", self._instrument("plan", self._plan_task))
+        workflow.add_node("execute", self._instrument("execute", self._execute_task))
+        workflow.add_node("reflect", self._instrument("reflect", self._reflect_task))
 
         # Add edges
-        workflow.set_entry_point("plan")
+        workflow.set_conditional_entry_point(
+            self._route_entry, {"plan": "plan", "execute": "execute"}
+        )
         workflow.add_edge("plan", "execute")
-        workflow.add_edge("execute", "reflect")
+        workflow.add_conditional_edges(
+            "execute", self._route_after_execute, {"reflect": "reflect", END: END}
+        )
         workflow.add_edge("reflect", END)
 
         return workflow.compile(checkpointer=self.memory)
 
+    @staticmethod
+    def _instrument(name: str, node):
+        """Wrap a node with a trace span, log context and a latency histogram"""
+        duration = NODE_DURATION.labels(name)
+
+        async def run(state: TaskState, config: RunnableConfig) -> Dict[str, Any]:
+            with span(f"workflow.{name}", {"task.id": state.get("task_id")}):
+                with log_context(node=name):
+                    started = time.perf_counter()
+                    try:
+                        return await node(state, config)
+                    finally:
+                        duration.observe(time.perf_counter() - started)
+
+        return run
+
     async def execute(self, task_id: str, task_request: TaskRequest) -> Dict[str, Any]:
         """Execute a task using the LangGraph workflow"""
         try:
+            # The deadline travels in the run config rather than the
+            # checkpointed state, so a resumed task gets a fresh budget
+            deadline = make_deadline(self._task_budget(task_request.options or {}))
+            config = {"configurable": {"thread_id": task_id, "deadline": deadline}}
+            workflow = self._get_workflow()
+            snapshot = await workflow.aget_state(config)
+            if snapshot.next:
+                # Interrupted before finishing: continue after the last
+                # completed node instead of starting over
+                await self._add_step(
+                    task_id,
+                    "Task Resumed",
+                    StepStatus.COMPLETED,
+                    f"Resuming at {', '.join(snapshot.next)}",
+                )
+                started = time.monotonic()
+                result = await workflow.ainvoke(None, config)
+                self.router.record(
+                    result.get("route", FULL), time.monotonic() - started
+                )
+                return self._build_result(task_request, result)
+
             # Initialize state
-            state = {
-                "task_id": task_id,
-                "prompt": task_request.prompt,
-                "model": task_request.model,
-                "temperature": task_request.temperature,
-                "max_tokens": task_request.max_tokens,
-                "system_prompt": task_request.system_prompt,
-                "steps": [],
-                "output": None,
-                "error": None,
-            }
+            state = self._initial_state(task_id, task_request)
+            state["reflection_mode"] = self._choose_reflection_mode(state)
 
             # Add initial step
             await self._add_step(
@@ -80,30 +186,203 @@ class TaskExecutor:
                 "Task execution started",
             )
 
+            match = await self._semantic_lookup(state)
+            if match is not None and settings.SEMANTIC_CACHE_MODE == "output":
+                if match.output:
+                    await self._add_step(
+                        task_id,
+                        "Semantic Cache",
+                        StepStatus.COMPLETED,
+                        f"Reused output of task {match.task_id} "
+                        f"(similarity {match.similarity:.3f})",
+                    )
+                    return {
+                        "output": match.output,
+                        "metadata": {
+                            "steps": [],
+                            "model": task_request.model,
+                            "temperature": task_request.temperature,
+                            "semantic_cache": self._match_metadata(match),
+                        },
+                    }
+            if match is not None and match.plan:
+                state["plan"] = match.plan
+
+            state["route"] = self.router.choose(state)
+            if state["route"] == FULL:
+                state["reflection_mode"] = "inline"
+
             # Run the workflow
-            config = {"configurable": {"thread_id": task_id}}
-            workflow = self._get_workflow()
+            started = time.monotonic()
             result = await workflow.ainvoke(state, config)
+            self.router.record(state["route"], time.monotonic() - started)
 
-            return {
-                "output": result.get("output"),
-                "metadata": {
-                    "steps": result.get("steps", []),
-                    "model": task_request.model,
-                    "temperature": task_request.temperature,
-                },
-            }
+            if self._use_semantic_cache(state):
+                self.semantic_cache.add(
+                    task_id,
+                    task_request.prompt,
+                    self._semantic_context(state),
+                    result.get("plan"),
+                    result.get("output"),
+                    time.monotonic() - started,
+                )
+
+            return self._build_result(task_request, result, match)
 
         except Exception as e:
             logger.error(f"Error executing task {task_id}: {str(e)}")
             await self._add_step(task_id, "Task Execution", StepStatus.FAILED, str(e))
             raise
 
-    async def _plan_task(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    async def reflect(
+        self, task_id: str, task_request: TaskRequest, output: str
+    ) -> str:
+        """Reflect on a finished task outside the workflow"""
+        state = self._initial_state(task_id, task_request)
+        state["output"] = output
+        deadline = make_deadline(self._task_budget(state["options"]))
+        state = await self._reflect_task(
+            state, {"configurable": {"deadline": deadline}}
+        )
+        return state["reflection"]
+
+    def _initial_state(self, task_id: str, task_request: TaskRequest) -> TaskState:
+        return {
+            "task_id": task_id,
+            "prompt": task_request.prompt,
+            "model": task_request.model,
+            "temperature": task_request.temperature,
+            "max_tokens": task_request.max_tokens,
+            "system_prompt": task_request.system_prompt,
+            "options": task_request.options or {},
+            "steps": [],
+            "usage": {},
+            "output": None,
+            "error": None,
+        }
+
+    def _choose_reflection_mode(self, state: Dict[str, Any]) -> str:
+        """Pick inline, deferred or off from options, applying the sample rate"""
+        options = state.get("options", {})
+        mode = options.get("reflection", settings.REFLECTION_MODE)
+        if mode is False:
+            mode = "off"
+        if mode not in ("inline", "deferred", "off"):
+            mode = settings.REFLECTION_MODE
+        sample_rate = options.get(
+            "reflection_sample_rate", settings.REFLECTION_SAMPLE_RATE
+        )
+        if mode != "off" and random.random() >= sample_rate:
+            mode = "off"
+        return mode
+
+    def _task_budget(self, options: Dict[str, Any]) -> float:
+        """Seconds a task may run: options.timeout, capped by MAX_TASK_DURATION"""
+        timeout = options.get("timeout")
+        if isinstance(timeout, (int, float)) and timeout > 0:
+            return min(float(timeout), settings.MAX_TASK_DURATION)
+        return float(settings.MAX_TASK_DURATION)
+
+    def _node_timeout(
+        self, state: Dict[str, Any], node: str, config: Optional[RunnableConfig]
+    ) -> float:
+        """Timeout for a node's LLM call from the task's remaining budget"""
+        deadline = ((config or {}).get("configurable") or {}).get("deadline")
+        if deadline is None:
+            deadline = make_deadline(self._task_budget(state.get("options", {})))
+        following = {"plan": ["execute"], "execute": [], "reflect": []}[node]
+        if node != "reflect" and state.get("reflection_mode", "inline") == "inline":
+            following = following + ["reflect"]
+        return node_timeout(deadline, node, following)
+
+    def _use_hedging(self, state: Dict[str, Any]) -> bool:
+        """Whether slow LLM calls of this task may be duplicated"""
+        return bool(state.get("options", {}).get("hedge", settings.LLM_HEDGING_ENABLED))
+
+    def _route_entry(self, state: Dict[str, Any]) -> str:
+        """Skip planning on the direct route"""
+        return "execute" if state.get("route") == DIRECT else "plan"
+
+    def _route_after_execute(self, state: Dict[str, Any]) -> str:
+        """Reflect inside the workflow only in inline mode"""
+        if state.get("reflection_mode", "inline") == "inline":
+            return "reflect"
+        return END
+
+    def _build_result(
+        self,
+        task_request: TaskRequest,
+        result: Dict[str, Any],
+        match: Optional[SemanticMatch] = None,
+    ) -> Dict[str, Any]:
+        """Shape the final workflow state into the task result"""
+        metadata = {
+            "steps": result.get("steps", []),
+            "model": task_request.model,
+            "temperature": task_request.temperature,
+        }
+        if result.get("route"):
+            metadata["route"] = result["route"]
+        usage = result.get("usage") or {}
+        if usage:
+            metadata["tokens"] = {
+                key: sum(node[key] for node in usage.values())
+                for key in ("prompt_tokens", "completion_tokens")
+            }
+        mode = result.get("reflection_mode", "inline")
+        if mode == "deferred":
+            metadata["reflection_status"] = "pending"
+        elif result.get("reflection"):
+            metadata["reflection"] = result["reflection"]
+        if match is not None:
+            metadata["semantic_cache"] = self._match_metadata(match)
+        return {"output": result.get("output"), "metadata": metadata}
+
+    def _use_semantic_cache(self, state: Dict[str, Any]) -> bool:
+        """Whether this task may be served from or added to the semantic cache"""
+        return self.semantic_cache is not None and state.get("options", {}).get(
+            "semantic_cache", True
+        )
+
+    def _semantic_context(self, state: Dict[str, Any]) -> str:
+        """Key of the settings a semantic match has to share with the task"""
+        return make_cache_key(
+            state.get("model"),
+            state.get("temperature"),
+            state.get("max_tokens"),
+            state.get("system_prompt"),
+            "",
+        )
+
+    async def _semantic_lookup(self, state: Dict[str, Any]) -> Optional[SemanticMatch]:
+        """Look for a near-duplicate past task"""
+        if not self._use_semantic_cache(state):
+            return None
+        return await self.semantic_cache.lookup(
+            state["prompt"], self._semantic_context(state)
+        )
+
+    def _match_metadata(self, match: SemanticMatch) -> Dict[str, Any]:
+        return {
+            "task_id": match.task_id,
+            "similarity": match.similarity,
+            "mode": settings.SEMANTIC_CACHE_MODE,
+        }
+
+    async def _plan_task(
+        self, state: Dict[str, Any], config: Optional[RunnableConfig] = None
+    ) -> Dict[str, Any]:
         """Plan the task execution"""
         task_id = state["task_id"]
         prompt = state["prompt"]
 
+        if state.get("plan"):
+            # Seeded from a similar task by the semantic cache
+            await self._add_step(
+                task_id, "Planning", StepStatus.COMPLETED, state["plan"]
+            )
+            return state
+
         await self._add_step(
             task_id, "Planning", StepStatus.RUNNING, "Analyzing task requirements"
         )
@@ -118,11 +397,17 @@ class TaskExecutor:
             Provide a brief plan for executing this task.
             """
 
-            llm = self._get_llm()
-            response = await llm.ainvoke(plan_prompt)
-            plan = response.content
+            started = time.monotonic()
+            plan = await self._invoke_llm(state, plan_prompt, "plan", config)
+            self.router.record_plan(time.monotonic() - started)
 
-            await self._add_step(task_id, "Planning", StepStatus.COMPLETED, plan)
+            await self._add_step(
+                task_id,
+                "Planning",
+                StepStatus.COMPLETED,
+                plan,
+                details=state["usage"]["plan"],
+            )
 
             state["plan"] = plan
             return state
@@ -131,7 +416,9 @@ class TaskExecutor:
             await self._add_step(task_id, "Planning", StepStatus.FAILED, str(e))
             raise
 
-    async def _execute_task(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    async def _execute_task(
+        self, state: Dict[str, Any], config: Optional[RunnableConfig] = None
+    ) -> Dict[str, Any]:
         """Execute the planned task"""
         task_id = state["task_id"]
         prompt = state["prompt"]
@@ -140,22 +427,37 @@ class TaskExecutor:
         await self._add_step(task_id, "Execution", StepStatus.RUNNING, "Executing task")
 
         try:
-            # Execute the task
-            execution_prompt = f"""
+            # Execute the task; without a plan the prompt is sent as is
+            budgeted = trim_to_tokens(
+                plan, settings.TOKEN_PLAN_BUDGET, state.get("model")
+            )
+            if plan:
+                execution_prompt = f"""
             Based on the following plan, execute the task:
             
-            Plan: {plan}
+            Plan: {budgeted}
             Task: {prompt}
             
             Provide a detailed response that completes the task.
             """
-
-            llm = self._get_llm()
-            response = await llm.ainvoke(execution_prompt)
-            output = response.content
+            else:
+                execution_prompt = prompt
+
+            output = await self._invoke_llm(
+                state,
+                execution_prompt,
+                "execute",
+                config,
+                stream=self._should_stream(state),
+                trimmed=budgeted != plan,
+            )
 
             await self._add_step(
-                task_id, "Execution", StepStatus.COMPLETED, "Task executed successfully"
+                task_id,
+                "Execution",
+                StepStatus.COMPLETED,
+                "Task executed successfully",
+                details=state["usage"]["execute"],
             )
 
             state["output"] = output
@@ -165,10 +467,147 @@ class TaskExecutor:
             await self._add_step(task_id, "Execution", StepStatus.FAILED, str(e))
             raise
 
-    async def _reflect_task(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    def _should_stream(self, state: Dict[str, Any]) -> bool:
+        """Whether the execute node streams its output"""
+        return bool(state.get("options", {}).get("stream", settings.LLM_STREAMING))
+
+    def _use_cache(self, state: Dict[str, Any]) -> bool:
+        """Whether LLM responses for this task may come from the cache"""
+        return self.llm_cache is not None and state.get("options", {}).get(
+            "cache", True
+        )
+
+    async def _invoke_llm(
+        self,
+        state: Dict[str, Any],
+        prompt: str,
+        node: str,
+        config: Optional[RunnableConfig] = None,
+        stream: bool = False,
+        trimmed: bool = False,
+    ) -> str:
+        """Call the LLM for a node within its time and token budgets
+
+        Responses go through the cache, and the node's token counts are
+        recorded in `state["usage"]`.
+        """
+        task_id = state["task_id"]
+        model = state.get("model")
+        timeout = self._node_timeout(state, node, config)
+        messages = [HumanMessage(content=prompt)]
+        if state.get("system_prompt"):
+            messages.insert(0, SystemMessage(content=state["system_prompt"]))
+        prompt_tokens = sum(count_tokens(m.content, model) for m in messages)
+        max_tokens = completion_limit(prompt_tokens, state.get("max_tokens"), model)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": 0,
+            "max_tokens": max_tokens,
+            "trimmed": trimmed,
+            "cached": False,
+        }
+        state.setdefault("usage", {})[node] = usage
+
+        cache_key = None
+        if self._use_cache(state):
+            cache_key = make_cache_key(
+                state.get("model"),
+                state.get("temperature"),
+                state.get("max_tokens"),
+                state.get("system_prompt"),
+                prompt,
+            )
+            cached = await self.llm_cache.get(cache_key)
+            if cached is not None:
+                if stream:
+                    await self._publish_output(task_id, cached, 0)
+                usage["completion_tokens"] = count_tokens(cached, model)
+                usage["cached"] = True
+                self.token_usage.record(node, usage)
+                return cached
+
+        llm = self._get_llm(state)
+        if stream:
+            # Streamed output is published as it arrives, so it is never hedged
+            call = partial(self._stream_output, task_id, llm, messages, max_tokens)
+        else:
+            call = partial(self._complete, llm, messages, max_tokens)
+        started = time.perf_counter()
+        with LLM_IN_FLIGHT.track_inprogress():
+            text = await self.deadlines.call(
+                node,
+                partial(self.governor.call, call, prompt_tokens + max_tokens),
+                timeout,
+                hedge=not stream and self._use_hedging(state),
+            )
+        LLM_CALL_DURATION.labels(node).observe(time.perf_counter() - started)
+
+        usage["completion_tokens"] = count_tokens(text, model)
+        self.token_usage.record(node, usage)
+        LLM_TOKENS.labels(node, "prompt").observe(prompt_tokens)
+        LLM_TOKENS.labels(node, "completion").observe(usage["completion_tokens"])
+
+        if cache_key is not None:
+            await self.llm_cache.set(cache_key, text)
+        return text
+
+    async def _complete(self, llm, messages: List, max_tokens: int) -> str:
+        response = await llm.ainvoke(messages, max_tokens=max_tokens)
+        return response.content
+
+    async def _publish_output(self, task_id: str, text: str, offset: int):
+        """Append partial output to the task and notify subscribers"""
+        await self.task_store.append_output(task_id, text)
+        self.event_hub.publish(task_id, "output", {"offset": offset, "delta": text})
+
+    async def _stream_output(
+        self, task_id: str, llm, messages: List, max_tokens: int
+    ) -> str:
+        """Stream the completion, appending coalesced chunks to the task
+
+        The Execution step's progress is estimated from the characters
+        received against `max_tokens` and updated at most every
+        STEP_PROGRESS_INTERVAL seconds.
+        """
+        last_progress = time.monotonic()
+
+        async def publish(text: str, offset: int):
+            nonlocal last_progress
+            await self._publish_output(task_id, text, offset)
+            interval = settings.STEP_PROGRESS_INTERVAL
+            if interval > 0 and time.monotonic() - last_progress >= interval:
+                last_progress = time.monotonic()
+                # About four characters per token; the step completes at 1.0
+                progress = min(0.95, (offset + len(text)) / (4 * max_tokens))
+                await self._add_step(
+                    task_id,
+                    "Execution",
+                    StepStatus.RUNNING,
+                    "Executing task",
+                    progress=round(progress, 2),
+                )
+
+        buffer = OutputBuffer(publish)
+        try:
+            async for chunk in llm.astream(messages, max_tokens=max_tokens):
+                await buffer.append(chunk.content)
+        except Exception as e:
+            if buffer.text:
+                # Retrying would publish the output a second time
+                raise StreamInterrupted(str(e)) from e
+            raise
+        await buffer.flush()
+        return buffer.text
+
+    async def _reflect_task(
+        self, state: Dict[str, Any], config: Optional[RunnableConfig] = None
+    ) -> Dict[str, Any]:
         """Reflect on the task execution"""
         task_id = state["task_id"]
-        output = state.get("output", "")
+        output = state.get("output") or ""
+        budgeted = trim_to_tokens(
+            output, settings.TOKEN_OUTPUT_BUDGET, state.get("model")
+        )
 
         await self._add_step(
             task_id, "Reflection", StepStatus.RUNNING, "Analyzing execution results"
@@ -179,17 +618,21 @@ class TaskExecutor:
             reflection_prompt = f"""
             Review the task execution and provide a brief reflection:
             
-            Task Output: {output}
+            Task Output: {budgeted}
             
             Provide a brief reflection on the execution quality and any improvements.
             """
 
-            llm = self._get_llm()
-            response = await llm.ainvoke(reflection_prompt)
-            reflection = response.content
+            reflection = await self._invoke_llm(
+                state, reflection_prompt, "reflect", config, trimmed=budgeted != output
+            )
 
             await self._add_step(
-                task_id, "Reflection", StepStatus.COMPLETED, reflection
+                task_id,
+                "Reflection",
+                StepStatus.COMPLETED,
+                reflection,
+                details=state["usage"]["reflect"],
             )
 
             state["reflection"] = reflection
@@ -200,21 +643,43 @@ class TaskExecutor:
             raise
 
     async def _add_step(
-        self, task_id: str, step_name: str, status: StepStatus, message: str
+        self,
+        task_id: str,
+        step_name: str,
+        status: StepStatus,
+        message: str,
+        details: Optional[Dict[str, Any]] = None,
+        progress: Optional[float] = None,
     ):
-        """Add a step to the task"""
+        """Record a step, replacing the earlier record of the same step
+
+        A step keeps the start time of its first RUNNING record, so a
+        finished step's duration covers its whole run.
+        """
+        now = datetime.utcnow()
+        step_id = f"{task_id}_{step_name.lower()}"
+        starts = self.step_starts.setdefault(task_id, {})
+        finished = status in (StepStatus.COMPLETED, StepStatus.FAILED)
+        if finished:
+            started_at = starts.pop(step_id, now)
+            if not starts:
+                del self.step_starts[task_id]
+            if status == StepStatus.COMPLETED:
+                progress = 1.0
+        else:
+            started_at = starts.setdefault(step_id, now)
         step = StepLog(
-            id=f"{task_id}_{step_name.lower()}",
+            id=step_id,
             task_id=task_id,
             step_name=step_name,
             status=status,
             message=message,
-            started_at=datetime.utcnow(),
+            details=dict(details) if details else None,
+            started_at=started_at,
+            completed_at=now if finished else None,
+            duration=(now - started_at).total_seconds() if finished else None,
+            progress=progress,
         )
 
-        if status in [StepStatus.COMPLETED, StepStatus.FAILED]:
-            step.completed_at = datetime.utcnow()
-            if step.started_at:
-                step.duration = (step.completed_at - step.started_at).total_seconds()
-
         await self.task_store.add_step(task_id, step)
+        self.event_hub.publish(task_id, "step", step.model_dump(mode="json"))
@@ -22,6 +22,22 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = "sqlite:///./taskflow.db"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_ECHO: bool = False
+
+    # Task storage ("memory" or "sql")
+    TASK_STORE_BACKEND: str = "memory"
+    TASK_STORE_FLUSH_INTERVAL: float = 0.5  # seconds between step write batches
+    TASK_STORE_BATCH_SIZE: int = 200  # pending steps that trigger an early flush
+    STORE_COMPRESS_MIN_BYTES: int = 4096  # compress longer outputs/steps, 0 = never
+    STORE_COMPRESS_LEVEL: int = 6  # zlib level, 1 = fastest
+
+    # LangGraph checkpoints ("memory" or "sqlite" to resume tasks after a restart)
+    CHECKPOINT_BACKEND: str = "memory"
+    CHECKPOINT_DB_PATH: str = "./checkpoints.db"  # used when DATABASE_URL is not SQLite
+    CHECKPOINT_FLUSH_INTERVAL: float = 0.2  # seconds between checkpoint write batches
+    CHECKPOINT_BATCH_SIZE: int = 100  # queued writes that trigger an early flush
 
     # OpenAI
     OPENAI_API_KEY: str = ""
@@ -29,19 +45,128 @@ class Settings(BaseSettings):
     OPENAI_MAX_TOKENS: int = 4000
     OPENAI_TEMPERATURE: float = 0.7
 
+    # Chat model backend: "openai", or "fake" for offline tests and benchmarks
+    LLM_BACKEND: str = "openai"
+    FAKE_LLM_LATENCY: str = "lognormal"  # "fixed", "uniform" or "lognormal"
+    FAKE_LLM_LATENCY_MEAN: float = 0.2  # seconds per call
+    FAKE_LLM_LATENCY_SIGMA: float = 0.5  # spread of the lognormal distribution
+    FAKE_LLM_ERROR_RATE: float = 0.0  # share of calls that fail
+    FAKE_LLM_ERROR_STATUS: int = 503  # HTTP status of injected failures
+    FAKE_LLM_REPLY_WORDS: int = 120
+    FAKE_LLM_CHUNK_CHARS: int = 16  # characters per streamed chunk
+    FAKE_LLM_SEED: int = 0
+
+    # Model clients and their shared HTTP connection pool
+    LLM_CLIENT_IDLE_TTL: float = 600.0  # seconds before an unused client is dropped
+    LLM_CLIENT_MAX: int = 32  # distinct (model, temperature, max_tokens) clients
+    LLM_HTTP2: bool = True
+    LLM_HTTP_MAX_CONNECTIONS: int = 100
+    LLM_HTTP_MAX_KEEPALIVE: int = 20
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 30.0  # seconds
+    LLM_HTTP_TIMEOUT: float = 120.0  # seconds
+    LLM_HTTP_CONNECT_TIMEOUT: float = 10.0  # seconds
+
+    # LLM response cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL: int = 3600  # seconds
+    LLM_CACHE_MAX_ENTRIES: int = 1000
+    LLM_CACHE_MAX_BYTES: int = 50 * 1024 * 1024
+    LLM_CACHE_DISK_PATH: str = ""  # SQLite file for a persistent tier, empty = off
+
+    # Streaming of the execute node's output
+    LLM_STREAMING: bool = False  # default when options.stream is not set
+    STREAM_FLUSH_INTERVAL: float = 0.1  # seconds between partial output writes
+    STREAM_FLUSH_CHARS: int = 256  # buffered characters that force a write
+    STEP_PROGRESS_INTERVAL: float = 1.0  # seconds between progress updates, 0 = off
+
     # ElevenLabs
     ELEVENLABS_API_KEY: str = ""
 
     # ChromaDB
     CHROMA_PERSIST_DIRECTORY: str = "./chroma_db"
 
+    # Semantic prompt cache (ChromaDB)
+    SEMANTIC_CACHE_ENABLED: bool = False
+    SEMANTIC_CACHE_MODE: str = "output"  # "output" reuses results, "plan" only plans
+    SEMANTIC_CACHE_THRESHOLD: float = 0.95  # minimum cosine similarity for a hit
+    SEMANTIC_CACHE_COLLECTION: str = "task_prompts"
+    SEMANTIC_CACHE_CANDIDATES: int = 3  # neighbours checked per lookup
+    SEMANTIC_CACHE_BATCH_WINDOW: float = 0.02  # seconds to gather a batch
+    SEMANTIC_CACHE_MAX_BATCH: int = 32
+
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    LOG_JSON: bool = False  # one JSON object per line with task_id and node
+    LOG_FILE: str = "taskflow.log"  # empty logs to stdout only
+    LOG_MAX_BYTES: int = 10 * 1024 * 1024  # size at which the log file rotates
+    LOG_BACKUP_COUNT: int = 5  # rotated files kept
+    LOG_ASYNC: bool = True  # write records from a background thread
+    LOG_QUEUE_SIZE: int = 10000  # records buffered before new ones are dropped
+    LOG_RATE_LIMIT: int = 100  # INFO/DEBUG records per second per call site, 0 = all
 
     # Task Settings
-    MAX_TASK_DURATION: int = 300  # 5 minutes
+    MAX_TASK_DURATION: int = 300  # 5 minutes, enforced as each task's deadline
     MAX_CONCURRENT_TASKS: int = 5
+    TASK_QUEUE_MAX_SIZE: int = 100
+    TASK_QUEUE_RETRY_AFTER: int = 5  # seconds, used before any task has finished
+    TASK_BATCH_MAX_SIZE: int = 1000  # tasks accepted by one POST /tasks:batch
+
+    # Work queue shared by API and worker processes
+    TASK_QUEUE_BACKEND: str = "memory"  # "memory" (in-process) or "sqlite" (shared)
+    TASK_QUEUE_DB_PATH: str = "./work_queue.db"
+    TASK_QUEUE_RUN_WORKERS: bool = True  # False for API-only nodes
+    TASK_QUEUE_VISIBILITY_TIMEOUT: float = 30.0  # seconds a lease lasts unrenewed
+    TASK_QUEUE_POLL_INTERVAL: float = 0.5  # seconds between polls of an idle worker
+    TASK_QUEUE_MAX_ATTEMPTS: int = 3  # leases of one task before it is failed
+
+    # Retention of finished tasks held in memory
+    RETENTION_MAX_TASKS: int = 10000
+    RETENTION_MAX_BYTES: int = 256 * 1024 * 1024  # approximate size of finished tasks
+    RETENTION_TTL: float = 86400.0  # seconds a finished task is kept
+    RETENTION_SWEEP_INTERVAL: float = 60.0  # seconds between sweeps
+    RETENTION_ARCHIVE_PATH: str = ""  # JSON Lines file for evicted tasks, empty = drop
+
+    # Outbound LLM limits shared by all tasks (0 disables a limit)
+    LLM_REQUESTS_PER_MINUTE: int = 500
+    LLM_TOKENS_PER_MINUTE: int = 200000  # prompt plus max_tokens of each call
+    LLM_MAX_RETRIES: int = 4  # retries of 429, 5xx and connection errors
+    LLM_RETRY_BASE_DELAY: float = 0.5  # seconds, doubled per retry with jitter
+    LLM_RETRY_MAX_DELAY: float = 20.0
+    LLM_BREAKER_THRESHOLD: int = 5  # consecutive failures that open the breaker
+    LLM_BREAKER_RESET: float = 30.0  # seconds before a probe call is let through
+
+    # Token budgets of prompts built from earlier stages
+    TOKEN_PLAN_BUDGET: int = 1000  # plan tokens embedded in the execute prompt
+    TOKEN_OUTPUT_BUDGET: int = 2000  # output tokens embedded in the reflect prompt
+    TOKEN_DEFAULT_CONTEXT_WINDOW: int = 8192  # models without a known window
+    TOKEN_WINDOW_SAFETY_MARGIN: int = 64  # tokens kept free for message framing
+    TOKEN_MIN_COMPLETION: int = 256  # smallest max_tokens worth sending
+
+    # Hedged LLM requests (duplicate a call still running after the node's p95)
+    LLM_HEDGING_ENABLED: bool = False  # default when options.hedge is not set
+    LLM_HEDGE_PERCENTILE: float = 0.95
+    LLM_HEDGE_MIN_SAMPLES: int = 20  # latency samples a node needs before hedging
+    LLM_LATENCY_WINDOW: int = 200  # recent calls per node kept for percentiles
+
+    # Workflow routing
+    ROUTER_ENABLED: bool = True  # skip planning for short, single-step prompts
+    ROUTER_DIRECT_MAX_TOKENS: int = 48  # longest prompt sent straight to execute
+
+    # Reflection ("inline" before completion, "deferred" after it, or "off")
+    REFLECTION_MODE: str = "inline"
+    REFLECTION_SAMPLE_RATE: float = 1.0  # fraction of tasks that get a reflection
+    REFLECTION_WORKERS: int = 1
+    REFLECTION_QUEUE_SIZE: int = 1000  # deferred reflections beyond this are dropped
+    REFLECTION_IDLE_POLL: float = 0.5  # seconds between checks for idle capacity
+
+    # Task event streaming (SSE / WebSocket)
+    EVENT_QUEUE_SIZE: int = 1000  # buffered events per subscriber
+    EVENT_KEEPALIVE_INTERVAL: float = 15.0  # seconds between keepalives
+
+    # Tracing (OpenTelemetry spans exported over OTLP, see OTEL_EXPORTER_OTLP_*)
+    OTEL_ENABLED: bool = False
+    OTEL_SERVICE_NAME: str = "taskflow"
 
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Relative share of a task's time budget each graph node may use. A node
+# gets its weight over the weights of itself and the nodes still to come.
+NODE_WEIGHTS = {"plan": 1.0, "execute": 3.0, "reflect": 1.0}
+
+
+class DeadlineExceeded(Exception):
+    """A task or one of its graph nodes ran out of time"""
+
+
+def make_deadline(seconds: Optional[float] = None) -> float:
+    """Absolute deadline (monotonic clock) `seconds` from now"""
+    return time.monotonic() + (seconds or settings.MAX_TASK_DURATION)
+
+
+def remaining(deadline: float) -> float:
+    """Seconds left before a deadline"""
+    return deadline - time.monotonic()
+
+
+def node_timeout(deadline: float, node: str, following: List[str]) -> float:
+    """Timeout for a node, leaving a proportional share for the nodes after it"""
+    left = remaining(deadline)
+    if left <= 0:
+        raise DeadlineExceeded(f"Task deadline exceeded before the {node} node")
+    weight = NODE_WEIGHTS.get(node, 1.0)
+    total = weight + sum(NODE_WEIGHTS.get(name, 1.0) for name in following)
+    return left * weight / total
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies"""
+
+    def __init__(self, window: int):
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class DeadlinePolicy:
+    """Runs node LLM calls under a timeout, hedging slow ones
+
+    When hedging is on and a node has enough latency samples, a call that
+    is still running after the node's rolling p95 gets a duplicate; the
+    first successful response wins and the other call is cancelled.
+    """
+
+    def __init__(
+        self,
+        window: Optional[int] = None,
+        percentile: Optional[float] = None,
+        min_samples: Optional[int] = None,
+    ):
+        self.window = window or settings.LLM_LATENCY_WINDOW
+        self.percentile = percentile or settings.LLM_HEDGE_PERCENTILE
+        self.min_samples = min_samples or settings.LLM_HEDGE_MIN_SAMPLES
+        self.latency: Dict[str, LatencyTracker] = {}
+        self.calls: Dict[str, int] = {}
+        self.timeouts: Dict[str, int] = {}
+        self.hedged: Dict[str, int] = {}
+        self.hedge_wins: Dict[str, int] = {}
+
+    def _tracker(self, node: str) -> LatencyTracker:
+        if node not in self.latency:
+            self.latency[node] = LatencyTracker(self.window)
+            for counter in (self.calls, self.timeouts, self.hedged, self.hedge_wins):
+                counter[node] = 0
+        return self.latency[node]
+
+    def hedge_delay(self, node: str) -> Optional[float]:
+        """Delay before a duplicate call, or None until enough samples exist"""
+        tracker = self._tracker(node)
+        if len(tracker.samples) < self.min_samples:
+            return None
+        return tracker.percentile(self.percentile)
+
+    async def call(
+        self,
+        node: str,
+        factory: Callable[[], Awaitable[Any]],
+        timeout: float,
+        hedge: bool = False,
+    ) -> Any:
+        """Await `factory()` within `timeout` seconds, hedging if asked"""
+        tracker = self._tracker(node)
+        self.calls[node] += 1
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(
+                self._first_response(node, factory, hedge), timeout
+            )
+        except asyncio.TimeoutError:
+            self.timeouts[node] += 1
+            raise DeadlineExceeded(
+                f"The {node} node exceeded its {timeout:.1f}s time budget"
+            )
+        tracker.record(time.monotonic() - started)
+        return result
+
+    async def _first_response(
+        self, node: str, factory: Callable[[], Awaitable[Any]], hedge: bool
+    ) -> Any:
+        delay = self.hedge_delay(node) if hedge else None
+        primary = asyncio.ensure_future(factory())
+        if delay is None:
+            return await primary
+
+        backup = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+
+            self.hedged[node] += 1
+            logger.debug(f"Hedging {node} call still running after {delay:.2f}s")
+            backup = asyncio.ensure_future(factory())
+            pending = {primary, backup}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.hedge_wins[node] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in (primary, backup):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get per-node call counts, p50/p95 latency, timeouts and hedges"""
+        return {
+            node: {
+                "calls": self.calls[node],
+                "p50": tracker.percentile(0.5),
+                "p95": tracker.percentile(0.95),
+                "timeouts": self.timeouts[node],
+                "hedged": self.hedged[node],
+                "hedge_wins": self.hedge_wins[node],
+            }
+            for node, tracker in self.latency.items()
+        }
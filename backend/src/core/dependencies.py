@@ -0,0 +1,38 @@
+from functools import lru_cache
+
+from .config import settings
+from .metrics import PROCESS_RSS, QUEUE_DEPTH, RETAINED_TASKS, STORE_BYTES
+from ..storage.base import BaseTaskStore
+from ..storage.task_store import TaskStore
+from ..services.task_service import TaskService
+from ..services.event_hub import EventHub
+from ..services.retention import get_process_memory
+
+
+@lru_cache
+def get_task_store() -> BaseTaskStore:
+    """Get the process-wide task store"""
+    if settings.TASK_STORE_BACKEND == "sql":
+        from ..storage.sql_task_store import SQLTaskStore
+
+        return SQLTaskStore()
+    return TaskStore()
+
+
+@lru_cache
+def get_event_hub() -> EventHub:
+    """Get the process-wide task event hub"""
+    return EventHub()
+
+
+@lru_cache
+def get_task_service() -> TaskService:
+    """Get the process-wide task service"""
+    service = TaskService(get_task_store(), get_event_hub())
+    # Only the process-wide service feeds the gauges
+    QUEUE_DEPTH.set_function(service.scheduler.depth)
+    usage = service.task_store.get_memory_usage
+    STORE_BYTES.set_function(lambda: usage().get("finished_bytes", 0))
+    RETAINED_TASKS.set_function(lambda: usage().get("tasks", 0))
+    PROCESS_RSS.set_function(lambda: get_process_memory()["rss_bytes"] or 0)
+    return service
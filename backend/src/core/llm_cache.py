@@ -0,0 +1,181 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(
+    model: Optional[str],
+    temperature: Optional[float],
+    max_tokens: Optional[int],
+    system_prompt: Optional[str],
+    prompt: str,
+) -> str:
+    """Hash everything that determines an LLM response"""
+    payload = json.dumps(
+        [model, temperature, max_tokens, system_prompt, prompt], ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class MemoryCacheTier:
+    """LRU cache bounded by entry count and total size, with TTL"""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # key -> (value, expires_at, size in bytes)
+        self.entries: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()
+        self.size = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at, _ = entry
+        if expires_at < time.time():
+            self._remove(key)
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str):
+        if key in self.entries:
+            self._remove(key)
+        size = len(value.encode())
+        if size > self.max_bytes:
+            return
+        self.entries[key] = (value, time.time() + self.ttl, size)
+        self.size += size
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            oldest = next(iter(self.entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        _, _, size = self.entries.pop(key)
+        self.size -= size
+
+
+class DiskCacheTier:
+    """SQLite-backed cache tier; calls block and belong off the event loop"""
+
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self.conn.execute(
+                "DELETE FROM llm_cache WHERE expires_at < ?", (time.time(),)
+            )
+            self.conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value FROM llm_cache WHERE key = ? AND expires_at >= ?",
+                (key, time.time()),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) "
+                "VALUES (?, ?, ?)",
+                (key, value, time.time() + self.ttl),
+            )
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class LLMCache:
+    """Two-tier cache of LLM responses keyed by make_cache_key"""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        disk_path: Optional[str] = None,
+    ):
+        ttl = ttl or settings.LLM_CACHE_TTL
+        self.memory = MemoryCacheTier(
+            max_entries or settings.LLM_CACHE_MAX_ENTRIES,
+            max_bytes or settings.LLM_CACHE_MAX_BYTES,
+            ttl,
+        )
+        disk_path = disk_path if disk_path is not None else settings.LLM_CACHE_DISK_PATH
+        self.disk = DiskCacheTier(disk_path, ttl) if disk_path else None
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        """Look a response up in memory, then on disk"""
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            self.memory_hits += 1
+            return value
+
+        if self.disk is not None:
+            value = await asyncio.to_thread(self.disk.get, key)
+            if value is not None:
+                self.memory.set(key, value)
+                self.hits += 1
+                self.disk_hits += 1
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str):
+        """Store a response in every tier"""
+        self.memory.set(key, value)
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.set, key, value)
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to write LLM cache entry to disk: {str(e)}")
+
+    def close(self):
+        """Close the disk tier"""
+        if self.disk is not None:
+            self.disk.close()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get hit/miss counts and memory tier usage"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0,
+            "entries": len(self.memory.entries),
+            "bytes": self.memory.size,
+            "evictions": self.memory.evictions,
+            "disk_enabled": self.disk is not None,
+        }
@@ -1,20 +1,212 @@
+import atexit
+import json
 import logging
+import queue
 import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
 from .config import settings
+from .metrics import LOG_RECORDS_DROPPED
 
+# Fields such as task_id and node attached to every record logged inside
+# a `log_context` block, including by tasks it starts
+_context: ContextVar[Dict[str, Any]] = ContextVar("log_context", default={})
 
-def setup_logging():
-    """Setup application logging"""
-
-    # Configure root logger
-    logging.basicConfig(
-        level=getattr(logging, settings.LOG_LEVEL.upper()),
-        format=settings.LOG_FORMAT,
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler("taskflow.log"),
-        ],
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["DroppingQueueHandler"] = None
+_sampler: Optional["RateLimitFilter"] = None
+_installed: List[logging.Handler] = []
+
+
+@contextmanager
+def log_context(**fields) -> Iterator[None]:
+    """Attach fields to the log records emitted inside the block"""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copy the current log context onto each record"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.context = _context.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Let at most `rate` records per second through from each call site
+
+    Only records below WARNING are limited, so errors are never lost.
+    Suppressed records are counted and reported with the next record
+    that passes from the same call site.
+    """
+
+    def __init__(self, rate: int):
+        super().__init__()
+        self.rate = rate
+        self.windows: Dict[Tuple[str, int], List[float]] = {}
+        self.suppressed = 0
+        self.lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate <= 0 or record.levelno >= logging.WARNING:
+            return True
+        now = time.monotonic()
+        key = (record.pathname, record.lineno)
+        with self.lock:
+            # [window start, records in window, suppressed since last pass]
+            window = self.windows.setdefault(key, [now, 0, 0])
+            if now - window[0] >= 1.0:
+                window[0], window[1] = now, 0
+            if window[1] >= self.rate:
+                window[2] += 1
+                self.suppressed += 1
+                return False
+            window[1] += 1
+            if window[2]:
+                record.suppressed = window[2]
+                window[2] = 0
+        return True
+
+
+class FanOutHandler(logging.Handler):
+    """Pass each record to several output handlers
+
+    Used when LOG_ASYNC is off, so filters run once per record rather
+    than once per output.
+    """
+
+    def __init__(self, handlers: List[logging.Handler]):
+        super().__init__()
+        self.handlers = handlers
+
+    def emit(self, record: logging.LogRecord):
+        for handler in self.handlers:
+            handler.handle(record)
+
+    def close(self):
+        for handler in self.handlers:
+            handler.close()
+        super().close()
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Queue handler that drops records instead of blocking when full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments now, since they may change after this call,
+        # but leave formatting to the writer thread
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line with the record's task context"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc)
+            .isoformat()
+            .replace("+00:00", "Z"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "context", {}))
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """LOG_FORMAT followed by the record's task context"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        fields = dict(getattr(record, "context", {}))
+        if getattr(record, "suppressed", 0):
+            fields["suppressed"] = record.suppressed
+        if fields:
+            first, newline, rest = text.partition("\n")
+            extra = " ".join(f"{key}={value}" for key, value in fields.items())
+            text = f"{first} [{extra}]{newline}{rest}"
+        return text
+
+
+def _output_handlers() -> List[logging.Handler]:
+    formatter = (
+        JSONFormatter() if settings.LOG_JSON else TextFormatter(settings.LOG_FORMAT)
     )
+    handlers: List[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+    if settings.LOG_FILE:
+        handlers.append(
+            RotatingFileHandler(
+                settings.LOG_FILE,
+                maxBytes=settings.LOG_MAX_BYTES,
+                backupCount=settings.LOG_BACKUP_COUNT,
+                encoding="utf-8",
+            )
+        )
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def setup_logging():
+    """Setup application logging
+
+    With LOG_ASYNC on, records pass through a bounded in-memory queue to
+    a writer thread, so logging never does I/O on the event loop. Records
+    arriving while the queue is full are dropped and counted.
+    """
+    global _listener, _queue_handler, _sampler
+    shutdown_logging()
+
+    root = logging.getLogger()
+    for handler in _installed:
+        root.removeHandler(handler)
+        handler.close()
+    _installed.clear()
+    _queue_handler = None
+    root.setLevel(getattr(logging, settings.LOG_LEVEL.upper()))
+
+    _sampler = RateLimitFilter(settings.LOG_RATE_LIMIT)
+    outputs = _output_handlers()
+    if settings.LOG_ASYNC:
+        _queue_handler = DroppingQueueHandler(queue.Queue(settings.LOG_QUEUE_SIZE))
+        _listener = QueueListener(_queue_handler.queue, *outputs)
+        _listener.start()
+        handler: logging.Handler = _queue_handler
+    else:
+        handler = FanOutHandler(outputs)
+    # One handler in front of every output, so each record is filtered once
+    handler.addFilter(ContextFilter())
+    handler.addFilter(_sampler)
+    root.addHandler(handler)
+    _installed.append(handler)
 
     # Set specific logger levels
     logging.getLogger("uvicorn").setLevel(logging.INFO)
@@ -26,3 +218,26 @@ def setup_logging():
     logging.getLogger("openai").setLevel(logging.WARNING)
     logging.getLogger("langchain").setLevel(logging.WARNING)
     logging.getLogger("langgraph").setLevel(logging.WARNING)
+
+
+def shutdown_logging():
+    """Write out queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def get_logging_metrics() -> Dict[str, Any]:
+    """Get queued, dropped and rate-limited record counts"""
+    return {
+        "async": _queue_handler is not None and _listener is not None,
+        "queued": _queue_handler.queue.qsize() if _queue_handler else 0,
+        "dropped": _queue_handler.dropped if _queue_handler else 0,
+        "rate_limited": _sampler.suppressed if _sampler else 0,
+    }
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,138 @@
+import time
+from typing import Any, Dict
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    ProcessCollector,
+    generate_latest,
+)
+
+# A dedicated registry keeps re-imports in tests from registering twice
+REGISTRY = CollectorRegistry()
+ProcessCollector(registry=REGISTRY)
+
+STARTED_AT = time.time()
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+TOKEN_BUCKETS = (16, 64, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+NODE_DURATION = Histogram(
+    "taskflow_node_duration_seconds",
+    "Duration of workflow nodes",
+    ["node"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+LLM_CALL_DURATION = Histogram(
+    "taskflow_llm_call_duration_seconds",
+    "Duration of LLM calls, including retries and hedges",
+    ["node"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+LLM_TOKENS = Histogram(
+    "taskflow_llm_tokens",
+    "Tokens per LLM call",
+    ["node", "kind"],
+    buckets=TOKEN_BUCKETS,
+    registry=REGISTRY,
+)
+LLM_IN_FLIGHT = Gauge(
+    "taskflow_llm_calls_in_flight", "LLM calls in progress", registry=REGISTRY
+)
+QUEUE_WAIT = Histogram(
+    "taskflow_queue_wait_seconds",
+    "Time tasks wait in the admission queue",
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+QUEUE_DEPTH = Gauge(
+    "taskflow_tasks_queued", "Tasks waiting for a worker", registry=REGISTRY
+)
+TASK_DURATION = Histogram(
+    "taskflow_task_duration_seconds",
+    "End-to-end task duration from start to a terminal status",
+    ["status"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+TASKS_IN_FLIGHT = Gauge(
+    "taskflow_tasks_in_flight", "Tasks being executed", registry=REGISTRY
+)
+STORE_BYTES = Gauge(
+    "taskflow_store_bytes",
+    "Approximate size of finished tasks held in the task store",
+    registry=REGISTRY,
+)
+RETAINED_TASKS = Gauge(
+    "taskflow_retained_tasks", "Tasks held in the task store", registry=REGISTRY
+)
+PROCESS_RSS = Gauge(
+    "process_rss_bytes", "Resident set size of this process", registry=REGISTRY
+)
+LOG_RECORDS_DROPPED = Counter(
+    "taskflow_log_records_dropped",
+    "Log records dropped because the log queue was full",
+    registry=REGISTRY,
+)
+HTTP_REQUESTS = Counter(
+    "taskflow_http_requests",
+    "HTTP requests by route and status code",
+    ["method", "route", "status"],
+    registry=REGISTRY,
+)
+HTTP_DURATION = Histogram(
+    "taskflow_http_request_duration_seconds",
+    "HTTP request duration by route",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+
+
+def uptime() -> float:
+    """Seconds since the process started"""
+    return time.time() - STARTED_AT
+
+
+def render_metrics() -> bytes:
+    """Current metrics in the Prometheus text format"""
+    return generate_latest(REGISTRY)
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting HTTP requests per route template
+
+    Requests are labelled with the matched route's path template, so
+    `/tasks/{task_id}/status` is one series however many tasks exist.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_REQUESTS.labels(method, path, str(status)).inc()
+            HTTP_DURATION.labels(method, path).observe(time.perf_counter() - started)
@@ -0,0 +1,236 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+import openai
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an LLM call failed for a reason worth retrying"""
+    if isinstance(
+        error, (openai.APIConnectionError, httpx.TransportError, ConnectionError)
+    ):
+        return True
+    status = getattr(error, "status_code", None)
+    return status in RETRYABLE_STATUS
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the provider asked us to wait, if it said so"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return max(0.0, float(headers.get("retry-after")))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Refills `rate` units per minute up to a burst of one minute's worth"""
+
+    def __init__(self, rate: int):
+        self.rate = rate
+        self.capacity = float(rate)
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate / 60.0
+        )
+        self.updated = now
+
+    async def acquire(self, amount: float = 1) -> float:
+        """Take `amount` units, waiting for them; returns the seconds waited"""
+        if self.rate <= 0:
+            return 0.0
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        # Callers are served in arrival order while holding the lock
+        async with self.lock:
+            self._refill()
+            while self.tokens < amount:
+                delay = (amount - self.tokens) * 60.0 / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self.tokens -= amount
+        return waited
+
+
+class CircuitBreaker:
+    """Stops calls after repeated failures and lets one probe through later
+
+    Unlike a fail-fast breaker, callers arriving while it is open wait
+    until the cool-down ends and a probe call has succeeded.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_until = 0.0
+        self.opens = 0
+        self._changed = asyncio.Event()
+
+    def _transition(self, state: str):
+        self.state = state
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait(self):
+        """Wait until a call may be made"""
+        while True:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN:
+                delay = self.opened_until - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                # This caller becomes the probe
+                self._transition(self.HALF_OPEN)
+                return
+            await self._changed.wait()
+
+    def record_success(self):
+        self.failures = 0
+        if self.state != self.CLOSED:
+            logger.info("LLM circuit breaker closed")
+            self._transition(self.CLOSED)
+
+    def release_probe(self):
+        """Let another caller probe when the current probe was abandoned"""
+        if self.state == self.HALF_OPEN:
+            self.opened_until = time.monotonic()
+            self._transition(self.OPEN)
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opens += 1
+                logger.warning(
+                    f"LLM circuit breaker opened for {self.reset_timeout:.0f}s "
+                    f"after {self.failures} failures"
+                )
+            self.opened_until = time.monotonic() + self.reset_timeout
+            self._transition(self.OPEN)
+
+
+class LLMGovernor:
+    """Shared gate for outbound LLM calls
+
+    Every call takes a request and its estimated tokens from per-minute
+    buckets, waits while the circuit breaker is open, and is retried with
+    jittered exponential backoff when it fails with a retryable error.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.requests = TokenBucket(
+            requests_per_minute
+            if requests_per_minute is not None
+            else settings.LLM_REQUESTS_PER_MINUTE
+        )
+        self.tokens = TokenBucket(
+            tokens_per_minute
+            if tokens_per_minute is not None
+            else settings.LLM_TOKENS_PER_MINUTE
+        )
+        self.max_retries = (
+            max_retries if max_retries is not None else settings.LLM_MAX_RETRIES
+        )
+        self.breaker = breaker or CircuitBreaker(
+            settings.LLM_BREAKER_THRESHOLD, settings.LLM_BREAKER_RESET
+        )
+
+        # Metrics
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.throttled_seconds = 0.0
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential delay before retry number `attempt`"""
+        ceiling = min(
+            settings.LLM_RETRY_MAX_DELAY, settings.LLM_RETRY_BASE_DELAY * 2**attempt
+        )
+        return random.uniform(0, ceiling)
+
+    async def call(self, factory: Callable[[], Awaitable[Any]], tokens: int = 0) -> Any:
+        """Run `factory()` within the limits, retrying retryable failures"""
+        attempt = 0
+        while True:
+            await self.breaker.wait()
+            try:
+                self.throttled_seconds += await self.requests.acquire(1)
+                self.throttled_seconds += await self.tokens.acquire(tokens)
+                self.calls += 1
+                result = await factory()
+            except asyncio.CancelledError:
+                self.breaker.release_probe()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    if e.__cause__ is not None and is_retryable(e.__cause__):
+                        # A provider failure wrapped as not worth retrying,
+                        # such as a stream cut off after partial output
+                        self.breaker.record_failure()
+                        self.failures += 1
+                        raise
+                    # The provider answered, so it is reachable
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt >= self.max_retries:
+                    self.failures += 1
+                    raise
+                delay = retry_after(e)
+                if delay is None:
+                    delay = self.backoff(attempt)
+                attempt += 1
+                self.retries += 1
+                logger.warning(
+                    f"Retryable LLM error ({str(e)}), retry {attempt} in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get call, retry and throttling counts and the breaker state"""
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "throttled_seconds": self.throttled_seconds,
+            "requests_per_minute": self.requests.rate,
+            "tokens_per_minute": self.tokens.rate,
+            "breaker_state": self.breaker.state,
+            "breaker_opens": self.breaker.opens,
+        }
@@ -0,0 +1,47 @@
+import logging
+from contextlib import nullcontext
+from typing import Any, ContextManager, Dict, Optional
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+_tracer = None
+
+
+def setup_tracing():
+    """Export spans over OTLP when OTEL_ENABLED is set
+
+    Needs the optional `opentelemetry-sdk` and OTLP exporter packages.
+    Spans are exported from a background thread by the batch processor,
+    and while tracing is off `span()` returns a shared no-op context.
+    """
+    global _tracer
+    if not settings.OTEL_ENABLED or _tracer is not None:
+        return
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import (
+            OTLPSpanExporter,
+        )
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError as e:
+        logger.warning(f"Tracing disabled, OpenTelemetry is not installed: {str(e)}")
+        return
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.OTEL_SERVICE_NAME})
+    )
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("taskflow")
+    logger.info("OpenTelemetry tracing enabled")
+
+
+def span(name: str, attributes: Optional[Dict[str, Any]] = None) -> ContextManager:
+    """Context manager recording a span, or doing nothing when tracing is off"""
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.start_as_current_span(name, attributes=attributes)
@@ -1 +1,15 @@
 # Database package
+from .models import Base, TaskRow, StepRow
+from .session import create_engine, create_session_factory, get_async_database_url
+from .checkpointer import SQLiteCheckpointer, get_sqlite_path
+
+__all__ = [
+    "Base",
+    "TaskRow",
+    "StepRow",
+    "SQLiteCheckpointer",
+    "create_engine",
+    "create_session_factory",
+    "get_async_database_url",
+    "get_sqlite_path",
+]
@@ -0,0 +1,244 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+from typing import Any, List, Optional, Sequence, Tuple
+
+from langgraph.checkpoint.memory import InMemorySaver
+from sqlalchemy.engine import make_url
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS graph_checkpoints ("
+    "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, "
+    "checkpoint_id TEXT NOT NULL, checkpoint_type TEXT NOT NULL, "
+    "checkpoint BLOB NOT NULL, metadata_type TEXT NOT NULL, metadata BLOB NOT NULL, "
+    "parent_id TEXT, PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id))",
+    "CREATE TABLE IF NOT EXISTS graph_checkpoint_blobs ("
+    "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, channel TEXT NOT NULL, "
+    "version TEXT NOT NULL, value_type TEXT NOT NULL, value BLOB NOT NULL, "
+    "PRIMARY KEY (thread_id, checkpoint_ns, channel, version))",
+    "CREATE TABLE IF NOT EXISTS graph_checkpoint_writes ("
+    "thread_id TEXT NOT NULL, checkpoint_ns TEXT NOT NULL, "
+    "checkpoint_id TEXT NOT NULL, task_id TEXT NOT NULL, idx INTEGER NOT NULL, "
+    "channel TEXT NOT NULL, value_type TEXT NOT NULL, value BLOB NOT NULL, "
+    "task_path TEXT NOT NULL, "
+    "PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx))",
+)
+
+Statement = Tuple[str, Tuple[Any, ...]]
+
+UPSERT_CHECKPOINT = (
+    "INSERT OR REPLACE INTO graph_checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+UPSERT_BLOB = "INSERT OR REPLACE INTO graph_checkpoint_blobs VALUES (?, ?, ?, ?, ?, ?)"
+UPSERT_WRITE = (
+    "INSERT OR REPLACE INTO graph_checkpoint_writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def get_sqlite_path(database_url: Optional[str] = None) -> Optional[str]:
+    """File path of a SQLite DATABASE_URL, or None for other databases"""
+    url = make_url(database_url or settings.DATABASE_URL)
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        return None
+    return url.database
+
+
+class SQLiteCheckpointer(InMemorySaver):
+    """LangGraph checkpointer that mirrors its state to a SQLite file
+
+    Reads are served from the in-memory saver. Every checkpoint, blob and
+    pending write is also queued as an upsert and written in batches by a
+    background flusher, and `start()` loads what a previous process left
+    behind so interrupted graphs can be resumed.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        flush_interval: Optional[float] = None,
+        batch_size: Optional[int] = None,
+    ):
+        super().__init__()
+        self.path = path or get_sqlite_path() or settings.CHECKPOINT_DB_PATH
+        self.flush_interval = flush_interval or settings.CHECKPOINT_FLUSH_INTERVAL
+        self.batch_size = batch_size or settings.CHECKPOINT_BATCH_SIZE
+        self.pending: List[Statement] = []
+        self.pending_lock = threading.Lock()
+        # Guards the connection, which the flusher uses from a worker thread
+        self.lock = threading.Lock()
+        self.conn: Optional[sqlite3.Connection] = None
+        self._flush_requested = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        self.flushed = 0
+
+    async def start(self):
+        """Open the database, load saved checkpoints and start the flusher"""
+        await asyncio.to_thread(self._open)
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop())
+        logger.info(
+            f"Checkpointer loaded {len(self.storage)} graph threads from {self.path}"
+        )
+
+    async def close(self):
+        """Write queued checkpoints and close the database"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        if self.conn is not None:
+            await asyncio.to_thread(self.flush)
+            with self.lock:
+                self.conn.close()
+                self.conn = None
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self.lock:
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+            self.conn = conn
+            self._load()
+
+    def _load(self):
+        """Rebuild the in-memory saver from the database"""
+        rows = self.conn.execute(
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, checkpoint_type, "
+            "checkpoint, metadata_type, metadata, parent_id FROM graph_checkpoints"
+        )
+        for thread_id, ns, checkpoint_id, c_type, c, m_type, m, parent in rows:
+            self.storage[thread_id][ns][checkpoint_id] = (
+                (c_type, c),
+                (m_type, m),
+                parent,
+            )
+        rows = self.conn.execute(
+            "SELECT thread_id, checkpoint_ns, channel, version, value_type, value "
+            "FROM graph_checkpoint_blobs"
+        )
+        for thread_id, ns, channel, version, value_type, value in rows:
+            self.blobs[(thread_id, ns, channel, version)] = (value_type, value)
+        rows = self.conn.execute(
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, "
+            "value_type, value, task_path FROM graph_checkpoint_writes"
+        )
+        for (
+            thread_id,
+            ns,
+            checkpoint_id,
+            task_id,
+            idx,
+            channel,
+            v_type,
+            v,
+            path,
+        ) in rows:
+            self.writes[(thread_id, ns, checkpoint_id)][(task_id, idx)] = (
+                task_id,
+                channel,
+                (v_type, v),
+                path,
+            )
+
+    def _queue(self, statements: List[Statement]):
+        with self.pending_lock:
+            self.pending.extend(statements)
+            full = len(self.pending) >= self.batch_size
+        if full:
+            self._flush_requested.set()
+
+    async def _flush_loop(self):
+        """Flush queued statements on an interval or when the batch fills up"""
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._flush_requested.wait(), timeout=self.flush_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                logger.error(f"Error flushing graph checkpoints: {str(e)}")
+
+    def flush(self):
+        """Write all queued statements in a single transaction (blocking)"""
+        with self.lock:
+            if self.conn is None:
+                return
+            with self.pending_lock:
+                batch, self.pending = self.pending, []
+            if not batch:
+                return
+            try:
+                with self.conn:
+                    for sql, params in batch:
+                        self.conn.execute(sql, params)
+            except sqlite3.Error:
+                with self.pending_lock:
+                    self.pending = batch + self.pending
+                raise
+            self.flushed += len(batch)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        result = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = result["configurable"]["thread_id"]
+        ns = result["configurable"]["checkpoint_ns"]
+        checkpoint_id = result["configurable"]["checkpoint_id"]
+        saved, saved_metadata, parent = self.storage[thread_id][ns][checkpoint_id]
+        statements = []
+        for channel, version in new_versions.items():
+            value = self.blobs[(thread_id, ns, channel, version)]
+            statements.append((UPSERT_BLOB, (thread_id, ns, channel, version, *value)))
+        statements.append(
+            (
+                UPSERT_CHECKPOINT,
+                (thread_id, ns, checkpoint_id, *saved, *saved_metadata, parent),
+            )
+        )
+        self._queue(statements)
+        return result
+
+    def put_writes(
+        self,
+        config,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        super().put_writes(config, writes, task_id, task_path)
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        outer = self.writes.get((thread_id, ns, checkpoint_id), {})
+        self._queue(
+            [
+                (
+                    UPSERT_WRITE,
+                    (thread_id, ns, checkpoint_id, task_id, idx, channel, *value, path),
+                )
+                for (write_task_id, idx), (_, channel, value, path) in outer.items()
+                if write_task_id == task_id
+            ]
+        )
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        self._queue(
+            [
+                (f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+                for table in (
+                    "graph_checkpoints",
+                    "graph_checkpoint_blobs",
+                    "graph_checkpoint_writes",
+                )
+            ]
+        )
@@ -0,0 +1,63 @@
+from datetime import datetime
+from typing import Optional, Dict, Any
+from sqlalchemy import (
+    JSON,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+
+class Base(DeclarativeBase):
+    """Declarative base for all tables"""
+
+
+class TaskRow(Base):
+    """Persisted task"""
+
+    __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_started_at_id", "started_at", "id"),
+        Index("ix_tasks_status_started_at", "status", "started_at"),
+        Index("ix_tasks_batch_id", "batch_id"),
+    )
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    status: Mapped[str] = mapped_column(String(16), nullable=False)
+    batch_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    request: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    output: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    task_metadata: Mapped[Dict[str, Any]] = mapped_column(
+        "metadata", JSON, nullable=False, default=dict
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    duration: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+
+class StepRow(Base):
+    """Persisted step log entry"""
+
+    __tablename__ = "steps"
+    __table_args__ = (Index("ix_steps_task_id_seq", "task_id", "seq"),)
+
+    seq: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    id: Mapped[str] = mapped_column(String(128), nullable=False)
+    task_id: Mapped[str] = mapped_column(
+        String(64), ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False
+    )
+    step_name: Mapped[str] = mapped_column(String(128), nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False)
+    message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    details: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    duration: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    progress: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
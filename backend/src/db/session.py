@@ -0,0 +1,59 @@
+import logging
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Async drivers for the sync URLs accepted in DATABASE_URL
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    """Map a sync database URL to its async driver"""
+    url = make_url(database_url)
+    if url.drivername in ASYNC_DRIVERS:
+        url = url.set(drivername=ASYNC_DRIVERS[url.drivername])
+    return url.render_as_string(hide_password=False)
+
+
+def create_engine(database_url: Optional[str] = None) -> AsyncEngine:
+    """Create a pooled async engine"""
+    url = make_url(get_async_database_url(database_url or settings.DATABASE_URL))
+    is_sqlite = url.get_backend_name() == "sqlite"
+    options = {"echo": settings.DB_ECHO, "pool_pre_ping": True}
+
+    if is_sqlite and url.database in (None, "", ":memory:"):
+        # In-memory databases only exist on a single connection
+        options["poolclass"] = StaticPool
+    else:
+        options["pool_size"] = settings.DB_POOL_SIZE
+        options["max_overflow"] = settings.DB_MAX_OVERFLOW
+
+    engine = create_async_engine(url, **options)
+
+    if is_sqlite:
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            # WAL lets readers proceed while the step flusher writes
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+
+    return engine
+
+
+def create_session_factory(engine: AsyncEngine) -> async_sessionmaker:
+    """Create a session factory bound to an engine"""
+    return async_sessionmaker(engine, expire_on_commit=False)
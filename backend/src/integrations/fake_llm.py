@@ -0,0 +1,115 @@
+import asyncio
+import hashlib
+import math
+import random
+from typing import AsyncIterator, List, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+
+from ..core.config import settings
+
+WORDS = (
+    "analyze plan execute review result task step data model output check "
+    "design build test measure report improve verify deliver summary detail"
+).split()
+
+
+class FakeLLMError(Exception):
+    """Injected provider failure carrying an HTTP status like the real client"""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"Fake LLM error {status_code}")
+        self.status_code = status_code
+
+
+class FakeChatModel:
+    """Offline stand-in for ChatOpenAI with deterministic replies
+
+    The reply to a prompt is always the same text, derived from a hash of
+    the messages. Latency is drawn from a fixed, uniform or lognormal
+    distribution around `latency_mean`, and a share of calls can fail
+    with `error_status`. Streaming splits the reply into small chunks.
+    """
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        latency: Optional[str] = None,
+        latency_mean: Optional[float] = None,
+        latency_sigma: Optional[float] = None,
+        error_rate: Optional[float] = None,
+        error_status: Optional[int] = None,
+        reply_words: Optional[int] = None,
+        seed: Optional[int] = None,
+    ):
+        self.model = model or settings.OPENAI_MODEL
+        self.max_tokens = max_tokens or settings.OPENAI_MAX_TOKENS
+        self.latency = latency or settings.FAKE_LLM_LATENCY
+        self.latency_mean = (
+            latency_mean if latency_mean is not None else settings.FAKE_LLM_LATENCY_MEAN
+        )
+        self.latency_sigma = (
+            latency_sigma
+            if latency_sigma is not None
+            else settings.FAKE_LLM_LATENCY_SIGMA
+        )
+        self.error_rate = (
+            error_rate if error_rate is not None else settings.FAKE_LLM_ERROR_RATE
+        )
+        self.error_status = error_status or settings.FAKE_LLM_ERROR_STATUS
+        self.reply_words = reply_words or settings.FAKE_LLM_REPLY_WORDS
+        self.random = random.Random(
+            seed if seed is not None else settings.FAKE_LLM_SEED
+        )
+        self.calls = 0
+
+    def sample_latency(self) -> float:
+        """Seconds the next call takes"""
+        if self.latency_mean <= 0:
+            return 0.0
+        if self.latency == "fixed":
+            return self.latency_mean
+        if self.latency == "uniform":
+            return self.random.uniform(0, 2 * self.latency_mean)
+        # Lognormal with the configured mean: mu = ln(mean) - sigma^2 / 2
+        sigma = self.latency_sigma
+        mu = math.log(self.latency_mean) - sigma * sigma / 2
+        return self.random.lognormvariate(mu, sigma)
+
+    def reply(
+        self, messages: List[BaseMessage], max_tokens: Optional[int] = None
+    ) -> str:
+        """Deterministic reply text for a conversation"""
+        prompt = "\n".join(str(message.content) for message in messages)
+        digest = hashlib.sha256(f"{self.model}\n{prompt}".encode()).digest()
+        words = min(self.reply_words, max(1, max_tokens or self.max_tokens))
+        return " ".join(
+            WORDS[digest[i % len(digest)] % len(WORDS)] for i in range(words)
+        )
+
+    def _maybe_fail(self):
+        if self.error_rate > 0 and self.random.random() < self.error_rate:
+            raise FakeLLMError(self.error_status)
+
+    async def ainvoke(self, messages: List[BaseMessage], **kwargs) -> AIMessage:
+        self.calls += 1
+        await asyncio.sleep(self.sample_latency())
+        self._maybe_fail()
+        return AIMessage(content=self.reply(messages, kwargs.get("max_tokens")))
+
+    async def astream(
+        self, messages: List[BaseMessage], **kwargs
+    ) -> AsyncIterator[AIMessageChunk]:
+        self.calls += 1
+        text = self.reply(messages, kwargs.get("max_tokens"))
+        size = settings.FAKE_LLM_CHUNK_CHARS
+        chunks = [text[i : i + size] for i in range(0, len(text), size)]
+        # Time to first chunk, then the rest of the latency spread evenly
+        total = self.sample_latency()
+        await asyncio.sleep(total / 2)
+        self._maybe_fail()
+        for chunk in chunks:
+            yield AIMessageChunk(content=chunk)
+            await asyncio.sleep(total / 2 / len(chunks))
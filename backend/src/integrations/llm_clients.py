@@ -0,0 +1,132 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from ..core.config import settings
+from .fake_llm import FakeChatModel
+
+logger = logging.getLogger(__name__)
+
+ClientKey = Tuple[str, float, int]
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Connection pool shared by every model client"""
+    return httpx.AsyncClient(
+        http2=settings.LLM_HTTP2,
+        limits=httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            settings.LLM_HTTP_TIMEOUT, connect=settings.LLM_HTTP_CONNECT_TIMEOUT
+        ),
+    )
+
+
+class LLMClientRegistry:
+    """Chat model clients cached per (model, temperature, max_tokens)
+
+    The key holds the max_tokens a task requested; calls clipped to fit
+    the context window pass their own limit at invoke time.
+
+    All clients send their requests through one pooled async HTTP client,
+    so a task asking for a different model reuses the open connections.
+    Clients unused for `idle_ttl` seconds are dropped.
+    """
+
+    def __init__(
+        self,
+        idle_ttl: Optional[float] = None,
+        max_clients: Optional[int] = None,
+        factory: Optional[Callable[..., Any]] = None,
+    ):
+        self.idle_ttl = (
+            idle_ttl if idle_ttl is not None else settings.LLM_CLIENT_IDLE_TTL
+        )
+        self.max_clients = max_clients or settings.LLM_CLIENT_MAX
+        self.factory = factory or self._create_client
+        self.http_client: Optional[httpx.AsyncClient] = None
+        # key -> (client, last used)
+        self.clients: "OrderedDict[ClientKey, Tuple[Any, float]]" = OrderedDict()
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+
+    def _create_client(self, model: str, temperature: float, max_tokens: int):
+        if settings.LLM_BACKEND == "fake":
+            return FakeChatModel(
+                model=model, temperature=temperature, max_tokens=max_tokens
+            )
+        if self.http_client is None:
+            self.http_client = create_http_client()
+        return ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            api_key=settings.OPENAI_API_KEY,
+            http_async_client=self.http_client,
+            # Retries are handled by the executor's LLMGovernor
+            max_retries=0,
+        )
+
+    def get(
+        self,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+    ):
+        """Get the client for a configuration, creating it on first use"""
+        key = (
+            model or settings.OPENAI_MODEL,
+            temperature if temperature is not None else settings.OPENAI_TEMPERATURE,
+            max_tokens or settings.OPENAI_MAX_TOKENS,
+        )
+        now = time.monotonic()
+        self._evict_idle(now)
+
+        entry = self.clients.get(key)
+        if entry is not None:
+            client = entry[0]
+            self.clients.move_to_end(key)
+            self.reused += 1
+        else:
+            client = self.factory(model=key[0], temperature=key[1], max_tokens=key[2])
+            self.created += 1
+            logger.debug(f"Created LLM client for {key}")
+        self.clients[key] = (client, now)
+
+        while len(self.clients) > self.max_clients:
+            self.clients.popitem(last=False)
+            self.evicted += 1
+        return client
+
+    def _evict_idle(self, now: float):
+        while self.clients:
+            key, (_, last_used) = next(iter(self.clients.items()))
+            if now - last_used < self.idle_ttl:
+                break
+            del self.clients[key]
+            self.evicted += 1
+
+    async def close(self):
+        """Drop all clients and close the shared connection pool"""
+        self.clients.clear()
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get client counts and reuse"""
+        return {
+            "clients": len(self.clients),
+            "created": self.created,
+            "reused": self.reused,
+            "evicted": self.evicted,
+            "http2": settings.LLM_HTTP2,
+        }
@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SemanticMatch:
+    """A past task whose prompt is close to the incoming one"""
+
+    task_id: str
+    prompt: str
+    similarity: float
+    plan: Optional[str]
+    output: Optional[str]
+    duration: float
+
+
+class SemanticCache:
+    """Near-duplicate prompt lookup backed by a ChromaDB collection
+
+    Lookups and inserts are queued and sent to Chroma in batches from a
+    worker thread, so embedding never runs on the event loop and bursts
+    of similar requests share a single query.
+    """
+
+    def __init__(
+        self,
+        persist_directory: Optional[str] = None,
+        threshold: Optional[float] = None,
+        batch_window: Optional[float] = None,
+        max_batch: Optional[int] = None,
+        embedding_function=None,
+    ):
+        self.persist_directory = persist_directory or settings.CHROMA_PERSIST_DIRECTORY
+        self.threshold = threshold or settings.SEMANTIC_CACHE_THRESHOLD
+        self.batch_window = (
+            batch_window
+            if batch_window is not None
+            else settings.SEMANTIC_CACHE_BATCH_WINDOW
+        )
+        self.max_batch = max_batch or settings.SEMANTIC_CACHE_MAX_BATCH
+        self.embedding_function = embedding_function
+        self.collection = None
+        self.pending_lookups: List[Tuple[str, str, asyncio.Future]] = []
+        self.pending_adds: List[Tuple[str, str, Dict[str, Any]]] = []
+        self._batcher: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+        # Metrics
+        self.lookups = 0
+        self.hits = 0
+        self.errors = 0
+        self.similarity_sum = 0.0
+        self.saved_seconds = 0.0
+
+    def _get_collection(self):
+        """Open the Chroma collection (blocking, runs in a worker thread)"""
+        if self.collection is None:
+            import chromadb
+
+            client = chromadb.PersistentClient(path=self.persist_directory)
+            options = {"metadata": {"hnsw:space": "cosine"}}
+            if self.embedding_function is not None:
+                options["embedding_function"] = self.embedding_function
+            self.collection = client.get_or_create_collection(
+                settings.SEMANTIC_CACHE_COLLECTION, **options
+            )
+        return self.collection
+
+    def _ensure_batcher(self):
+        if self._batcher is None or self._batcher.done():
+            self._batcher = asyncio.create_task(self._batch_loop())
+
+    async def close(self):
+        """Flush queued inserts and lookups and stop the batcher"""
+        if self._batcher is not None:
+            self._batcher.cancel()
+            await asyncio.gather(self._batcher, return_exceptions=True)
+            self._batcher = None
+        # Each batch takes at most max_batch of each, so run until drained
+        while self.pending_adds or self.pending_lookups:
+            try:
+                await self._run_batch()
+            except Exception as e:
+                logger.error(f"Semantic cache batch failed: {str(e)}")
+
+    async def lookup(self, prompt: str, context: str) -> Optional[SemanticMatch]:
+        """Find a past task with a prompt above the similarity threshold
+
+        `context` identifies the model settings; only tasks run with the
+        same context can match.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.pending_lookups.append((prompt, context, future))
+        self._ensure_batcher()
+        self._wakeup.set()
+
+        self.lookups += 1
+        try:
+            match = await future
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Semantic cache lookup failed: {str(e)}")
+            return None
+
+        if match is not None:
+            self.hits += 1
+            self.similarity_sum += match.similarity
+            self.saved_seconds += match.duration
+        return match
+
+    def add(
+        self,
+        task_id: str,
+        prompt: str,
+        context: str,
+        plan: Optional[str],
+        output: Optional[str],
+        duration: float,
+    ):
+        """Queue a finished task for insertion"""
+        metadata = {
+            "context": context,
+            "plan": plan or "",
+            "output": output or "",
+            "duration": duration,
+            "created_at": time.time(),
+        }
+        self.pending_adds.append((task_id, prompt, metadata))
+        self._ensure_batcher()
+        self._wakeup.set()
+
+    async def _batch_loop(self):
+        """Collect requests for a short window, then run them together"""
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.batch_window)
+            self._wakeup.clear()
+            try:
+                await self._run_batch()
+            except Exception as e:
+                logger.error(f"Semantic cache batch failed: {str(e)}")
+
+    async def _run_batch(self):
+        lookups = self.pending_lookups[: self.max_batch]
+        self.pending_lookups = self.pending_lookups[self.max_batch :]
+        adds = self.pending_adds[: self.max_batch]
+        self.pending_adds = self.pending_adds[self.max_batch :]
+        if self.pending_lookups or self.pending_adds:
+            self._wakeup.set()
+
+        try:
+            matches = await asyncio.to_thread(
+                self._run_batch_sync, [lookup[:2] for lookup in lookups], adds
+            )
+        except Exception as e:
+            for _, _, future in lookups:
+                if not future.done():
+                    future.set_exception(e)
+            raise
+
+        for (_, _, future), match in zip(lookups, matches):
+            if not future.done():
+                future.set_result(match)
+
+    def _run_batch_sync(
+        self,
+        lookups: List[Tuple[str, str]],
+        adds: List[Tuple[str, str, Dict[str, Any]]],
+    ) -> List[Optional[SemanticMatch]]:
+        """Query and insert against Chroma (blocking)"""
+        collection = self._get_collection()
+        matches: List[Optional[SemanticMatch]] = [None] * len(lookups)
+
+        if adds:
+            collection.upsert(
+                ids=[task_id for task_id, _, _ in adds],
+                documents=[prompt for _, prompt, _ in adds],
+                metadatas=[metadata for _, _, metadata in adds],
+            )
+
+        count = collection.count()
+        if lookups and count > 0:
+            # One embedding call and one query for the whole batch; a few
+            # neighbours per prompt leave room for context mismatches
+            results = collection.query(
+                query_texts=[prompt for prompt, _ in lookups],
+                n_results=min(count, settings.SEMANTIC_CACHE_CANDIDATES),
+                include=["documents", "metadatas", "distances"],
+            )
+            for i, (_, context) in enumerate(lookups):
+                candidates = zip(
+                    results["ids"][i],
+                    results["documents"][i],
+                    results["metadatas"][i],
+                    results["distances"][i],
+                )
+                for task_id, document, metadata, distance in candidates:
+                    similarity = 1.0 - distance
+                    if similarity < self.threshold:
+                        break
+                    if metadata.get("context") != context:
+                        continue
+                    matches[i] = SemanticMatch(
+                        task_id=task_id,
+                        prompt=document,
+                        similarity=similarity,
+                        plan=metadata.get("plan") or None,
+                        output=metadata.get("output") or None,
+                        duration=float(metadata.get("duration", 0.0)),
+                    )
+                    break
+
+        return matches
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get hit rate, mean similarity of hits and estimated time saved"""
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "errors": self.errors,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0,
+            "average_similarity": self.similarity_sum / self.hits if self.hits else 0,
+            "saved_seconds": self.saved_seconds,
+            "threshold": self.threshold,
+        }
@@ -3,12 +3,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
 
-from .routers import tasks, status
+from .routers import tasks, status, metrics
 from .core.config import settings
 from .core.logging import setup_logging
+from .core.metrics import MetricsMiddleware
+from .core.tracing import setup_tracing
+from .core.dependencies import get_task_service, get_task_store
 
 # Setup logging
 setup_logging()
+setup_tracing()
 logger = logging.getLogger(__name__)
 
 
@@ -17,9 +21,14 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     # Startup
     logger.info("Starting TaskFlow API server...")
+    await get_task_store().start()
+    await get_task_service().start()
+    await get_task_service().resume_tasks()
     yield
     # Shutdown
     logger.info("Shutting down TaskFlow API server...")
+    await get_task_service().close()
+    await get_task_store().close()
 
 
 app = FastAPI(
@@ -36,11 +45,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Next-Step", "ETag", "Retry-After"],
 )
+app.add_middleware(MetricsMiddleware)
 
 # Include routers
 app.include_router(tasks.router, prefix="/api/v1", tags=["tasks"])
 app.include_router(status.router, prefix="/api/v1", tags=["status"])
+app.include_router(metrics.router, tags=["metrics"])
 
 
 @app.get("/")
@@ -0,0 +1,148 @@
+import sys
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+import orjson
+
+from ..schemas.step import StepLog, StepStatus
+from ..schemas.task import TaskResult, TaskStatus
+from ..core.config import settings
+
+# Text held as str, or as zlib-compressed UTF-8 once it is large and final
+Text = Union[str, bytes, None]
+
+# Rough per-object overhead counted by approx_bytes()
+TASK_OVERHEAD = 200
+STEP_OVERHEAD = 150
+
+
+def pack_text(text: Optional[str]) -> Text:
+    """Compress text of at least STORE_COMPRESS_MIN_BYTES when it helps"""
+    minimum = settings.STORE_COMPRESS_MIN_BYTES
+    if text is None or minimum <= 0 or len(text) < minimum:
+        return text
+    raw = text.encode()
+    packed = zlib.compress(raw, settings.STORE_COMPRESS_LEVEL)
+    return packed if len(packed) < len(raw) else text
+
+
+def unpack_text(text: Text) -> Optional[str]:
+    """Text stored by pack_text"""
+    if isinstance(text, bytes):
+        return zlib.decompress(text).decode()
+    return text
+
+
+def _json_size(value: Optional[Dict[str, Any]]) -> int:
+    return len(orjson.dumps(value, default=str)) if value else 0
+
+
+@dataclass(slots=True)
+class StepRecord:
+    """Stored form of a StepLog
+
+    The task id is implied by the list the record lives in, step names
+    are interned, and long messages (such as plans) are compressed.
+    """
+
+    id: str
+    step_name: str
+    status: StepStatus
+    message: Text = None
+    details: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    duration: Optional[float] = None
+    progress: Optional[float] = None
+
+    @classmethod
+    def from_log(cls, step: StepLog) -> "StepRecord":
+        return cls(
+            id=step.id,
+            step_name=sys.intern(step.step_name),
+            status=step.status,
+            message=pack_text(step.message),
+            details=step.details,
+            error=step.error,
+            started_at=step.started_at,
+            completed_at=step.completed_at,
+            duration=step.duration,
+            progress=step.progress,
+        )
+
+    def to_log(self, task_id: str) -> StepLog:
+        # The fields were validated when the step was recorded
+        return StepLog.model_construct(
+            id=self.id,
+            task_id=task_id,
+            step_name=self.step_name,
+            status=self.status,
+            message=unpack_text(self.message),
+            details=self.details,
+            error=self.error,
+            started_at=self.started_at,
+            completed_at=self.completed_at,
+            duration=self.duration,
+            progress=self.progress,
+        )
+
+    def approx_bytes(self) -> int:
+        return (
+            STEP_OVERHEAD
+            + len(self.id)
+            + len(self.message or "")
+            + len(self.error or "")
+            + _json_size(self.details)
+        )
+
+
+@dataclass(slots=True)
+class TaskRecord:
+    """Stored form of a TaskResult without its steps
+
+    Metadata stays None until something is recorded in it, and the
+    output is compressed once the task finishes.
+    """
+
+    id: str
+    status: TaskStatus
+    output: Text = None
+    error: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    duration: Optional[float] = None
+
+    def update_metadata(self, metadata: Dict[str, Any]):
+        if self.metadata is None:
+            self.metadata = {}
+        self.metadata.update(metadata)
+
+    def get_output(self) -> Optional[str]:
+        return unpack_text(self.output)
+
+    def to_result(self, steps: List[StepRecord]) -> TaskResult:
+        """API model of the task with the given steps attached"""
+        return TaskResult.model_construct(
+            id=self.id,
+            status=self.status,
+            output=unpack_text(self.output),
+            error=self.error,
+            steps=[step.to_log(self.id) for step in steps],
+            metadata=dict(self.metadata or {}),
+            started_at=self.started_at,
+            completed_at=self.completed_at,
+            duration=self.duration,
+        )
+
+    def approx_bytes(self) -> int:
+        return (
+            TASK_OVERHEAD
+            + len(self.id)
+            + len(self.output or "")
+            + len(self.error or "")
+            + _json_size(self.metadata)
+        )
@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+
+from ..core.metrics import CONTENT_TYPE_LATEST, render_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Prometheus metrics (runs in the threadpool, off the event loop)"""
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
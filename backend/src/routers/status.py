@@ -1,32 +1,29 @@
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Dict, Any, Optional
+from datetime import datetime
 import logging
 
 from ..services.task_service import TaskService
+from ..core.dependencies import get_task_service
+from ..storage.statistics import WINDOWS
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Initialize task service
-task_service = TaskService()
-
 
 @router.get("/status")
-async def get_system_status():
+async def get_system_status(task_service: TaskService = Depends(get_task_service)):
     """Get overall system status"""
     try:
         # Get task statistics
         stats = await task_service.get_statistics()
 
+        service_status = task_service.get_service_status()
         return {
             "status": "healthy",
-            "services": {
-                "api": "running",
-                "task_executor": "running",
-                "ai_services": "available",
-            },
+            "services": service_status["services"],
             "statistics": stats,
-            "uptime": "running",
+            "uptime": service_status["uptime"],
         }
     except Exception as e:
         logger.error(f"Error getting system status: {str(e)}")
@@ -34,10 +31,18 @@ async def get_system_status():
 
 
 @router.get("/status/tasks")
-async def get_task_statistics():
-    """Get detailed task statistics"""
+async def get_task_statistics(
+    window: Optional[str] = None,
+    task_service: TaskService = Depends(get_task_service),
+):
+    """Get detailed task statistics, optionally for a window (5m, 1h, 24h)"""
+    if window is not None and window not in WINDOWS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported window, use one of: {', '.join(WINDOWS)}",
+        )
     try:
-        stats = await task_service.get_statistics()
+        stats = await task_service.get_statistics(window)
         return stats
     except Exception as e:
         logger.error(f"Error getting task statistics: {str(e)}")
@@ -47,4 +52,4 @@ async def get_task_statistics():
 @router.get("/status/health")
 async def health_check():
     """Simple health check endpoint"""
-    return {"status": "healthy", "timestamp": "2024-01-01T00:00:00Z"}
+    return {"status": "healthy", "timestamp": datetime.utcnow().isoformat() + "Z"}
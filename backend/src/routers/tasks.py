@@ -1,25 +1,56 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from typing import List
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from datetime import datetime, timezone
+from typing import List, Optional
+from pydantic import TypeAdapter, ValidationError
+import orjson
 import uuid
 import logging
 
-from ..schemas.task import TaskRequest, TaskResponse, TaskResult, TaskStatus
+from ..schemas.task import (
+    BatchResponse,
+    BatchStatus,
+    TaskRequest,
+    TaskResponse,
+    TaskResult,
+    TaskStatus,
+)
 from ..services.task_service import TaskService
+from ..services.scheduler import QueueFullError
 from ..core.config import settings
+from ..core.dependencies import get_task_service
+from ..utils.etag import etag_matches, next_step, task_etag
+from ..utils.pagination import decode_cursor, encode_cursor
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
-# Initialize task service
-task_service = TaskService()
+TASK_FIELDS = set(TaskResult.model_fields)
+
+task_request_list = TypeAdapter(List[TaskRequest])
 
 
 @router.post("/tasks", response_model=TaskResponse)
-async def create_task(task_request: TaskRequest, background_tasks: BackgroundTasks):
-    """Create and start a new task"""
+async def create_task(
+    task_request: TaskRequest,
+    task_service: TaskService = Depends(get_task_service),
+):
+    """Create and queue a new task"""
     try:
         task_id = str(uuid.uuid4())
 
+        # Admit task to the execution queue
+        await task_service.submit_task(task_id, task_request)
+
         # Create task response
         response = TaskResponse(
             id=task_id,
@@ -28,27 +59,155 @@ async def create_task(task_request: TaskRequest, background_tasks: BackgroundTas
             estimated_duration=settings.MAX_TASK_DURATION,
         )
 
-        # Add task to background execution
-        background_tasks.add_task(task_service.execute_task, task_id, task_request)
-
         logger.info(
             f"Created task {task_id} with prompt: {task_request.prompt[:100]}..."
         )
         return response
 
+    except QueueFullError as e:
+        logger.warning("Rejected task: execution queue is full")
+        raise HTTPException(
+            status_code=429,
+            detail="Task queue is full, retry later",
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except Exception as e:
         logger.error(f"Error creating task: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to create task")
 
 
+@router.post("/tasks:batch", response_model=BatchResponse)
+async def create_task_batch(
+    request: Request, task_service: TaskService = Depends(get_task_service)
+):
+    """Create and queue many tasks from a JSON array or an NDJSON body"""
+    body = await request.body()
+    task_requests = _parse_batch(body, request.headers.get("content-type", ""))
+    if not task_requests:
+        raise HTTPException(status_code=400, detail="Batch is empty")
+    if len(task_requests) > settings.TASK_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {settings.TASK_BATCH_MAX_SIZE} tasks",
+        )
+
+    try:
+        batch_id, task_ids = await task_service.submit_batch(task_requests)
+        logger.info(f"Created batch {batch_id} with {len(task_ids)} tasks")
+        return BatchResponse(
+            batch_id=batch_id,
+            task_ids=task_ids,
+            status=TaskStatus.PENDING,
+            message="Tasks created and queued for execution",
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except QueueFullError as e:
+        logger.warning("Rejected batch: execution queue is full")
+        raise HTTPException(
+            status_code=429,
+            detail="Task queue is full, retry later",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except Exception as e:
+        logger.error(f"Error creating batch: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to create batch")
+
+
+def _parse_batch(body: bytes, content_type: str) -> List[TaskRequest]:
+    """Validate a JSON array or NDJSON lines of task requests in one pass"""
+    try:
+        if "ndjson" in content_type or "jsonlines" in content_type:
+            lines = [line for line in body.splitlines() if line.strip()]
+            return task_request_list.validate_json(b"[" + b",".join(lines) + b"]")
+        return task_request_list.validate_json(body)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=422, detail=e.errors(include_url=False, include_input=False)
+        )
+
+
+@router.get("/batches/{batch_id}", response_model=BatchStatus)
+async def get_batch_status(
+    batch_id: str, task_service: TaskService = Depends(get_task_service)
+):
+    """Get per-status counts and overall progress of a batch"""
+    try:
+        result = await task_service.get_batch_status(batch_id)
+        if not result:
+            raise HTTPException(status_code=404, detail="Batch not found")
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting batch status for {batch_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to get batch status")
+
+
+@router.get("/batches/{batch_id}/tasks", response_model=List[TaskResult])
+async def list_batch_tasks(
+    batch_id: str,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    task_service: TaskService = Depends(get_task_service),
+):
+    """List the tasks of a batch"""
+    try:
+        return await task_service.list_batch_tasks(batch_id, limit, offset)
+    except Exception as e:
+        logger.error(f"Error listing tasks of batch {batch_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to list batch tasks")
+
+
 @router.get("/tasks/{task_id}/status", response_model=TaskResult)
-async def get_task_status(task_id: str):
-    """Get the current status of a task"""
+async def get_task_status(
+    task_id: str,
+    request: Request,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. status,output"
+    ),
+    since_step: int = Query(
+        0, ge=0, description="Steps to skip; pass back X-Next-Step"
+    ),
+    task_service: TaskService = Depends(get_task_service),
+):
+    """Get the current status of a task
+
+    Responses carry an ETag; a request whose If-None-Match matches gets
+    `304 Not Modified` without a body. X-Next-Step is the index of the
+    first unfinished step, since steps are updated in place until they
+    finish.
+    """
+    include = None
+    if fields:
+        include = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = include - TASK_FIELDS
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+            )
+        include.add("id")
+
     try:
         result = await task_service.get_task_status(task_id)
         if not result:
             raise HTTPException(status_code=404, detail="Task not found")
-        return result
+
+        etag = task_etag(result, f"{fields or ''}|{since_step}")
+        headers = {
+            "ETag": etag,
+            "Cache-Control": "no-cache",
+            "X-Next-Step": str(next_step(result.steps)),
+        }
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        if since_step:
+            result = result.model_copy(update={"steps": result.steps[since_step:]})
+        # Returning the response directly skips re-validating the model
+        return ORJSONResponse(result.model_dump(include=include), headers=headers)
     except HTTPException:
         raise
     except Exception as e:
@@ -56,8 +215,72 @@ async def get_task_status(task_id: str):
         raise HTTPException(status_code=500, detail="Failed to get task status")
 
 
+@router.get("/tasks/{task_id}/output")
+async def get_task_output(
+    task_id: str,
+    offset: int = Query(0, ge=0, description="Characters already received"),
+    task_service: TaskService = Depends(get_task_service),
+):
+    """Get output streamed since `offset`; pass back the returned offset"""
+    try:
+        result = await task_service.get_task_output(task_id, offset)
+        if not result:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting task output for {task_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to get task output")
+
+
+@router.get("/tasks/{task_id}/events")
+async def stream_task_events(
+    task_id: str, task_service: TaskService = Depends(get_task_service)
+):
+    """Stream task step/output events and the final result as Server-Sent Events"""
+    if not await task_service.get_task_status(task_id):
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    async def event_source():
+        async for event in task_service.stream_events(task_id):
+            if event["type"] == "keepalive":
+                yield ": keepalive\n\n"
+                continue
+            data = orjson.dumps(event["data"]).decode()
+            yield f"event: {event['type']}\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/tasks/{task_id}/ws")
+async def task_events_websocket(
+    websocket: WebSocket,
+    task_id: str,
+    task_service: TaskService = Depends(get_task_service),
+):
+    """Stream task step/output events and the final result over a WebSocket"""
+    await websocket.accept()
+    if not await task_service.get_task_status(task_id):
+        await websocket.close(code=4404, reason="Task not found")
+        return
+
+    try:
+        async for event in task_service.stream_events(task_id):
+            await websocket.send_json(event)
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.debug(f"Event subscriber for task {task_id} disconnected")
+
+
 @router.post("/tasks/{task_id}/cancel")
-async def cancel_task(task_id: str):
+async def cancel_task(
+    task_id: str, task_service: TaskService = Depends(get_task_service)
+):
     """Cancel a running task"""
     try:
         success = await task_service.cancel_task(task_id)
@@ -75,11 +298,46 @@ async def cancel_task(task_id: str):
 
 
 @router.get("/tasks", response_model=List[TaskResult])
-async def list_tasks(limit: int = 10, offset: int = 0):
-    """List recent tasks"""
+async def list_tasks(
+    response: Response,
+    limit: int = Query(10, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+    status: Optional[TaskStatus] = None,
+    started_after: Optional[datetime] = None,
+    started_before: Optional[datetime] = None,
+    task_service: TaskService = Depends(get_task_service),
+):
+    """List recent tasks, newest first
+
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the
+    next page.
+    """
+    try:
+        position = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
     try:
-        tasks = await task_service.list_tasks(limit=limit, offset=offset)
+        tasks = await task_service.list_tasks(
+            limit=limit,
+            offset=offset,
+            cursor=position,
+            status=status,
+            started_after=_to_naive_utc(started_after),
+            started_before=_to_naive_utc(started_before),
+        )
+        if len(tasks) == limit:
+            last = tasks[-1]
+            response.headers["X-Next-Cursor"] = encode_cursor(last.started_at, last.id)
         return tasks
     except Exception as e:
         logger.error(f"Error listing tasks: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to list tasks")
+
+
+def _to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert a query timestamp to the naive UTC used by the store"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 from enum import Enum
 
@@ -61,3 +61,26 @@ class TaskResult(BaseModel):
         None, description="Task completion timestamp"
     )
     duration: Optional[float] = Field(None, description="Task duration in seconds")
+
+
+class BatchResponse(BaseModel):
+    """Response schema for a batch submission"""
+
+    batch_id: str = Field(..., description="Batch identifier")
+    task_ids: List[str] = Field(..., description="Task IDs in submission order")
+    status: TaskStatus = Field(..., description="Status of every new task")
+    message: Optional[str] = Field(None, description="Status message")
+    created_at: datetime = Field(
+        default_factory=datetime.utcnow, description="Batch creation timestamp"
+    )
+
+
+class BatchStatus(BaseModel):
+    """Aggregate progress of a batch"""
+
+    batch_id: str = Field(..., description="Batch identifier")
+    total: int = Field(..., description="Number of tasks in the batch")
+    statuses: Dict[str, int] = Field(..., description="Task count per status")
+    finished: int = Field(..., description="Tasks in a terminal status")
+    progress: float = Field(..., description="Fraction of tasks finished")
+    complete: bool = Field(..., description="Whether every task has finished")
@@ -0,0 +1,58 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EventHub:
+    """In-process pub/sub of task events
+
+    Each subscriber gets its own bounded queue. A slow subscriber loses
+    its oldest events rather than blocking the publisher.
+    """
+
+    def __init__(self, queue_size: Optional[int] = None):
+        self.queue_size = queue_size or settings.EVENT_QUEUE_SIZE
+        self.subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, task_id: str) -> asyncio.Queue:
+        """Register a subscriber for a task's events"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.setdefault(task_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, task_id: str, queue: asyncio.Queue):
+        """Remove a subscriber"""
+        queues = self.subscribers.get(task_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self.subscribers[task_id]
+
+    def publish(self, task_id: str, event_type: str, data: Dict[str, Any]):
+        """Deliver an event to every subscriber of a task"""
+        queues = self.subscribers.get(task_id)
+        if not queues:
+            return
+        event = {"type": event_type, "task_id": task_id, "data": data}
+        for queue in queues:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(event)
+        self.published += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get subscriber and delivery counts"""
+        return {
+            "subscribed_tasks": len(self.subscribers),
+            "subscribers": sum(len(q) for q in self.subscribers.values()),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,265 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from ..schemas.task import TaskRequest
+from ..core.config import settings
+from ..core.metrics import QUEUE_WAIT
+from .scheduler import QueueFullError, TaskRunner, get_task_priority
+from .work_queue import BaseWorkQueue, Lease
+
+logger = logging.getLogger(__name__)
+
+
+class LeasedTaskScheduler:
+    """Scheduler backed by a work queue shared between processes
+
+    Tasks submitted on any node go into the shared queue. Workers lease
+    them, send a heartbeat every third of the visibility timeout, and
+    delete them once the runner returns. A worker that loses its lease,
+    because the task was cancelled elsewhere or the lease expired, stops
+    running the task. A task leased more than `max_attempts` times is
+    handed to `on_exhausted` instead of being run again.
+    """
+
+    distributed = True
+
+    def __init__(
+        self,
+        runner: TaskRunner,
+        queue: BaseWorkQueue,
+        on_exhausted: Optional[Callable[[str, int], Awaitable[Any]]] = None,
+        max_workers: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+        run_workers: Optional[bool] = None,
+        visibility_timeout: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        self.runner = runner
+        self.queue = queue
+        self.on_exhausted = on_exhausted
+        self.max_workers = max_workers or settings.MAX_CONCURRENT_TASKS
+        self.max_queue_size = (
+            max_queue_size
+            if max_queue_size is not None
+            else settings.TASK_QUEUE_MAX_SIZE
+        )
+        self.run_workers = (
+            run_workers if run_workers is not None else settings.TASK_QUEUE_RUN_WORKERS
+        )
+        self.visibility_timeout = (
+            visibility_timeout or settings.TASK_QUEUE_VISIBILITY_TIMEOUT
+        )
+        self.poll_interval = poll_interval or settings.TASK_QUEUE_POLL_INTERVAL
+        self.max_attempts = max_attempts or settings.TASK_QUEUE_MAX_ATTEMPTS
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.workers: List[asyncio.Task] = []
+        self.started = False
+        self._wakeup: Optional[asyncio.Event] = None
+
+        # Metrics
+        self.active = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.processed = 0
+        self.lost_leases = 0
+        self.exhausted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self.started
+
+    def start(self):
+        """Start leasing tasks, unless this node only accepts them"""
+        if self.started:
+            return
+        self.started = True
+        self._wakeup = asyncio.Event()
+        if not self.run_workers:
+            # Keep the queue depth current without leasing anything
+            self.workers = [asyncio.create_task(self._monitor(), name="task-monitor")]
+            logger.info("Task scheduler started without workers (API-only node)")
+            return
+        self.workers = [
+            asyncio.create_task(self._worker(i), name=f"task-worker-{i}")
+            for i in range(self.max_workers)
+        ]
+        logger.info(
+            f"Task scheduler {self.worker_id} started with {self.max_workers} "
+            f"workers on the shared queue"
+        )
+
+    async def stop(self):
+        """Stop the workers, handing running tasks back to the queue"""
+        if not self.started:
+            return
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        self.started = False
+        await self.queue.close()
+        logger.info("Task scheduler stopped")
+
+    async def submit(
+        self,
+        task_id: str,
+        task_request: TaskRequest,
+        priority: Optional[int] = None,
+    ):
+        """Add a task to the shared queue or raise QueueFullError"""
+        if priority is None:
+            priority = get_task_priority(task_request)
+        await self._enqueue([(task_id, task_request, priority)])
+
+    async def submit_many(self, tasks: List[Tuple[str, TaskRequest]]):
+        """Add all tasks together, or none of them with QueueFullError"""
+        await self._enqueue(
+            [
+                (task_id, task_request, get_task_priority(task_request))
+                for task_id, task_request in tasks
+            ]
+        )
+
+    async def _enqueue(self, items):
+        if not self.started:
+            self.start()
+        if not await self.queue.enqueue(items, self.max_queue_size):
+            self.rejected += len(items)
+            raise QueueFullError(self.retry_after())
+        self.submitted += len(items)
+        self._wakeup.set()
+
+    async def cancel(self, task_id: str) -> bool:
+        """Drop a queued task, or revoke the lease of one running elsewhere"""
+        return await self.queue.cancel(task_id)
+
+    async def contains(self, task_ids: List[str]) -> Set[str]:
+        """The task ids queued or leased in the shared queue"""
+        return await self.queue.contains(task_ids)
+
+    def depth(self) -> int:
+        """Tasks waiting in the shared queue"""
+        return self.queue.pending
+
+    def retry_after(self) -> int:
+        """Estimate seconds until a queue slot frees up"""
+        if self.processed:
+            avg_run = self.total_run / self.processed
+            estimate = avg_run * max(self.depth(), 1) / self.max_workers
+            return max(1, min(int(estimate), settings.MAX_TASK_DURATION))
+        return settings.TASK_QUEUE_RETRY_AFTER
+
+    async def _worker(self, worker_id: int):
+        """Lease tasks from the shared queue and run them"""
+        while True:
+            try:
+                lease = await self.queue.lease(self.worker_id, self.visibility_timeout)
+            except Exception as e:
+                logger.error(f"Worker {worker_id} could not lease a task: {str(e)}")
+                lease = None
+            if lease is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            if lease.attempts > self.max_attempts:
+                self.exhausted += 1
+                logger.error(
+                    f"Task {lease.task_id} abandoned after {lease.attempts - 1} attempts"
+                )
+                try:
+                    if self.on_exhausted is not None:
+                        await self.on_exhausted(lease.task_id, lease.attempts - 1)
+                finally:
+                    await self.queue.complete(lease.task_id, self.worker_id)
+                continue
+
+            wait = max(0.0, time.time() - lease.enqueued_at)
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            QUEUE_WAIT.observe(wait)
+
+            self.active += 1
+            started = time.monotonic()
+            try:
+                await self._run_lease(worker_id, lease)
+            finally:
+                self.active -= 1
+                self.processed += 1
+                self.total_run += time.monotonic() - started
+
+    async def _monitor(self):
+        """Refresh the pending count on a node that runs no workers"""
+        while True:
+            try:
+                await self.queue.count()
+            except Exception as e:
+                logger.warning(f"Could not read the task queue depth: {str(e)}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _run_lease(self, worker_id: int, lease: Lease):
+        """Run a leased task, renewing the lease until it finishes"""
+        run = asyncio.create_task(self.runner(lease.task_id, lease.task_request))
+        try:
+            while True:
+                done, _ = await asyncio.wait({run}, timeout=self.visibility_timeout / 3)
+                if done:
+                    break
+                try:
+                    held = await self.queue.heartbeat(
+                        lease.task_id, self.worker_id, self.visibility_timeout
+                    )
+                except Exception as e:
+                    logger.warning(f"Heartbeat for task {lease.task_id} failed: {e}")
+                    continue
+                if not held:
+                    self.lost_leases += 1
+                    logger.warning(
+                        f"Worker {worker_id} lost the lease of task {lease.task_id}"
+                    )
+                    run.cancel()
+                    await asyncio.gather(run, return_exceptions=True)
+                    return
+        except asyncio.CancelledError:
+            # Shutting down: let another worker pick the task up right away
+            run.cancel()
+            await asyncio.gather(run, return_exceptions=True)
+            await asyncio.shield(self.queue.release(lease.task_id, self.worker_id))
+            raise
+
+        await self.queue.complete(lease.task_id, self.worker_id)
+        if run.exception() is not None:
+            logger.error(
+                f"Worker {worker_id} failed running task {lease.task_id}: "
+                f"{str(run.exception())}"
+            )
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get queue depth, wait time and throughput metrics"""
+        return {
+            "backend": type(self.queue).__name__,
+            "worker_id": self.worker_id,
+            "workers": len(self.workers) if self.run_workers else 0,
+            "active_tasks": self.active,
+            "queue_depth": self.depth(),
+            "max_queue_size": self.max_queue_size,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "processed": self.processed,
+            "lost_leases": self.lost_leases,
+            "exhausted": self.exhausted,
+            "average_wait": self.total_wait / self.processed if self.processed else 0,
+            "max_wait": self.max_wait,
+            "average_run": self.total_run / self.processed if self.processed else 0,
+        }
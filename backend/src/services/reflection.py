@@ -0,0 +1,126 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from ..schemas.task import TaskRequest
+from ..storage.base import BaseTaskStore
+from ..agents.task_executor import TaskExecutor
+from ..core.config import settings
+from ..core.logging import log_context
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReflectionJob:
+    """A finished task waiting for its deferred reflection"""
+
+    task_id: str
+    task_request: TaskRequest
+    output: str
+
+
+class ReflectionQueue:
+    """Runs deferred reflections after their tasks have completed
+
+    Jobs only start while `is_busy` reports no waiting or running task
+    work, so reflections use spare capacity instead of delaying tasks.
+    The result is merged into the task's metadata.
+    """
+
+    def __init__(
+        self,
+        task_executor: TaskExecutor,
+        task_store: BaseTaskStore,
+        is_busy: Callable[[], bool],
+        workers: Optional[int] = None,
+        max_size: Optional[int] = None,
+    ):
+        self.task_executor = task_executor
+        self.task_store = task_store
+        self.is_busy = is_busy
+        self.max_workers = workers or settings.REFLECTION_WORKERS
+        self.max_size = max_size or settings.REFLECTION_QUEUE_SIZE
+        self.queue: Optional[asyncio.Queue] = None
+        self.workers: List[asyncio.Task] = []
+
+        # Metrics
+        self.submitted = 0
+        self.dropped = 0
+        self.completed = 0
+        self.failed = 0
+
+    def start(self):
+        """Start the reflection workers"""
+        if self.workers:
+            return
+        self.queue = asyncio.Queue(maxsize=self.max_size)
+        self.workers = [
+            asyncio.create_task(self._worker(), name=f"reflection-worker-{i}")
+            for i in range(self.max_workers)
+        ]
+
+    async def stop(self):
+        """Stop the workers, abandoning queued reflections"""
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        self.queue = None
+
+    def submit(self, task_id: str, task_request: TaskRequest, output: str) -> bool:
+        """Queue a reflection, dropping it when the queue is full"""
+        if not self.workers:
+            self.start()
+        try:
+            self.queue.put_nowait(ReflectionJob(task_id, task_request, output))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Dropped deferred reflection for task {task_id}")
+            return False
+        self.submitted += 1
+        return True
+
+    async def _worker(self):
+        while True:
+            job: ReflectionJob = await self.queue.get()
+            try:
+                while self.is_busy():
+                    await asyncio.sleep(settings.REFLECTION_IDLE_POLL)
+                await self._run(job)
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job: ReflectionJob):
+        with log_context(task_id=job.task_id, node="reflect"):
+            await self._reflect(job)
+
+    async def _reflect(self, job: ReflectionJob):
+        try:
+            reflection = await self.task_executor.reflect(
+                job.task_id, job.task_request, job.output
+            )
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Deferred reflection for task {job.task_id} failed: {str(e)}")
+            await self.task_store.update_task_metadata(
+                job.task_id, {"reflection_status": "failed"}
+            )
+            return
+        self.completed += 1
+        await self.task_store.update_task_metadata(
+            job.task_id,
+            {"reflection": reflection, "reflection_status": "completed"},
+        )
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get queue depth and job counts"""
+        return {
+            "workers": self.max_workers,
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import os
+import resource
+from typing import Any, Dict, List, Optional
+
+from ..schemas.task import TaskResult
+from ..storage.base import BaseTaskStore
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def get_process_memory() -> Dict[str, Optional[int]]:
+    """Current and peak resident set size of this process in bytes"""
+    rss = None
+    try:
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    # ru_maxrss is in kilobytes on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return {"rss_bytes": rss, "peak_rss_bytes": peak}
+
+
+class TaskArchive:
+    """Cold tier that appends evicted tasks to a JSON Lines file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.archived = 0
+
+    async def write(self, tasks: List[TaskResult]):
+        lines = "".join(task.model_dump_json() + "\n" for task in tasks)
+        await asyncio.to_thread(self._append, lines)
+        self.archived += len(tasks)
+
+    def _append(self, lines: str):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+class RetentionSweeper:
+    """Background sweeper that keeps finished tasks within retention limits
+
+    Every `interval` seconds finished tasks older than the TTL, or beyond
+    the task count or byte budget, are evicted from the store and written
+    to the archive if one is configured.
+    """
+
+    def __init__(
+        self,
+        task_store: BaseTaskStore,
+        max_tasks: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        interval: Optional[float] = None,
+        archive_path: Optional[str] = None,
+    ):
+        self.task_store = task_store
+        self.max_tasks = max_tasks or settings.RETENTION_MAX_TASKS
+        self.max_bytes = max_bytes or settings.RETENTION_MAX_BYTES
+        self.ttl = ttl if ttl is not None else settings.RETENTION_TTL
+        self.interval = interval or settings.RETENTION_SWEEP_INTERVAL
+        archive_path = (
+            archive_path
+            if archive_path is not None
+            else settings.RETENTION_ARCHIVE_PATH
+        )
+        self.archive = TaskArchive(archive_path) if archive_path else None
+        self._sweeper: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.sweeps = 0
+        self.evicted = 0
+
+    def start(self):
+        """Start the background sweep loop"""
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self):
+        """Stop the background sweep loop"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+            self._sweeper = None
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Retention sweep failed: {str(e)}")
+
+    async def sweep(self) -> int:
+        """Evict finished tasks beyond the retention limits"""
+        tasks = await self.task_store.evict_tasks(
+            self.max_tasks, self.max_bytes, self.ttl
+        )
+        self.sweeps += 1
+        if not tasks:
+            return 0
+
+        if self.archive is not None:
+            try:
+                await self.archive.write(tasks)
+            except OSError as e:
+                logger.error(f"Failed to archive {len(tasks)} tasks: {str(e)}")
+
+        self.evicted += len(tasks)
+        logger.info(f"Retention evicted {len(tasks)} finished tasks")
+        return len(tasks)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get eviction counts, store memory usage and process RSS"""
+        return {
+            "sweeps": self.sweeps,
+            "evicted": self.evicted,
+            "archived": self.archive.archived if self.archive else 0,
+            "max_tasks": self.max_tasks,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "store": self.task_store.get_memory_usage(),
+            "process": get_process_memory(),
+        }
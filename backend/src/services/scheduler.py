@@ -0,0 +1,241 @@
+import asyncio
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from ..schemas.task import TaskRequest
+from ..core.config import settings
+from ..core.metrics import QUEUE_WAIT
+
+logger = logging.getLogger(__name__)
+
+TaskRunner = Callable[[str, TaskRequest], Awaitable[Any]]
+
+# Lower value runs first
+DEFAULT_PRIORITY = 5
+MIN_PRIORITY = 0
+MAX_PRIORITY = 9
+
+
+class QueueFullError(Exception):
+    """Raised when the admission queue cannot accept more tasks"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Task queue is full")
+        self.retry_after = retry_after
+
+
+@dataclass(order=True)
+class QueuedTask:
+    """Entry in the admission queue"""
+
+    priority: int
+    sequence: int
+    task_id: str = field(compare=False)
+    task_request: TaskRequest = field(compare=False)
+    enqueued_at: float = field(compare=False, default_factory=time.monotonic)
+
+
+def get_task_priority(task_request: TaskRequest) -> int:
+    """Read the task priority from request options (0 = highest, 9 = lowest)"""
+    options = task_request.options or {}
+    try:
+        priority = int(options.get("priority", DEFAULT_PRIORITY))
+    except (TypeError, ValueError):
+        priority = DEFAULT_PRIORITY
+    return max(MIN_PRIORITY, min(MAX_PRIORITY, priority))
+
+
+class TaskScheduler:
+    """Priority admission queue with a bounded worker pool"""
+
+    # Tasks only run in this process
+    distributed = False
+
+    def __init__(
+        self,
+        runner: TaskRunner,
+        max_workers: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+    ):
+        self.runner = runner
+        self.max_workers = max_workers or settings.MAX_CONCURRENT_TASKS
+        self.max_queue_size = (
+            max_queue_size
+            if max_queue_size is not None
+            else settings.TASK_QUEUE_MAX_SIZE
+        )
+        self.queue: Optional[asyncio.PriorityQueue] = None
+        self.workers: List[asyncio.Task] = []
+        self.cancelled: Set[str] = set()
+        self.queued: Set[str] = set()
+        self._sequence = itertools.count()
+
+        # Metrics
+        self.active = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.processed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self.workers)
+
+    def start(self):
+        """Start the worker pool"""
+        if self.running:
+            return
+        # Admission is bounded by the live task count in `queued`, since
+        # cancelled entries stay in the queue until a worker skips them
+        self.queue = asyncio.PriorityQueue()
+        self.workers = [
+            asyncio.create_task(self._worker(i), name=f"task-worker-{i}")
+            for i in range(self.max_workers)
+        ]
+        logger.info(
+            f"Task scheduler started with {self.max_workers} workers "
+            f"(queue size {self.max_queue_size})"
+        )
+
+    async def stop(self):
+        """Stop the worker pool, abandoning queued tasks"""
+        if not self.running:
+            return
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        self.queue = None
+        self.queued.clear()
+        self.cancelled.clear()
+        logger.info("Task scheduler stopped")
+
+    async def submit(
+        self,
+        task_id: str,
+        task_request: TaskRequest,
+        priority: Optional[int] = None,
+    ):
+        """Admit a task to the queue or raise QueueFullError"""
+        if not self.running:
+            self.start()
+
+        if priority is None:
+            priority = get_task_priority(task_request)
+
+        if not self._has_room(1):
+            self.rejected += 1
+            raise QueueFullError(self.retry_after())
+
+        self.queue.put_nowait(
+            QueuedTask(
+                priority=priority,
+                sequence=next(self._sequence),
+                task_id=task_id,
+                task_request=task_request,
+            )
+        )
+        self.queued.add(task_id)
+        self.submitted += 1
+
+    async def submit_many(self, tasks: List[Tuple[str, TaskRequest]]):
+        """Admit all tasks together, or none of them with QueueFullError"""
+        if not self.running:
+            self.start()
+
+        if not self._has_room(len(tasks)):
+            self.rejected += len(tasks)
+            raise QueueFullError(self.retry_after())
+
+        for task_id, task_request in tasks:
+            self.queue.put_nowait(
+                QueuedTask(
+                    priority=get_task_priority(task_request),
+                    sequence=next(self._sequence),
+                    task_id=task_id,
+                    task_request=task_request,
+                )
+            )
+            self.queued.add(task_id)
+        self.submitted += len(tasks)
+
+    def _has_room(self, count: int) -> bool:
+        """Whether `count` more tasks fit within TASK_QUEUE_MAX_SIZE"""
+        if self.max_queue_size <= 0:
+            return True
+        return len(self.queued) + count <= self.max_queue_size
+
+    async def cancel(self, task_id: str) -> bool:
+        """Drop a task that is still waiting in the queue"""
+        if task_id not in self.queued:
+            return False
+        self.queued.discard(task_id)
+        self.cancelled.add(task_id)
+        return True
+
+    async def contains(self, task_ids: List[str]) -> Set[str]:
+        """The task ids waiting in the queue"""
+        return {task_id for task_id in task_ids if task_id in self.queued}
+
+    def depth(self) -> int:
+        """Tasks waiting in the queue"""
+        return len(self.queued)
+
+    def retry_after(self) -> int:
+        """Estimate seconds until a queue slot frees up"""
+        if self.processed:
+            avg_run = self.total_run / self.processed
+            depth = len(self.queued)
+            estimate = avg_run * max(depth, 1) / self.max_workers
+            return max(1, min(int(estimate), settings.MAX_TASK_DURATION))
+        return settings.TASK_QUEUE_RETRY_AFTER
+
+    async def _worker(self, worker_id: int):
+        """Pull tasks off the queue and run them"""
+        while True:
+            entry: QueuedTask = await self.queue.get()
+            try:
+                if entry.task_id in self.cancelled:
+                    self.cancelled.discard(entry.task_id)
+                    continue
+                self.queued.discard(entry.task_id)
+
+                wait = time.monotonic() - entry.enqueued_at
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+                QUEUE_WAIT.observe(wait)
+
+                self.active += 1
+                started = time.monotonic()
+                try:
+                    await self.runner(entry.task_id, entry.task_request)
+                except Exception as e:
+                    logger.error(
+                        f"Worker {worker_id} failed running task {entry.task_id}: {str(e)}"
+                    )
+                finally:
+                    self.active -= 1
+                    self.processed += 1
+                    self.total_run += time.monotonic() - started
+            finally:
+                self.queue.task_done()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get queue depth, wait time and throughput metrics"""
+        return {
+            "workers": self.max_workers,
+            "active_tasks": self.active,
+            "queue_depth": len(self.queued),
+            "max_queue_size": self.max_queue_size,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "processed": self.processed,
+            "average_wait": self.total_wait / self.processed if self.processed else 0,
+            "max_wait": self.max_wait,
+            "average_run": self.total_run / self.processed if self.processed else 0,
+        }
@@ -1,12 +1,25 @@
 import asyncio
 import logging
+import uuid
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
 from ..schemas.task import TaskRequest, TaskResult, TaskStatus
 from ..schemas.step import StepLog, StepStatus
-from ..storage.task_store import TaskStore
+from ..storage.base import BaseTaskStore
+from ..storage.statistics import TERMINAL_STATUSES
 from ..agents.task_executor import TaskExecutor
+from .scheduler import TaskScheduler, QueueFullError
+from .leased_scheduler import LeasedTaskScheduler
+from .work_queue import SQLiteWorkQueue
+from .event_hub import EventHub
+from .reflection import ReflectionQueue
+from .retention import RetentionSweeper
 from ..core.config import settings
+from ..core.logging import get_logging_metrics, log_context
+from ..core.metrics import TASK_DURATION, TASKS_IN_FLIGHT, uptime
+from ..core.rate_limiter import CircuitBreaker
+from ..core.tracing import span
+from ..utils.pagination import Cursor
 
 logger = logging.getLogger(__name__)
 
@@ -14,18 +27,138 @@ logger = logging.getLogger(__name__)
 class TaskService:
     """Service for managing task execution"""
 
-    def __init__(self):
-        self.task_store = TaskStore()
-        self.task_executor = TaskExecutor()
+    def __init__(self, task_store: BaseTaskStore, event_hub: EventHub):
+        self.task_store = task_store
+        self.event_hub = event_hub
+        self.task_executor = TaskExecutor(task_store, event_hub)
         self.active_tasks: Dict[str, asyncio.Task] = {}
+        self.scheduler = self._create_scheduler()
+        self.retention = RetentionSweeper(task_store)
+        self.reflections = ReflectionQueue(
+            self.task_executor, task_store, self._has_pending_work
+        )
+
+    def _create_scheduler(self):
+        """Scheduler for this process, sharing its queue when configured"""
+        if settings.TASK_QUEUE_BACKEND == "sqlite":
+            if settings.TASK_STORE_BACKEND != "sql":
+                logger.warning(
+                    "The shared task queue needs TASK_STORE_BACKEND=sql for other "
+                    "processes to see task status"
+                )
+            return LeasedTaskScheduler(
+                self.execute_task, SQLiteWorkQueue(), on_exhausted=self._abandon_task
+            )
+        return TaskScheduler(self.execute_task)
+
+    async def start(self):
+        """Start background workers"""
+        await self.task_executor.start()
+        self.scheduler.start()
+        self.retention.start()
+        self.reflections.start()
+
+    async def close(self):
+        """Stop background workers and release resources"""
+        await self.scheduler.stop()
+        await self.reflections.stop()
+        await self.retention.stop()
+        await self.task_executor.close()
+
+    async def submit_task(self, task_id: str, task_request: TaskRequest):
+        """Queue a task for execution by the worker pool"""
+        await self.task_store.create_task(task_id, task_request)
+        try:
+            await self.scheduler.submit(task_id, task_request)
+        except QueueFullError:
+            await self.task_store.delete_task(task_id)
+            raise
+
+    async def submit_batch(
+        self, task_requests: List[TaskRequest]
+    ) -> Tuple[str, List[str]]:
+        """Create and queue many tasks as one batch"""
+        capacity = self.scheduler.max_queue_size
+        if capacity and len(task_requests) > capacity:
+            raise ValueError(f"Batch exceeds the task queue size of {capacity}")
+        batch_id = str(uuid.uuid4())
+        tasks = [(str(uuid.uuid4()), task_request) for task_request in task_requests]
+        await self.task_store.create_tasks(tasks, batch_id=batch_id)
+        try:
+            await self.scheduler.submit_many(tasks)
+        except QueueFullError:
+            for task_id, _ in tasks:
+                await self.task_store.delete_task(task_id)
+            raise
+        return batch_id, [task_id for task_id, _ in tasks]
+
+    async def get_batch_status(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Get aggregate progress of a batch"""
+        return await self.task_store.get_batch_summary(batch_id)
+
+    async def list_batch_tasks(
+        self, batch_id: str, limit: int = 100, offset: int = 0
+    ) -> List[TaskResult]:
+        """List the tasks of a batch"""
+        return await self.task_store.list_batch_tasks(batch_id, limit, offset)
+
+    async def resume_tasks(self) -> int:
+        """Requeue tasks left pending or running by a previous process
+
+        Tasks that already made progress continue from their last graph
+        checkpoint when the checkpointer is durable.
+        """
+        unfinished = await self.task_store.list_unfinished_tasks()
+        # Tasks still in a shared queue are waiting for, or running on, a worker
+        queued = await self.scheduler.contains([task_id for task_id, _ in unfinished])
+        resumed = 0
+        for task_id, task_request in unfinished:
+            if task_id in queued:
+                continue
+            if task_request is None:
+                await self._finish_task(
+                    task_id,
+                    TaskStatus.FAILED,
+                    error="Interrupted by a restart",
+                    completed_at=datetime.utcnow(),
+                )
+                continue
+            try:
+                await self.scheduler.submit(task_id, task_request)
+                resumed += 1
+            except QueueFullError:
+                if self.scheduler.distributed:
+                    # Another process may be running; the next start retries it
+                    logger.warning(
+                        f"Task queue is full, leaving task {task_id} pending"
+                    )
+                    continue
+                await self._finish_task(
+                    task_id,
+                    TaskStatus.FAILED,
+                    error="Interrupted by a restart and the task queue is full",
+                    completed_at=datetime.utcnow(),
+                )
+        if resumed:
+            logger.info(f"Resumed {resumed} interrupted tasks")
+        return resumed
 
     async def execute_task(self, task_id: str, task_request: TaskRequest):
         """Execute a task asynchronously"""
+        with span("task.execute", {"task.id": task_id}), log_context(task_id=task_id):
+            with TASKS_IN_FLIGHT.track_inprogress():
+                await self._run_task(task_id, task_request)
+
+    async def _run_task(self, task_id: str, task_request: TaskRequest):
+        """Mark a task running and wait for it, recording failures"""
+        execution_task = None
         try:
             # Update task status to running
-            await self.task_store.update_task_status(
+            if not await self.task_store.update_task_status(
                 task_id, TaskStatus.RUNNING, started_at=datetime.utcnow()
-            )
+            ):
+                logger.info(f"Task {task_id} already finished, not running it")
+                return
 
             # Create execution task
             execution_task = asyncio.create_task(
@@ -36,15 +169,22 @@ class TaskService:
             # Wait for completion
             await execution_task
 
+        except asyncio.CancelledError:
+            # Only swallow cancellation of the task itself, not of the caller
+            cancelled = execution_task is not None and execution_task.cancelled()
+            if not cancelled or asyncio.current_task().cancelling():
+                raise
+            logger.info(f"Task {task_id} was cancelled")
         except Exception as e:
             logger.error(f"Error executing task {task_id}: {str(e)}")
-            await self.task_store.update_task_status(
+            await self._finish_task(
                 task_id, TaskStatus.FAILED, error=str(e), completed_at=datetime.utcnow()
             )
         finally:
             # Clean up active task
             if task_id in self.active_tasks:
                 del self.active_tasks[task_id]
+            self.task_executor.discard_steps(task_id)
 
     async def _execute_task_internal(self, task_id: str, task_request: TaskRequest):
         """Internal task execution logic"""
@@ -55,28 +195,224 @@ class TaskService:
             result = await self.task_executor.execute(task_id, task_request)
 
             # Update task with results
-            await self.task_store.update_task_status(
+            metadata = result.get("metadata", {})
+            if not await self._finish_task(
                 task_id,
                 TaskStatus.COMPLETED,
                 output=result.get("output"),
-                metadata=result.get("metadata", {}),
+                metadata=metadata,
                 completed_at=datetime.utcnow(),
-            )
+            ):
+                logger.info(f"Task {task_id} was finished elsewhere, dropping result")
+                return
+            if metadata.get("reflection_status") == "pending":
+                if not self.reflections.submit(
+                    task_id, task_request, result.get("output") or ""
+                ):
+                    await self.task_store.update_task_metadata(
+                        task_id, {"reflection_status": "dropped"}
+                    )
 
             duration = (datetime.utcnow() - start_time).total_seconds()
             logger.info(f"Task {task_id} completed successfully in {duration:.2f}s")
 
         except Exception as e:
             logger.error(f"Task {task_id} failed: {str(e)}")
-            await self.task_store.update_task_status(
+            await self._finish_task(
                 task_id, TaskStatus.FAILED, error=str(e), completed_at=datetime.utcnow()
             )
             raise
 
+    async def _abandon_task(self, task_id: str, attempts: int):
+        """Fail a task whose workers kept dying while running it"""
+        await self._finish_task(
+            task_id,
+            TaskStatus.FAILED,
+            error=f"Abandoned after {attempts} interrupted attempts",
+            completed_at=datetime.utcnow(),
+        )
+
+    def get_service_status(self) -> Dict[str, Any]:
+        """Live state of the worker pool and the model provider"""
+        breaker = self.task_executor.governor.breaker.state
+        return {
+            "services": {
+                "api": "running",
+                "task_executor": "running" if self.scheduler.running else "stopped",
+                "ai_services": {
+                    CircuitBreaker.CLOSED: "available",
+                    CircuitBreaker.HALF_OPEN: "recovering",
+                    CircuitBreaker.OPEN: "unavailable",
+                }[breaker],
+            },
+            "uptime": uptime(),
+        }
+
+    def _has_pending_work(self) -> bool:
+        """Whether tasks are waiting for or occupying every worker"""
+        return (
+            self.scheduler.depth() > 0
+            or self.scheduler.active >= self.scheduler.max_workers
+        )
+
+    async def _finish_task(self, task_id: str, status: TaskStatus, **fields) -> bool:
+        """Record a terminal status and publish the final result
+
+        Returns False when the task had already finished, for example
+        because it was cancelled by another process while running here.
+        """
+        recorded = await self.task_store.update_task_status(task_id, status, **fields)
+        await self.task_executor.release(task_id)
+        if not recorded:
+            return False
+        task = await self.task_store.get_task(task_id)
+        if task is not None and task.started_at and task.completed_at:
+            TASK_DURATION.labels(status.value).observe(
+                (task.completed_at - task.started_at).total_seconds()
+            )
+        if task is not None:
+            self.event_hub.publish(
+                task_id, "result", task.model_dump(mode="json", exclude={"steps"})
+            )
+        return True
+
     async def get_task_status(self, task_id: str) -> Optional[TaskResult]:
         """Get the current status of a task"""
         return await self.task_store.get_task(task_id)
 
+    async def get_task_output(
+        self, task_id: str, offset: int = 0
+    ) -> Optional[Dict[str, Any]]:
+        """Get the task output produced since an offset"""
+        task = await self.task_store.get_task(task_id)
+        if task is None:
+            return None
+        output = task.output or ""
+        return {
+            "id": task_id,
+            "status": task.status,
+            "offset": len(output),
+            "delta": output[offset:],
+            "complete": task.status in TERMINAL_STATUSES,
+        }
+
+    async def stream_events(self, task_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield a task's step and output events followed by its final result
+
+        Steps and partial output recorded before subscribing are replayed
+        first. Output events carry the offset of their delta; deltas lost
+        to a full subscriber queue are read back from the store. A keepalive
+        event is yielded when nothing happens for EVENT_KEEPALIVE_INTERVAL.
+        With a shared queue the task may run in another process, so the
+        store is also polled for progress every TASK_QUEUE_POLL_INTERVAL.
+        """
+        poll = settings.TASK_QUEUE_POLL_INTERVAL if self.scheduler.distributed else 0
+        queue = self.event_hub.subscribe(task_id)
+        try:
+            task = await self.task_store.get_task(task_id)
+            if task is None:
+                return
+
+            replayed = set()
+            for step in task.steps:
+                replayed.add((step.id, step.status.value, step.progress))
+                yield {
+                    "type": "step",
+                    "task_id": task_id,
+                    "data": step.model_dump(mode="json"),
+                }
+            replayed_output = len(task.output or "")
+            if task.status in TERMINAL_STATUSES:
+                yield {
+                    "type": "result",
+                    "task_id": task_id,
+                    "data": task.model_dump(mode="json", exclude={"steps"}),
+                }
+                return
+            if replayed_output:
+                yield {
+                    "type": "output",
+                    "task_id": task_id,
+                    "data": {"offset": 0, "delta": task.output},
+                }
+
+            idle = 0.0
+            while True:
+                timeout = poll or settings.EVENT_KEEPALIVE_INTERVAL
+                try:
+                    events = [await asyncio.wait_for(queue.get(), timeout=timeout)]
+                except asyncio.TimeoutError:
+                    events = []
+                    if poll:
+                        task = await self.task_store.get_task(task_id)
+                        events = self._progress_events(task, replayed, replayed_output)
+                    idle += timeout
+                    if not events and idle >= settings.EVENT_KEEPALIVE_INTERVAL:
+                        idle = 0.0
+                        events = [{"type": "keepalive", "task_id": task_id, "data": {}}]
+
+                for event in events:
+                    if event["type"] == "step":
+                        data = event["data"]
+                        # Steps are updated in place, so progress is part of the key
+                        key = (data["id"], data["status"], data.get("progress"))
+                        if key in replayed:
+                            continue
+                        replayed.add(key)
+                    elif event["type"] == "output":
+                        data = event["data"]
+                        if data["offset"] > replayed_output:
+                            # Earlier deltas were dropped from the full queue
+                            task = await self.task_store.get_task(task_id)
+                            output = (task.output if task else None) or ""
+                            if len(output) >= data["offset"]:
+                                data = {
+                                    "offset": replayed_output,
+                                    "delta": output[replayed_output:],
+                                }
+                                event = {**event, "data": data}
+                        end = data["offset"] + len(data["delta"])
+                        if end <= replayed_output:
+                            continue
+                        replayed_output = end
+                    idle = 0.0
+                    yield event
+                    if event["type"] == "result":
+                        return
+        finally:
+            self.event_hub.unsubscribe(task_id, queue)
+
+    @staticmethod
+    def _progress_events(
+        task: Optional[TaskResult], sent_steps: set, sent_output: int
+    ) -> List[Dict[str, Any]]:
+        """Events for progress recorded in the store but not yet sent"""
+        if task is None:
+            return []
+        events = [
+            {"type": "step", "task_id": task.id, "data": step.model_dump(mode="json")}
+            for step in task.steps
+            if (step.id, step.status.value, step.progress) not in sent_steps
+        ]
+        output = task.output or ""
+        if len(output) > sent_output:
+            events.append(
+                {
+                    "type": "output",
+                    "task_id": task.id,
+                    "data": {"offset": sent_output, "delta": output[sent_output:]},
+                }
+            )
+        if task.status in TERMINAL_STATUSES:
+            events.append(
+                {
+                    "type": "result",
+                    "task_id": task.id,
+                    "data": task.model_dump(mode="json", exclude={"steps"}),
+                }
+            )
+        return events
+
     async def cancel_task(self, task_id: str) -> bool:
         """Cancel a running task"""
         if task_id in self.active_tasks:
@@ -85,17 +421,55 @@ class TaskService:
             del self.active_tasks[task_id]
 
             # Update status
-            await self.task_store.update_task_status(
+            await self._finish_task(
+                task_id, TaskStatus.CANCELLED, completed_at=datetime.utcnow()
+            )
+            return True
+
+        if await self.scheduler.cancel(task_id):
+            await self._finish_task(
                 task_id, TaskStatus.CANCELLED, completed_at=datetime.utcnow()
             )
             return True
 
         return False
 
-    async def list_tasks(self, limit: int = 10, offset: int = 0) -> List[TaskResult]:
+    async def list_tasks(
+        self,
+        limit: int = 10,
+        offset: int = 0,
+        cursor: Optional[Cursor] = None,
+        status: Optional[TaskStatus] = None,
+        started_after: Optional[datetime] = None,
+        started_before: Optional[datetime] = None,
+    ) -> List[TaskResult]:
         """List recent tasks"""
-        return await self.task_store.list_tasks(limit=limit, offset=offset)
+        return await self.task_store.list_tasks(
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            status=status,
+            started_after=started_after,
+            started_before=started_before,
+        )
 
-    async def get_statistics(self) -> Dict[str, Any]:
+    async def get_statistics(self, window: Optional[str] = None) -> Dict[str, Any]:
         """Get task execution statistics"""
-        return await self.task_store.get_statistics()
+        stats = await self.task_store.get_statistics(window)
+        stats["queue"] = self.scheduler.get_metrics()
+        stats["routing"] = self.task_executor.router.get_metrics()
+        stats["deadlines"] = self.task_executor.deadlines.get_metrics()
+        stats["llm_governor"] = self.task_executor.governor.get_metrics()
+        stats["tokens"] = self.task_executor.token_usage.get_metrics()
+        stats["reflection"] = self.reflections.get_metrics()
+        stats["retention"] = self.retention.get_metrics()
+        stats["retention"][
+            "checkpoint_threads"
+        ] = self.task_executor.checkpoint_threads()
+        if self.task_executor.llm_cache is not None:
+            stats["llm_cache"] = self.task_executor.llm_cache.get_metrics()
+        stats["llm_clients"] = self.task_executor.llm_clients.get_metrics()
+        stats["logging"] = get_logging_metrics()
+        if self.task_executor.semantic_cache is not None:
+            stats["semantic_cache"] = self.task_executor.semantic_cache.get_metrics()
+        return stats
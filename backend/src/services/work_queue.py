@@ -0,0 +1,273 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, Optional, Set, Tuple
+
+from ..schemas.task import TaskRequest
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (task_id, task_request, priority)
+WorkItem = Tuple[str, TaskRequest, int]
+
+
+@dataclass
+class Lease:
+    """A task handed to one worker until its lease expires"""
+
+    task_id: str
+    task_request: TaskRequest
+    attempts: int
+    enqueued_at: float
+
+
+class BaseWorkQueue(ABC):
+    """Durable task queue shared by API and worker processes
+
+    Workers lease tasks for a visibility timeout and extend the lease
+    with heartbeats while they run. A task whose lease expires, because
+    its worker died, is handed to the next worker that asks.
+    """
+
+    # Pending tasks seen by the last enqueue or lease
+    pending: int = 0
+
+    async def start(self):
+        """Open the queue"""
+
+    async def close(self):
+        """Release queue resources"""
+
+    @abstractmethod
+    async def count(self) -> int:
+        """Refresh and return the number of pending tasks"""
+
+    @abstractmethod
+    async def enqueue(self, items: List[WorkItem], max_pending: int = 0) -> bool:
+        """Add all items, or none when `max_pending` would be exceeded
+
+        Items already in the queue are left as they are and do not
+        count against `max_pending`.
+        """
+
+    @abstractmethod
+    async def contains(self, task_ids: List[str]) -> Set[str]:
+        """The task ids that are queued or leased"""
+
+    @abstractmethod
+    async def lease(self, worker_id: str, visibility_timeout: float) -> Optional[Lease]:
+        """Take the next ready task, highest priority first"""
+
+    @abstractmethod
+    async def heartbeat(
+        self, task_id: str, worker_id: str, visibility_timeout: float
+    ) -> bool:
+        """Extend a lease; False when the worker no longer holds it"""
+
+    @abstractmethod
+    async def complete(self, task_id: str, worker_id: str):
+        """Remove a finished task held by the worker"""
+
+    @abstractmethod
+    async def release(self, task_id: str, worker_id: str):
+        """Hand a leased task back without counting the attempt"""
+
+    @abstractmethod
+    async def cancel(self, task_id: str) -> bool:
+        """Drop a pending task, or revoke the lease of a running one"""
+
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS work_queue ("
+    "task_id TEXT PRIMARY KEY, request TEXT NOT NULL, priority INTEGER NOT NULL, "
+    "enqueued_at REAL NOT NULL, state TEXT NOT NULL DEFAULT 'pending', "
+    "worker_id TEXT, lease_expires REAL, attempts INTEGER NOT NULL DEFAULT 0)",
+    "CREATE INDEX IF NOT EXISTS ix_work_queue_ready "
+    "ON work_queue (state, priority, enqueued_at)",
+)
+
+
+class SQLiteWorkQueue(BaseWorkQueue):
+    """Work queue in a SQLite file in WAL mode
+
+    Every operation is a short `BEGIN IMMEDIATE` transaction, so any
+    number of processes on one machine can share the file. Calls run in
+    a worker thread to keep the event loop free.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.TASK_QUEUE_DB_PATH
+        self.conn: Optional[sqlite3.Connection] = None
+        # Guards the connection, which is used from worker threads
+        self.lock = threading.Lock()
+        self._open_lock = asyncio.Lock()
+
+    async def start(self):
+        async with self._open_lock:
+            if self.conn is None:
+                await asyncio.to_thread(self._open)
+
+    async def close(self):
+        if self.conn is not None:
+            with self.lock:
+                self.conn.close()
+                self.conn = None
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None, timeout=30
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            conn.execute(statement)
+        self.conn = conn
+
+    async def _run(self, operation, *args):
+        await self.start()
+        return await asyncio.to_thread(self._transaction, operation, *args)
+
+    def _transaction(self, operation, *args):
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = operation(self.conn, *args)
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+            return result
+
+    def _count_pending(self, conn: sqlite3.Connection) -> int:
+        self.pending = conn.execute(
+            "SELECT COUNT(*) FROM work_queue WHERE state = 'pending'"
+        ).fetchone()[0]
+        return self.pending
+
+    async def count(self) -> int:
+        return await self._run(self._count_pending)
+
+    async def enqueue(self, items: List[WorkItem], max_pending: int = 0) -> bool:
+        return await self._run(self._enqueue, items, max_pending)
+
+    async def contains(self, task_ids: List[str]) -> Set[str]:
+        return await self._run(self._contains, task_ids)
+
+    def _contains(self, conn, task_ids: List[str]) -> Set[str]:
+        found = set()
+        # Stay under SQLite's limit on bound parameters
+        for start in range(0, len(task_ids), 500):
+            chunk = task_ids[start : start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT task_id FROM work_queue WHERE task_id IN ({placeholders})",
+                chunk,
+            )
+            found.update(row[0] for row in rows)
+        return found
+
+    def _enqueue(self, conn, items: List[WorkItem], max_pending: int) -> bool:
+        queued = self._contains(conn, [task_id for task_id, _, _ in items])
+        items = [item for item in items if item[0] not in queued]
+        if max_pending and self._count_pending(conn) + len(items) > max_pending:
+            return False
+        now = time.time()
+        conn.executemany(
+            "INSERT OR IGNORE INTO work_queue "
+            "(task_id, request, priority, enqueued_at) VALUES (?, ?, ?, ?)",
+            [
+                (task_id, request.model_dump_json(), priority, now)
+                for task_id, request, priority in items
+            ],
+        )
+        self._count_pending(conn)
+        return True
+
+    async def lease(self, worker_id: str, visibility_timeout: float) -> Optional[Lease]:
+        return await self._run(self._lease, worker_id, visibility_timeout)
+
+    def _lease(self, conn, worker_id: str, visibility_timeout: float):
+        now = time.time()
+        # Revoked leases whose worker never came back
+        conn.execute(
+            "DELETE FROM work_queue WHERE state = 'cancelled' AND lease_expires < ?",
+            (now,),
+        )
+        row = conn.execute(
+            "SELECT task_id, request, attempts, enqueued_at FROM work_queue "
+            "WHERE state = 'pending' OR (state = 'leased' AND lease_expires < ?) "
+            "ORDER BY priority, enqueued_at LIMIT 1",
+            (now,),
+        ).fetchone()
+        if row is None:
+            self._count_pending(conn)
+            return None
+        task_id, request, attempts, enqueued_at = row
+        conn.execute(
+            "UPDATE work_queue SET state = 'leased', worker_id = ?, "
+            "lease_expires = ?, attempts = attempts + 1 WHERE task_id = ?",
+            (worker_id, now + visibility_timeout, task_id),
+        )
+        self._count_pending(conn)
+        return Lease(
+            task_id=task_id,
+            task_request=TaskRequest.model_validate_json(request),
+            attempts=attempts + 1,
+            enqueued_at=enqueued_at,
+        )
+
+    async def heartbeat(
+        self, task_id: str, worker_id: str, visibility_timeout: float
+    ) -> bool:
+        return await self._run(self._heartbeat, task_id, worker_id, visibility_timeout)
+
+    def _heartbeat(self, conn, task_id: str, worker_id: str, visibility_timeout):
+        cursor = conn.execute(
+            "UPDATE work_queue SET lease_expires = ? "
+            "WHERE task_id = ? AND worker_id = ? AND state = 'leased'",
+            (time.time() + visibility_timeout, task_id, worker_id),
+        )
+        return cursor.rowcount == 1
+
+    async def complete(self, task_id: str, worker_id: str):
+        await self._run(self._complete, task_id, worker_id)
+
+    def _complete(self, conn, task_id: str, worker_id: str):
+        conn.execute(
+            "DELETE FROM work_queue WHERE task_id = ? AND worker_id = ?",
+            (task_id, worker_id),
+        )
+
+    async def release(self, task_id: str, worker_id: str):
+        await self._run(self._release, task_id, worker_id)
+
+    def _release(self, conn, task_id: str, worker_id: str):
+        conn.execute(
+            "UPDATE work_queue SET state = 'pending', worker_id = NULL, "
+            "lease_expires = NULL, attempts = attempts - 1 "
+            "WHERE task_id = ? AND worker_id = ? AND state = 'leased'",
+            (task_id, worker_id),
+        )
+        self._count_pending(conn)
+
+    async def cancel(self, task_id: str) -> bool:
+        return await self._run(self._cancel, task_id)
+
+    def _cancel(self, conn, task_id: str) -> bool:
+        cursor = conn.execute(
+            "DELETE FROM work_queue WHERE task_id = ? AND state = 'pending'",
+            (task_id,),
+        )
+        if cursor.rowcount == 0:
+            cursor = conn.execute(
+                "UPDATE work_queue SET state = 'cancelled' "
+                "WHERE task_id = ? AND state = 'leased'",
+                (task_id,),
+            )
+        self._count_pending(conn)
+        return cursor.rowcount == 1
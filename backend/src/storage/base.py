@@ -0,0 +1,124 @@
+import asyncio
+import weakref
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple
+from ..schemas.task import TaskRequest, TaskResult, TaskStatus
+from ..schemas.step import StepLog
+from ..utils.pagination import Cursor
+
+
+class BaseTaskStore(ABC):
+    """Async interface shared by all task store backends"""
+
+    def __init__(self):
+        # Locks disappear once no writer holds them, so this never grows
+        self.locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = (
+            weakref.WeakValueDictionary()
+        )
+
+    def _lock(self, task_id: str) -> asyncio.Lock:
+        """Get the write lock for a task"""
+        lock = self.locks.get(task_id)
+        if lock is None:
+            lock = self.locks[task_id] = asyncio.Lock()
+        return lock
+
+    async def start(self):
+        """Prepare the backend for use"""
+
+    async def close(self):
+        """Flush pending writes and release resources"""
+
+    async def evict_tasks(
+        self, max_tasks: int, max_bytes: int, ttl: float
+    ) -> List[TaskResult]:
+        """Drop finished tasks beyond the retention limits and return them
+
+        Backends that do not hold tasks in memory keep everything.
+        """
+        return []
+
+    async def list_unfinished_tasks(self) -> List[Tuple[str, Optional[TaskRequest]]]:
+        """Pending or running tasks with their requests, oldest first
+
+        Backends that lose tasks on restart have nothing to resume.
+        """
+        return []
+
+    def get_memory_usage(self) -> Dict[str, Any]:
+        """Get the number and approximate size of tasks held in memory"""
+        return {}
+
+    @abstractmethod
+    async def create_task(self, task_id: str, task_request) -> TaskResult:
+        """Create a new task"""
+
+    @abstractmethod
+    async def create_tasks(
+        self, tasks: List[Tuple[str, TaskRequest]], batch_id: Optional[str] = None
+    ) -> List[TaskResult]:
+        """Create several tasks at once, optionally as one batch"""
+
+    @abstractmethod
+    async def update_task_status(
+        self,
+        task_id: str,
+        status: TaskStatus,
+        output: Optional[str] = None,
+        error: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        started_at: Optional[datetime] = None,
+        completed_at: Optional[datetime] = None,
+    ) -> bool:
+        """Update task status and details
+
+        A task in a terminal status keeps it: moving it to another status
+        changes nothing and returns False.
+        """
+
+    @abstractmethod
+    async def update_task_metadata(self, task_id: str, metadata: Dict[str, Any]):
+        """Merge metadata into an existing task without changing its status"""
+
+    @abstractmethod
+    async def append_output(self, task_id: str, text: str):
+        """Append streamed text to a task's output"""
+
+    @abstractmethod
+    async def get_task(self, task_id: str) -> Optional[TaskResult]:
+        """Get a task by ID"""
+
+    @abstractmethod
+    async def delete_task(self, task_id: str):
+        """Remove a task and its steps"""
+
+    @abstractmethod
+    async def list_tasks(
+        self,
+        limit: int = 10,
+        offset: int = 0,
+        cursor: Optional[Cursor] = None,
+        status: Optional[TaskStatus] = None,
+        started_after: Optional[datetime] = None,
+        started_before: Optional[datetime] = None,
+    ) -> List[TaskResult]:
+        """List tasks newest first, starting after the cursor position"""
+
+    @abstractmethod
+    async def get_batch_summary(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Get per-status counts and progress of a batch"""
+
+    @abstractmethod
+    async def list_batch_tasks(
+        self, batch_id: str, limit: int = 100, offset: int = 0
+    ) -> List[TaskResult]:
+        """List the tasks of a batch in a stable order"""
+
+    @abstractmethod
+    async def add_step(self, task_id: str, step: StepLog):
+        """Add a step to a task, replacing an earlier step with the same id"""
+
+    @abstractmethod
+    async def get_statistics(self, window: Optional[str] = None) -> Dict[str, Any]:
+        """Get task execution statistics, optionally for a recent window"""
@@ -0,0 +1,463 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple
+from sqlalchemy import and_, delete, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from ..schemas.task import TaskRequest, TaskResult, TaskStatus
+from ..schemas.step import StepLog
+from ..db.models import Base, TaskRow, StepRow
+from ..db.session import create_engine, create_session_factory
+from ..core.config import settings
+from ..utils.pagination import Cursor
+from .base import BaseTaskStore
+from .statistics import TERMINAL_STATUSES, TaskStatistics, summarize_batch
+
+logger = logging.getLogger(__name__)
+
+
+class SQLTaskStore(BaseTaskStore):
+    """SQLAlchemy-backed task storage
+
+    Task rows are written directly. Step logs go to a write-behind buffer
+    that a background flusher writes in one transaction per batch, so
+    adding a step never waits on the database. A step replaces the
+    earlier record with the same id, in the buffer and in the table.
+    Reads merge in steps that have not been flushed yet.
+
+    Statistics are kept as in-memory counters, seeded from the database
+    on start and updated on each status transition.
+    """
+
+    def __init__(
+        self,
+        database_url: Optional[str] = None,
+        flush_interval: Optional[float] = None,
+        batch_size: Optional[int] = None,
+    ):
+        super().__init__()
+        self.engine = create_engine(database_url)
+        self.session_factory = create_session_factory(self.engine)
+        self.flush_interval = flush_interval or settings.TASK_STORE_FLUSH_INTERVAL
+        self.batch_size = batch_size or settings.TASK_STORE_BATCH_SIZE
+        self.pending_steps: List[Dict[str, Any]] = []
+        # (task_id, step id) -> position in pending_steps
+        self._pending_index: Dict[Tuple[str, str], int] = {}
+        self._flush_requested = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+        self.statistics = TaskStatistics()
+
+    async def start(self):
+        """Create tables and start the step flusher"""
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await self._load_statistics()
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop())
+        logger.info("SQL task store started")
+
+    async def close(self):
+        """Flush buffered steps and dispose the engine"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+        await self.engine.dispose()
+
+    async def _load_statistics(self):
+        """Seed the statistics counters from stored tasks"""
+        statistics = TaskStatistics()
+        async with self.session_factory() as session:
+            counts = await session.execute(
+                select(TaskRow.status, func.count()).group_by(TaskRow.status)
+            )
+            for status, count in counts:
+                statistics.counts[TaskStatus(status)] = count
+            durations = await session.stream_scalars(
+                select(TaskRow.duration).where(
+                    TaskRow.status == TaskStatus.COMPLETED.value,
+                    TaskRow.duration > 0,
+                )
+            )
+            async for duration in durations:
+                statistics.durations.add(duration)
+        self.statistics = statistics
+
+    async def _flush_loop(self):
+        """Flush buffered steps on an interval or when the batch fills up"""
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._flush_requested.wait(), timeout=self.flush_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing task steps: {str(e)}")
+
+    async def flush(self):
+        """Write all buffered steps in a single transaction"""
+        async with self._flush_lock:
+            if not self.pending_steps:
+                return
+            batch = self.pending_steps
+            self._set_pending([])
+            try:
+                async with self.session_factory.begin() as session:
+                    await self._write_steps(session, batch)
+            except IntegrityError as e:
+                # Only if a task was deleted by another process meanwhile
+                logger.error(f"Dropping {len(batch)} steps: {str(e)}")
+            except Exception:
+                # Steps buffered meanwhile are newer than the failed batch
+                merged = {
+                    (data["task_id"], data["id"]): data
+                    for data in batch + self.pending_steps
+                }
+                self._set_pending(list(merged.values()))
+                raise
+
+    def _set_pending(self, steps: List[Dict[str, Any]]):
+        self.pending_steps = steps
+        self._pending_index = {
+            (data["task_id"], data["id"]): i for i, data in enumerate(steps)
+        }
+
+    async def _write_steps(self, session, batch: List[Dict[str, Any]]):
+        """Update steps already stored under the same id and insert the rest
+
+        Steps of tasks deleted since they were buffered are dropped, so
+        they cannot fail the rest of the batch.
+        """
+        task_ids = {data["task_id"] for data in batch}
+        existing = set(
+            await session.scalars(select(TaskRow.id).where(TaskRow.id.in_(task_ids)))
+        )
+        if len(existing) < len(task_ids):
+            orphans = [data for data in batch if data["task_id"] not in existing]
+            logger.warning(f"Dropping {len(orphans)} steps of deleted tasks")
+            batch = [data for data in batch if data["task_id"] in existing]
+            task_ids = existing
+        stored = await session.execute(
+            select(StepRow.task_id, StepRow.id, StepRow.seq).where(
+                StepRow.task_id.in_(task_ids)
+            )
+        )
+        seqs = {(task_id, step_id): seq for task_id, step_id, seq in stored}
+        inserts, updates = [], []
+        for data in batch:
+            seq = seqs.get((data["task_id"], data["id"]))
+            if seq is None:
+                inserts.append(data)
+            else:
+                updates.append({**data, "seq": seq})
+        if inserts:
+            await session.execute(insert(StepRow), inserts)
+        if updates:
+            await session.execute(update(StepRow), updates)
+
+    @staticmethod
+    def _to_result(row: TaskRow, steps: List[StepLog]) -> TaskResult:
+        return TaskResult(
+            id=row.id,
+            status=TaskStatus(row.status),
+            output=row.output,
+            error=row.error,
+            steps=steps,
+            metadata=dict(row.task_metadata or {}),
+            started_at=row.started_at,
+            completed_at=row.completed_at,
+            duration=row.duration,
+        )
+
+    @staticmethod
+    def _step_to_row(task_id: str, step: StepLog) -> Dict[str, Any]:
+        data = step.model_dump()
+        data["task_id"] = task_id
+        data["status"] = step.status.value
+        return data
+
+    @staticmethod
+    def _row_to_step(row: StepRow) -> StepLog:
+        return StepLog(
+            id=row.id,
+            task_id=row.task_id,
+            step_name=row.step_name,
+            status=row.status,
+            message=row.message,
+            details=row.details,
+            error=row.error,
+            started_at=row.started_at,
+            completed_at=row.completed_at,
+            duration=row.duration,
+            progress=row.progress,
+        )
+
+    async def _load_steps(
+        self, session, task_ids: List[str]
+    ) -> Dict[str, List[StepLog]]:
+        """Load persisted and buffered steps for the given tasks"""
+        # Keyed by step id so a buffered step replaces its stored record
+        steps: Dict[str, Dict[str, StepLog]] = {task_id: {} for task_id in task_ids}
+        if task_ids:
+            # Hold the flush lock so a batch is never in neither place
+            async with self._flush_lock:
+                rows = await session.scalars(
+                    select(StepRow)
+                    .where(StepRow.task_id.in_(task_ids))
+                    .order_by(StepRow.seq)
+                )
+                for row in rows:
+                    steps[row.task_id][row.id] = self._row_to_step(row)
+                for data in self.pending_steps:
+                    if data["task_id"] in steps:
+                        steps[data["task_id"]][data["id"]] = StepLog(**data)
+        return {task_id: list(by_id.values()) for task_id, by_id in steps.items()}
+
+    async def create_task(self, task_id: str, task_request) -> TaskResult:
+        """Create a new task"""
+        row = TaskRow(
+            id=task_id,
+            status=TaskStatus.PENDING.value,
+            request=task_request.model_dump() if task_request is not None else None,
+            task_metadata={},
+            started_at=datetime.utcnow(),
+        )
+        async with self._lock(task_id):
+            async with self.session_factory.begin() as session:
+                session.add(row)
+        self.statistics.record_transition(None, TaskStatus.PENDING)
+        return self._to_result(row, [])
+
+    async def create_tasks(
+        self, tasks: List[Tuple[str, TaskRequest]], batch_id: Optional[str] = None
+    ) -> List[TaskResult]:
+        """Create several tasks in a single transaction"""
+        started_at = datetime.utcnow()
+        metadata = {"batch_id": batch_id} if batch_id is not None else {}
+        rows = [
+            TaskRow(
+                id=task_id,
+                status=TaskStatus.PENDING.value,
+                batch_id=batch_id,
+                request=task_request.model_dump() if task_request is not None else None,
+                task_metadata=dict(metadata),
+                started_at=started_at,
+            )
+            for task_id, task_request in tasks
+        ]
+        async with self.session_factory.begin() as session:
+            session.add_all(rows)
+        for _ in rows:
+            self.statistics.record_transition(None, TaskStatus.PENDING)
+        return [self._to_result(row, []) for row in rows]
+
+    async def update_task_status(
+        self,
+        task_id: str,
+        status: TaskStatus,
+        output: Optional[str] = None,
+        error: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        started_at: Optional[datetime] = None,
+        completed_at: Optional[datetime] = None,
+    ) -> bool:
+        """Update task status and details unless the task already finished
+
+        The update is conditional on the status read, so a task finished
+        by another process meanwhile is not overwritten either.
+        """
+        async with self._lock(task_id):
+            async with self.session_factory.begin() as session:
+                row = await session.get(TaskRow, task_id)
+                if row is None:
+                    old_status = None
+                    row = TaskRow(
+                        id=task_id,
+                        status=status.value,
+                        task_metadata={},
+                        started_at=datetime.utcnow(),
+                    )
+                    session.add(row)
+                else:
+                    old_status = TaskStatus(row.status)
+                    if old_status in TERMINAL_STATUSES and status != old_status:
+                        return False
+
+                values: Dict[str, Any] = {"status": status.value}
+                if output is not None:
+                    values["output"] = output
+                if error is not None:
+                    values["error"] = error
+                if metadata is not None:
+                    values["task_metadata"] = {**(row.task_metadata or {}), **metadata}
+                if started_at is not None:
+                    values["started_at"] = started_at
+                if completed_at is not None:
+                    values["completed_at"] = completed_at
+                    begun = started_at or row.started_at
+                    if begun:
+                        values["duration"] = (completed_at - begun).total_seconds()
+                duration = values.get("duration", row.duration)
+
+                if old_status is None:
+                    for name, value in values.items():
+                        setattr(row, name, value)
+                else:
+                    result = await session.execute(
+                        update(TaskRow)
+                        .where(TaskRow.id == task_id, TaskRow.status == row.status)
+                        .values(**values)
+                        .execution_options(synchronize_session=False)
+                    )
+                    if result.rowcount == 0:
+                        return False
+            self.statistics.record_transition(old_status, status, duration)
+        return True
+
+    async def update_task_metadata(self, task_id: str, metadata: Dict[str, Any]):
+        """Merge metadata into an existing task without changing its status"""
+        async with self._lock(task_id):
+            async with self.session_factory.begin() as session:
+                row = await session.get(TaskRow, task_id)
+                if row is not None:
+                    row.task_metadata = {**(row.task_metadata or {}), **metadata}
+
+    async def append_output(self, task_id: str, text: str):
+        """Append streamed text to a task's output"""
+        async with self._lock(task_id):
+            async with self.session_factory.begin() as session:
+                await session.execute(
+                    update(TaskRow)
+                    .where(TaskRow.id == task_id)
+                    .values(output=func.coalesce(TaskRow.output, "") + text)
+                )
+
+    async def get_task(self, task_id: str) -> Optional[TaskResult]:
+        """Get a task by ID"""
+        async with self.session_factory() as session:
+            row = await session.get(TaskRow, task_id)
+            if row is None:
+                return None
+            steps = await self._load_steps(session, [task_id])
+        return self._to_result(row, steps[task_id])
+
+    async def delete_task(self, task_id: str):
+        """Remove a task and its steps"""
+        self._set_pending([s for s in self.pending_steps if s["task_id"] != task_id])
+        async with self.session_factory.begin() as session:
+            status = await session.scalar(
+                select(TaskRow.status).where(TaskRow.id == task_id)
+            )
+            await session.execute(delete(StepRow).where(StepRow.task_id == task_id))
+            await session.execute(delete(TaskRow).where(TaskRow.id == task_id))
+        if status is not None:
+            self.statistics.record_transition(TaskStatus(status), None)
+        self.locks.pop(task_id, None)
+
+    async def list_tasks(
+        self,
+        limit: int = 10,
+        offset: int = 0,
+        cursor: Optional[Cursor] = None,
+        status: Optional[TaskStatus] = None,
+        started_after: Optional[datetime] = None,
+        started_before: Optional[datetime] = None,
+    ) -> List[TaskResult]:
+        """List tasks newest first, starting after the cursor position"""
+        query = select(TaskRow)
+        if status is not None:
+            query = query.where(TaskRow.status == status.value)
+        if cursor is not None:
+            cursor_started_at, cursor_id = cursor
+            query = query.where(
+                or_(
+                    TaskRow.started_at < cursor_started_at,
+                    and_(
+                        TaskRow.started_at == cursor_started_at,
+                        TaskRow.id < cursor_id,
+                    ),
+                )
+            )
+        if started_after is not None:
+            query = query.where(TaskRow.started_at >= started_after)
+        if started_before is not None:
+            query = query.where(TaskRow.started_at < started_before)
+        query = (
+            query.order_by(TaskRow.started_at.desc(), TaskRow.id.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+
+        async with self.session_factory() as session:
+            rows = list(await session.scalars(query))
+            steps = await self._load_steps(session, [row.id for row in rows])
+        return [self._to_result(row, steps[row.id]) for row in rows]
+
+    async def list_unfinished_tasks(self) -> List[Tuple[str, Optional[TaskRequest]]]:
+        """Pending or running tasks with their requests, oldest first"""
+        query = (
+            select(TaskRow.id, TaskRow.request)
+            .where(
+                TaskRow.status.in_([TaskStatus.PENDING.value, TaskStatus.RUNNING.value])
+            )
+            .order_by(TaskRow.started_at, TaskRow.id)
+        )
+        async with self.session_factory() as session:
+            rows = await session.execute(query)
+            return [
+                (task_id, TaskRequest(**request) if request else None)
+                for task_id, request in rows
+            ]
+
+    async def get_batch_summary(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Get per-status counts and progress of a batch"""
+        async with self.session_factory() as session:
+            rows = await session.execute(
+                select(TaskRow.status, func.count())
+                .where(TaskRow.batch_id == batch_id)
+                .group_by(TaskRow.status)
+            )
+            counts = {TaskStatus(status): count for status, count in rows}
+        return summarize_batch(batch_id, counts) if counts else None
+
+    async def list_batch_tasks(
+        self, batch_id: str, limit: int = 100, offset: int = 0
+    ) -> List[TaskResult]:
+        """List the tasks of a batch in a stable order"""
+        query = (
+            select(TaskRow)
+            .where(TaskRow.batch_id == batch_id)
+            .order_by(TaskRow.started_at, TaskRow.id)
+            .offset(offset)
+            .limit(limit)
+        )
+        async with self.session_factory() as session:
+            rows = list(await session.scalars(query))
+            steps = await self._load_steps(session, [row.id for row in rows])
+        return [self._to_result(row, steps[row.id]) for row in rows]
+
+    async def add_step(self, task_id: str, step: StepLog):
+        """Buffer a step for the next batched write, replacing one with its id"""
+        key = (task_id, step.id)
+        data = self._step_to_row(task_id, step)
+        position = self._pending_index.get(key)
+        if position is None:
+            self._pending_index[key] = len(self.pending_steps)
+            self.pending_steps.append(data)
+        else:
+            self.pending_steps[position] = data
+        if len(self.pending_steps) >= self.batch_size:
+            self._flush_requested.set()
+
+    async def get_statistics(self, window: Optional[str] = None) -> Dict[str, Any]:
+        """Get task execution statistics, optionally for a recent window"""
+        if window is not None:
+            return self.statistics.window_snapshot(window)
+        return self.statistics.snapshot()
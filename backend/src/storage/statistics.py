@@ -0,0 +1,201 @@
+import math
+import time
+from typing import Optional, Dict, Any, List
+from ..schemas.task import TaskStatus
+
+TERMINAL_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED)
+
+# Supported windows for time-windowed statistics, in minutes
+WINDOWS = {"5m": 5, "1h": 60, "24h": 1440}
+
+
+def summarize_batch(batch_id: str, counts: Dict[TaskStatus, int]) -> Dict[str, Any]:
+    """Aggregate per-status task counts of a batch into its progress"""
+    total = sum(counts.values())
+    finished = sum(counts.get(status, 0) for status in TERMINAL_STATUSES)
+    return {
+        "batch_id": batch_id,
+        "total": total,
+        "statuses": {status.value: counts.get(status, 0) for status in TaskStatus},
+        "finished": finished,
+        "progress": finished / total if total else 0,
+        "complete": total > 0 and finished == total,
+    }
+
+
+class DurationSketch:
+    """Streaming duration aggregate with approximate quantiles
+
+    Values are counted in logarithmic buckets, so each quantile is within
+    `relative_accuracy` of the true value and memory grows with the range
+    of durations rather than with the number of tasks.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float, count: int = 1):
+        """Record a duration in seconds"""
+        if value <= 0:
+            self.zero_count += count
+            value = 0.0
+        else:
+            key = math.ceil(math.log(value) / self.log_gamma)
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.count += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "DurationSketch"):
+        """Fold another sketch with the same accuracy into this one"""
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Approximate the q-th quantile (0-1)"""
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                # Midpoint of the bucket in log space
+                value = 2 * self.gamma**key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        """Get count, sum, mean and p50/p95/p99"""
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "average": self.sum / self.count if self.count else 0,
+            "min": self.min or 0,
+            "max": self.max or 0,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class _MinuteBucket:
+    """Terminal transitions recorded during one minute"""
+
+    __slots__ = ("minute", "counts", "durations")
+
+    def __init__(self, minute: int):
+        self.minute = minute
+        self.counts: Dict[TaskStatus, int] = {}
+        self.durations = DurationSketch()
+
+
+class TaskStatistics:
+    """Running task counters updated on each status transition
+
+    Reading statistics is O(1) for the totals and O(window minutes) for a
+    windowed view, independent of how many tasks are stored.
+    """
+
+    def __init__(self, window_minutes: int = max(WINDOWS.values())):
+        self.counts: Dict[TaskStatus, int] = {status: 0 for status in TaskStatus}
+        self.durations = DurationSketch()
+        self.window_minutes = window_minutes
+        self.ring: List[Optional[_MinuteBucket]] = [None] * window_minutes
+
+    def record_transition(
+        self,
+        old_status: Optional[TaskStatus],
+        new_status: Optional[TaskStatus],
+        duration: Optional[float] = None,
+    ):
+        """Move one task between status counters
+
+        Pass old_status=None for a new task and new_status=None for a
+        removed one. Durations are aggregated for completed tasks.
+        """
+        if old_status == new_status:
+            return
+        if old_status is not None:
+            self.counts[old_status] -= 1
+        if new_status is not None:
+            self.counts[new_status] += 1
+
+        if new_status in TERMINAL_STATUSES:
+            bucket = self._bucket()
+            bucket.counts[new_status] = bucket.counts.get(new_status, 0) + 1
+            if new_status == TaskStatus.COMPLETED and duration:
+                self.durations.add(duration)
+                bucket.durations.add(duration)
+
+    def _bucket(self) -> _MinuteBucket:
+        """Get the ring buffer bucket for the current minute"""
+        minute = int(time.time() // 60)
+        slot = minute % self.window_minutes
+        bucket = self.ring[slot]
+        if bucket is None or bucket.minute != minute:
+            bucket = self.ring[slot] = _MinuteBucket(minute)
+        return bucket
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get totals since the store was created"""
+        total_tasks = sum(self.counts.values())
+        completed_tasks = self.counts[TaskStatus.COMPLETED]
+        return {
+            "total_tasks": total_tasks,
+            "pending_tasks": self.counts[TaskStatus.PENDING],
+            "running_tasks": self.counts[TaskStatus.RUNNING],
+            "completed_tasks": completed_tasks,
+            "failed_tasks": self.counts[TaskStatus.FAILED],
+            "cancelled_tasks": self.counts[TaskStatus.CANCELLED],
+            "success_rate": completed_tasks / total_tasks if total_tasks > 0 else 0,
+            "average_duration": (
+                self.durations.sum / self.durations.count if self.durations.count else 0
+            ),
+            "duration": self.durations.summary(),
+        }
+
+    def window_snapshot(self, window: str) -> Dict[str, Any]:
+        """Get tasks that finished within a window such as "5m" or "1h" """
+        minutes = WINDOWS[window]
+        now = int(time.time() // 60)
+        counts: Dict[TaskStatus, int] = {status: 0 for status in TERMINAL_STATUSES}
+        durations = DurationSketch()
+        for minute in range(now - minutes + 1, now + 1):
+            bucket = self.ring[minute % self.window_minutes]
+            if bucket is None or bucket.minute != minute:
+                continue
+            for status, count in bucket.counts.items():
+                counts[status] += count
+            durations.merge(bucket.durations)
+
+        finished = sum(counts.values())
+        completed_tasks = counts[TaskStatus.COMPLETED]
+        return {
+            "window": window,
+            "finished_tasks": finished,
+            "completed_tasks": completed_tasks,
+            "failed_tasks": counts[TaskStatus.FAILED],
+            "cancelled_tasks": counts[TaskStatus.CANCELLED],
+            "success_rate": completed_tasks / finished if finished else 0,
+            "throughput_per_minute": finished / minutes,
+            "duration": durations.summary(),
+        }
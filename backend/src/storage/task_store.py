@@ -1,26 +1,110 @@
+import bisect
 import logging
-from datetime import datetime
-from typing import Optional, List, Dict, Any
-from ..schemas.task import TaskResult, TaskStatus
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any, Set, Tuple
+from ..schemas.task import TaskRequest, TaskResult, TaskStatus
 from ..schemas.step import StepLog, StepStatus
+from ..models.records import StepRecord, TaskRecord, pack_text
+from ..utils.pagination import Cursor
+from .base import BaseTaskStore
+from .statistics import TERMINAL_STATUSES, TaskStatistics, summarize_batch
 
 logger = logging.getLogger(__name__)
 
 
-class TaskStore:
-    """In-memory task storage"""
+class TaskStore(BaseTaskStore):
+    """In-memory task storage
+
+    Tasks and steps are held as slotted records (`models/records.py`)
+    and converted to TaskResult and StepLog only when read. Steps are
+    kept in a per-task list and attached on read, so appending a step
+    never copies the list; a per-task index of step ids lets a step
+    replace its earlier record in place. Writes to a single task are
+    serialized with a per-task lock.
+
+    Tasks are indexed by (started_at, id) in ascending sorted lists, one
+    over all tasks and one per status, so a page is a bisect plus a walk
+    over the page instead of a full sort.
+
+    Finished tasks are tracked in completion order with their approximate
+    size, so retention can evict the oldest ones without a scan.
+    """
 
     def __init__(self):
-        self.tasks: Dict[str, TaskResult] = {}
-        self.steps: Dict[str, List[StepLog]] = {}
+        super().__init__()
+        self.tasks: Dict[str, TaskRecord] = {}
+        self.steps: Dict[str, List[StepRecord]] = {}
+        # task_id -> step id -> position in the task's step list
+        self.step_index: Dict[str, Dict[str, int]] = {}
+        self.time_index: List[Cursor] = []
+        self.status_index: Dict[TaskStatus, List[Cursor]] = {
+            status: [] for status in TaskStatus
+        }
+        self.index_keys: Dict[str, Cursor] = {}
+        self.batches: Dict[str, List[str]] = {}
+        # task_id -> (completed_at, approximate bytes), oldest first
+        self.finished: "OrderedDict[str, Tuple[datetime, int]]" = OrderedDict()
+        self.finished_bytes = 0
+        self.evicted = 0
+        self.statistics = TaskStatistics()
+
+    def _index_add(self, task: TaskRecord):
+        """Add a task to the time and status indexes"""
+        key = (task.started_at or datetime.min, task.id)
+        self.index_keys[task.id] = key
+        # Tasks mostly arrive in time order, making this an append
+        bisect.insort(self.time_index, key)
+        bisect.insort(self.status_index[task.status], key)
+
+    def _index_remove(self, task: TaskRecord):
+        """Remove a task from the time and status indexes"""
+        key = self.index_keys.pop(task.id, None)
+        if key is None:
+            return
+        for index in (self.time_index, self.status_index[task.status]):
+            position = bisect.bisect_left(index, key)
+            if position < len(index) and index[position] == key:
+                del index[position]
+
+    def _with_steps(self, task: TaskRecord) -> TaskResult:
+        """Return a snapshot of the task with its steps attached"""
+        return task.to_result(self.steps.get(task.id, []))
 
     async def create_task(self, task_id: str, task_request) -> TaskResult:
         """Create a new task"""
-        task = TaskResult(
-            id=task_id, status=TaskStatus.PENDING, started_at=datetime.utcnow()
+        async with self._lock(task_id):
+            return self._with_steps(self._create_task(task_id))
+
+    async def create_tasks(
+        self, tasks: List[Tuple[str, TaskRequest]], batch_id: Optional[str] = None
+    ) -> List[TaskResult]:
+        """Create several tasks at once, optionally as one batch"""
+        started_at = datetime.utcnow()
+        created = [
+            self._create_task(task_id, batch_id, started_at) for task_id, _ in tasks
+        ]
+        if batch_id is not None:
+            self.batches[batch_id] = [task_id for task_id, _ in tasks]
+        return [self._with_steps(task) for task in created]
+
+    def _create_task(
+        self,
+        task_id: str,
+        batch_id: Optional[str] = None,
+        started_at: Optional[datetime] = None,
+    ) -> TaskRecord:
+        task = TaskRecord(
+            id=task_id,
+            status=TaskStatus.PENDING,
+            started_at=started_at or datetime.utcnow(),
         )
+        if batch_id is not None:
+            task.metadata = {"batch_id": batch_id}
         self.tasks[task_id] = task
-        self.steps[task_id] = []
+        self.steps.setdefault(task_id, [])
+        self._index_add(task)
+        self.statistics.record_transition(None, task.status)
         return task
 
     async def update_task_status(
@@ -32,81 +116,198 @@ class TaskStore:
         metadata: Optional[Dict[str, Any]] = None,
         started_at: Optional[datetime] = None,
         completed_at: Optional[datetime] = None,
-    ):
-        """Update task status and details"""
-        if task_id not in self.tasks:
-            await self.create_task(task_id, None)
-
-        task = self.tasks[task_id]
-        task.status = status
-
-        if output is not None:
-            task.output = output
-        if error is not None:
-            task.error = error
-        if metadata is not None:
-            task.metadata.update(metadata)
-        if started_at is not None:
-            task.started_at = started_at
-        if completed_at is not None:
-            task.completed_at = completed_at
-            if task.started_at:
-                task.duration = (completed_at - task.started_at).total_seconds()
+    ) -> bool:
+        """Update task status and details unless the task already finished"""
+        async with self._lock(task_id):
+            task = self.tasks.get(task_id) or self._create_task(task_id)
+            old_status = task.status
+            if old_status in TERMINAL_STATUSES and status != old_status:
+                return False
+            reindex = status != task.status or (
+                started_at is not None and started_at != task.started_at
+            )
+            if reindex:
+                self._index_remove(task)
+            task.status = status
+
+            if output is not None:
+                task.output = output
+            if error is not None:
+                task.error = error
+            if metadata is not None:
+                task.update_metadata(metadata)
+            if started_at is not None:
+                task.started_at = started_at
+            if completed_at is not None:
+                task.completed_at = completed_at
+                if task.started_at:
+                    task.duration = (completed_at - task.started_at).total_seconds()
+            if reindex:
+                self._index_add(task)
+            if status in TERMINAL_STATUSES:
+                # The output no longer changes, so it can be stored compressed
+                task.output = pack_text(task.get_output())
+            self._track_finished(task)
+            self.statistics.record_transition(old_status, status, task.duration)
+        return True
+
+    def _track_finished(self, task: TaskRecord):
+        """Keep the completion-ordered list of finished tasks up to date"""
+        self._untrack_finished(task.id)
+        if task.status in TERMINAL_STATUSES:
+            size = task.approx_bytes() + sum(
+                step.approx_bytes() for step in self.steps.get(task.id, [])
+            )
+            self.finished[task.id] = (task.completed_at or datetime.utcnow(), size)
+            self.finished_bytes += size
+
+    def _untrack_finished(self, task_id: str):
+        entry = self.finished.pop(task_id, None)
+        if entry is not None:
+            self.finished_bytes -= entry[1]
+
+    async def update_task_metadata(self, task_id: str, metadata: Dict[str, Any]):
+        """Merge metadata into an existing task without changing its status"""
+        async with self._lock(task_id):
+            task = self.tasks.get(task_id)
+            if task is not None:
+                task.update_metadata(metadata)
+
+    async def append_output(self, task_id: str, text: str):
+        """Append streamed text to a task's output"""
+        async with self._lock(task_id):
+            task = self.tasks.get(task_id)
+            if task is not None:
+                task.output = (task.get_output() or "") + text
 
     async def get_task(self, task_id: str) -> Optional[TaskResult]:
         """Get a task by ID"""
-        return self.tasks.get(task_id)
-
-    async def list_tasks(self, limit: int = 10, offset: int = 0) -> List[TaskResult]:
-        """List tasks with pagination"""
-        sorted_tasks = sorted(
-            self.tasks.values(),
-            key=lambda x: x.started_at or datetime.min,
-            reverse=True,
-        )
-        return sorted_tasks[offset : offset + limit]
+        task = self.tasks.get(task_id)
+        return self._with_steps(task) if task else None
 
-    async def add_step(self, task_id: str, step: StepLog):
-        """Add a step to a task"""
-        if task_id not in self.steps:
-            self.steps[task_id] = []
-        self.steps[task_id].append(step)
-
-        # Update task steps
-        if task_id in self.tasks:
-            self.tasks[task_id].steps = self.steps[task_id]
-
-    async def get_statistics(self) -> Dict[str, Any]:
-        """Get task execution statistics"""
-        total_tasks = len(self.tasks)
-        completed_tasks = len(
-            [t for t in self.tasks.values() if t.status == TaskStatus.COMPLETED]
-        )
-        failed_tasks = len(
-            [t for t in self.tasks.values() if t.status == TaskStatus.FAILED]
-        )
-        running_tasks = len(
-            [t for t in self.tasks.values() if t.status == TaskStatus.RUNNING]
-        )
+    async def delete_task(self, task_id: str):
+        """Remove a task and its steps, and its batch once that is empty"""
+        task = self._drop_task(task_id)
+        if task is not None:
+            self.statistics.record_transition(task.status, None)
+            if "batch_id" in task.metadata:
+                self._forget_empty_batches({task.metadata["batch_id"]})
 
-        # Calculate average duration
-        completed_with_duration = [
-            t
-            for t in self.tasks.values()
-            if t.status == TaskStatus.COMPLETED and t.duration
-        ]
-        avg_duration = (
-            sum(t.duration for t in completed_with_duration)
-            / len(completed_with_duration)
-            if completed_with_duration
-            else 0
-        )
+    def _drop_task(self, task_id: str) -> Optional[TaskResult]:
+        """Remove a task from every structure, returning it with its steps"""
+        task = self.tasks.pop(task_id, None)
+        steps = self.steps.pop(task_id, [])
+        self.step_index.pop(task_id, None)
+        self._untrack_finished(task_id)
+        self.locks.pop(task_id, None)
+        if task is None:
+            return None
+        self._index_remove(task)
+        return task.to_result(steps)
 
+    async def evict_tasks(
+        self, max_tasks: int, max_bytes: int, ttl: float
+    ) -> List[TaskResult]:
+        """Drop finished tasks beyond the retention limits and return them
+
+        Tasks go oldest completion first. Lifetime statistics are kept.
+        """
+        expires_before = datetime.utcnow() - timedelta(seconds=ttl)
+        evicted = []
+        batches = set()
+        while self.finished:
+            task_id, (completed_at, _) = next(iter(self.finished.items()))
+            over_limit = len(self.tasks) > max_tasks or self.finished_bytes > max_bytes
+            if not over_limit and completed_at >= expires_before:
+                break
+            task = self._drop_task(task_id)
+            if task is not None:
+                evicted.append(task)
+                if "batch_id" in task.metadata:
+                    batches.add(task.metadata["batch_id"])
+
+        self._forget_empty_batches(batches)
+        self.evicted += len(evicted)
+        return evicted
+
+    def _forget_empty_batches(self, batch_ids: Set[str]):
+        """Drop batches none of whose tasks are held any more"""
+        for batch_id in batch_ids:
+            task_ids = self.batches.get(batch_id, [])
+            if not any(task_id in self.tasks for task_id in task_ids):
+                self.batches.pop(batch_id, None)
+
+    def get_memory_usage(self) -> Dict[str, Any]:
+        """Get the number and approximate size of tasks held in memory"""
         return {
-            "total_tasks": total_tasks,
-            "completed_tasks": completed_tasks,
-            "failed_tasks": failed_tasks,
-            "running_tasks": running_tasks,
-            "success_rate": completed_tasks / total_tasks if total_tasks > 0 else 0,
-            "average_duration": avg_duration,
+            "tasks": len(self.tasks),
+            "finished_tasks": len(self.finished),
+            "finished_bytes": self.finished_bytes,
+            "batches": len(self.batches),
+            "evicted": self.evicted,
         }
+
+    async def list_tasks(
+        self,
+        limit: int = 10,
+        offset: int = 0,
+        cursor: Optional[Cursor] = None,
+        status: Optional[TaskStatus] = None,
+        started_after: Optional[datetime] = None,
+        started_before: Optional[datetime] = None,
+    ) -> List[TaskResult]:
+        """List tasks newest first, starting after the cursor position"""
+        index = self.status_index[status] if status else self.time_index
+
+        # Walk backwards from the first key past the upper bound
+        end = len(index)
+        if cursor is not None:
+            end = bisect.bisect_left(index, cursor)
+        if started_before is not None:
+            end = min(end, bisect.bisect_left(index, (started_before, "")))
+        start = 0
+        if started_after is not None:
+            start = bisect.bisect_left(index, (started_after, ""))
+
+        stop = max(start, end - offset - limit)
+        keys = index[stop : max(stop, end - offset)]
+        return [self._with_steps(self.tasks[task_id]) for _, task_id in reversed(keys)]
+
+    async def get_batch_summary(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Get per-status counts and progress of a batch"""
+        counts: Dict[TaskStatus, int] = {}
+        for task_id in self.batches.get(batch_id, []):
+            task = self.tasks.get(task_id)
+            if task is not None:
+                counts[task.status] = counts.get(task.status, 0) + 1
+        return summarize_batch(batch_id, counts) if counts else None
+
+    async def list_batch_tasks(
+        self, batch_id: str, limit: int = 100, offset: int = 0
+    ) -> List[TaskResult]:
+        """List the tasks of a batch in a stable order"""
+        task_ids = self.batches.get(batch_id, [])[offset : offset + limit]
+        return [
+            self._with_steps(self.tasks[task_id])
+            for task_id in task_ids
+            if task_id in self.tasks
+        ]
+
+    async def add_step(self, task_id: str, step: StepLog):
+        """Add a step to a task, replacing an earlier step with the same id"""
+        record = StepRecord.from_log(step)
+        async with self._lock(task_id):
+            steps = self.steps.setdefault(task_id, [])
+            index = self.step_index.setdefault(task_id, {})
+            position = index.get(step.id)
+            if position is None:
+                index[step.id] = len(steps)
+                steps.append(record)
+            else:
+                steps[position] = record
+
+    async def get_statistics(self, window: Optional[str] = None) -> Dict[str, Any]:
+        """Get task execution statistics, optionally for a recent window"""
+        if window is not None:
+            return self.statistics.window_snapshot(window)
+        return self.statistics.snapshot()
@@ -0,0 +1,55 @@
+import hashlib
+from typing import List, Optional
+
+import orjson
+
+from ..schemas.step import StepLog, StepStatus
+from ..schemas.task import TaskResult
+
+FINISHED_STEPS = (StepStatus.COMPLETED, StepStatus.FAILED, StepStatus.SKIPPED)
+
+
+def task_etag(task: TaskResult, variant: str = "") -> str:
+    """Weak ETag that changes whenever the task's visible state changes
+
+    Built from status, timestamps, step ids, statuses and progress, the
+    output's length and tail, and the metadata, which is much cheaper
+    than encoding the whole task. `variant` separates projections of the
+    same task, such as different `fields` or `since_step` values.
+    """
+    output = task.output or ""
+    steps = [(step.id, step.status.value, step.progress) for step in task.steps]
+    fingerprint = orjson.dumps(
+        [
+            task.status.value,
+            task.error,
+            task.started_at,
+            task.completed_at,
+            len(output),
+            output[-64:],
+            steps,
+            task.metadata,
+            variant,
+        ],
+        default=str,
+        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+    )
+    return f'W/"{hashlib.blake2b(fingerprint, digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header lists the ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def next_step(steps: List[StepLog]) -> int:
+    """Index a poller resumes from: the first step that may still change"""
+    for index, step in enumerate(steps):
+        if step.status not in FINISHED_STEPS:
+            return index
+    return len(steps)
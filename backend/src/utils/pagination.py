@@ -0,0 +1,23 @@
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+# Position of a task in the (started_at, id) ordering
+Cursor = Tuple[datetime, str]
+
+
+def encode_cursor(started_at: Optional[datetime], task_id: str) -> str:
+    """Encode a keyset position as an opaque cursor string"""
+    timestamp = (started_at or datetime.min).isoformat()
+    raw = f"{timestamp}|{task_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Decode a cursor string, raising ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, task_id = base64.urlsafe_b64decode(padded).decode().split("|", 1)
+        return datetime.fromisoformat(timestamp), task_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,155 @@
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "cl100k_base"
+# Rough average for English text, used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+# Context windows by model name prefix, longest prefix first
+CONTEXT_WINDOWS = (
+    ("gpt-3.5-turbo", 16385),
+    ("gpt-4-turbo", 128000),
+    ("gpt-4-32k", 32768),
+    ("gpt-4.1", 1047576),
+    ("gpt-4o", 128000),
+    ("gpt-4", 8192),
+)
+
+# Completion limits below the requested max_tokens are rounded down to
+# this step so clipped calls share a handful of cached clients
+COMPLETION_STEP = 256
+
+
+# Loaded encodings, and when loading one last failed
+_encodings: Dict[Optional[str], Any] = {}
+_failed_at: Dict[Optional[str], float] = {}
+# Seconds before a failed load (tiktoken downloads encodings on first
+# use) is tried again; counts are estimated meanwhile
+ENCODING_RETRY_INTERVAL = 300.0
+
+
+def get_encoding(model: Optional[str] = None):
+    """tiktoken encoding for a model, or None when it cannot be loaded"""
+    if model in _encodings:
+        return _encodings[model]
+    failed = _failed_at.get(model)
+    if failed is not None and time.monotonic() - failed < ENCODING_RETRY_INTERVAL:
+        return None
+    try:
+        import tiktoken
+
+        encoding = None
+        if model:
+            try:
+                encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                pass
+        if encoding is None:
+            encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        _failed_at[model] = time.monotonic()
+        logger.warning(f"Token encoding unavailable, estimating counts: {str(e)}")
+        return None
+    _failed_at.pop(model, None)
+    _encodings[model] = encoding
+    return encoding
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Count the tokens of a text for a model"""
+    if not text:
+        return 0
+    encoding = get_encoding(model)
+    if encoding is None:
+        return max(1, len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def context_window(model: Optional[str] = None) -> int:
+    """Context window of a model in tokens"""
+    for prefix, window in CONTEXT_WINDOWS:
+        if model and model.startswith(prefix):
+            return window
+    return settings.TOKEN_DEFAULT_CONTEXT_WINDOW
+
+
+def trim_to_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """Shorten a text to about `max_tokens`, keeping its start and end"""
+    if not text or count_tokens(text, model) <= max_tokens:
+        return text
+    encoding = get_encoding(model)
+    if encoding is None:
+        keep = max_tokens * CHARS_PER_TOKEN
+        head = keep * 2 // 3
+        omitted = (len(text) - keep) // CHARS_PER_TOKEN
+        start, end = text[:head], text[len(text) - (keep - head) :]
+    else:
+        tokens = encoding.encode(text, disallowed_special=())
+        head = max_tokens * 2 // 3
+        omitted = len(tokens) - max_tokens
+        start = encoding.decode(tokens[:head])
+        end = encoding.decode(tokens[len(tokens) - (max_tokens - head) :])
+    return f"{start}\n[... {omitted} tokens omitted ...]\n{end}"
+
+
+def completion_limit(
+    prompt_tokens: int, requested: Optional[int], model: Optional[str] = None
+) -> int:
+    """max_tokens for a call: the request, capped by what is left of the window"""
+    requested = requested or settings.OPENAI_MAX_TOKENS
+    available = (
+        context_window(model) - prompt_tokens - settings.TOKEN_WINDOW_SAFETY_MARGIN
+    )
+    if available < settings.TOKEN_MIN_COMPLETION:
+        raise ValueError(
+            f"Prompt of {prompt_tokens} tokens leaves no room for a completion "
+            f"in the {context_window(model)} token window of {model}"
+        )
+    if available >= requested:
+        return requested
+    return max(
+        settings.TOKEN_MIN_COMPLETION, available // COMPLETION_STEP * COMPLETION_STEP
+    )
+
+
+class TokenUsage:
+    """Prompt and completion tokens counted per workflow node
+
+    Responses served from the LLM cache are counted too, and also under
+    `cached`.
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, Dict[str, int]] = {}
+
+    def record(self, node: str, usage: Dict[str, Any]):
+        totals = self.nodes.setdefault(
+            node,
+            {
+                "calls": 0,
+                "cached": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "trimmed": 0,
+            },
+        )
+        totals["calls"] += 1
+        totals["cached"] += int(usage.get("cached", False))
+        totals["prompt_tokens"] += usage["prompt_tokens"]
+        totals["completion_tokens"] += usage["completion_tokens"]
+        totals["trimmed"] += int(usage.get("trimmed", False))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get per-node and total token counts"""
+        return {
+            "nodes": self.nodes,
+            "prompt_tokens": sum(n["prompt_tokens"] for n in self.nodes.values()),
+            "completion_tokens": sum(
+                n["completion_tokens"] for n in self.nodes.values()
+            ),
+        }
@@ -0,0 +1,44 @@
+"""Task worker process: `python -m src.worker`
+
+Leases tasks from the shared work queue and runs them. Start any number
+of these next to API processes running with TASK_QUEUE_RUN_WORKERS=false.
+"""
+
+import asyncio
+import logging
+import signal
+
+from .core.config import settings
+from .core.logging import setup_logging
+from .core.tracing import setup_tracing
+from .core.dependencies import get_task_service, get_task_store
+
+setup_logging()
+setup_tracing()
+logger = logging.getLogger(__name__)
+
+
+async def run_worker():
+    """Run tasks from the shared queue until SIGINT or SIGTERM"""
+    if settings.TASK_QUEUE_BACKEND == "memory":
+        raise SystemExit("A worker process needs TASK_QUEUE_BACKEND=sqlite")
+    # This process exists to run tasks
+    settings.TASK_QUEUE_RUN_WORKERS = True
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    logger.info("Starting TaskFlow worker...")
+    await get_task_store().start()
+    await get_task_service().start()
+    await get_task_service().resume_tasks()
+    await stop.wait()
+    logger.info("Shutting down TaskFlow worker...")
+    await get_task_service().close()
+    await get_task_store().close()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())
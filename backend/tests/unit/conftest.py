@@ -0,0 +1,66 @@
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.agents.task_executor import TaskExecutor
+from src.integrations.llm_clients import LLMClientRegistry
+from src.services.event_hub import EventHub
+from src.services.task_service import TaskService
+from src.storage.task_store import TaskStore
+
+
+class RecordingLLM:
+    """Chat model stand-in that records the prompts it receives
+
+    Replies are numbered. Reflection calls wait on `reflection_gate`,
+    which starts open.
+    """
+
+    def __init__(self):
+        self.prompts = []
+        self.reflection_gate = asyncio.Event()
+        self.reflection_gate.set()
+
+    async def ainvoke(self, messages, **kwargs):
+        if "reflection" in messages[-1].content:
+            await self.reflection_gate.wait()
+        self.prompts.append(messages[-1].content)
+        return SimpleNamespace(content=f"reply {len(self.prompts)}")
+
+
+def use_llm(executor: TaskExecutor, llm) -> TaskExecutor:
+    """Route every model call of the executor to `llm`, uncached"""
+    executor.llm_cache = None
+    executor.llm_clients = LLMClientRegistry(factory=lambda **params: llm)
+    return executor
+
+
+@pytest.fixture
+def recording_llm() -> RecordingLLM:
+    return RecordingLLM()
+
+
+@pytest.fixture
+def make_service():
+    """Factory for an in-memory TaskService whose executor calls a stub"""
+
+    def make(llm) -> TaskService:
+        service = TaskService(TaskStore(), EventHub())
+        use_llm(service.task_executor, llm)
+        return service
+
+    return make
+
+
+@pytest.fixture
+def make_executor():
+    """Factory for a TaskExecutor that calls a stub"""
+
+    def make(llm) -> TaskExecutor:
+        return use_llm(TaskExecutor(TaskStore(), EventHub()), llm)
+
+    return make
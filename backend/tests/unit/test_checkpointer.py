@@ -0,0 +1,71 @@
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.core.config import settings
+from src.schemas.task import TaskRequest
+
+
+class ScriptedLLM:
+    """Chat model stand-in that records prompts and can fail on execution"""
+
+    def __init__(self, fail_execution: bool = False):
+        self.fail_execution = fail_execution
+        self.prompts = []
+
+    async def ainvoke(self, messages, **kwargs):
+        prompt = messages[-1].content
+        self.prompts.append(prompt)
+        if self.fail_execution and "execute the task" in prompt:
+            raise RuntimeError("process died")
+        return SimpleNamespace(content=f"reply {len(self.prompts)}")
+
+
+def test_interrupted_task_resumes_after_last_completed_node(
+    tmp_path, monkeypatch, make_executor
+):
+    """A new process continues from the saved plan instead of re-planning"""
+    monkeypatch.setattr(settings, "CHECKPOINT_BACKEND", "sqlite")
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{tmp_path / 'tf.db'}")
+    request = TaskRequest(
+        prompt="write a haiku", options={"reflection": "inline", "route": "full"}
+    )
+
+    async def first_run():
+        llm = ScriptedLLM(fail_execution=True)
+        executor = make_executor(llm)
+        await executor.start()
+        with pytest.raises(RuntimeError):
+            await executor.execute("t1", request)
+        await executor.close()
+        return llm.prompts
+
+    async def second_run():
+        llm = ScriptedLLM()
+        executor = make_executor(llm)
+        await executor.start()
+        result = await executor.execute("t1", request)
+        await executor.release("t1")
+        threads = executor.checkpoint_threads()
+        await executor.close()
+        return llm.prompts, result, threads
+
+    async def third_run():
+        executor = make_executor(ScriptedLLM())
+        await executor.start()
+        threads = executor.checkpoint_threads()
+        await executor.close()
+        return threads
+
+    first_prompts = asyncio.run(first_run())
+    second_prompts, result, threads = asyncio.run(second_run())
+    assert asyncio.run(third_run()) == 0
+    assert len(first_prompts) == 2
+    assert not any("execution plan" in p for p in second_prompts)
+    assert len(second_prompts) == 2
+    assert result["output"] == "reply 1"
+    assert threads == 0
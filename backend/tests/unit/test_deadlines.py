@@ -0,0 +1,84 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.core.deadlines import (
+    DeadlineExceeded,
+    DeadlinePolicy,
+    make_deadline,
+    node_timeout,
+)
+from src.schemas.task import TaskRequest, TaskStatus
+
+
+class HangingLLM:
+    """Chat model stand-in that never answers"""
+
+    async def ainvoke(self, messages, **kwargs):
+        await asyncio.Event().wait()
+
+
+def test_node_timeout_leaves_budget_for_later_nodes():
+    deadline = make_deadline(10)
+    plan = node_timeout(deadline, "plan", ["execute", "reflect"])
+    execute = node_timeout(deadline, "execute", [])
+    assert 1.9 < plan <= 2.0
+    assert 9.9 < execute <= 10.0
+    with pytest.raises(DeadlineExceeded):
+        node_timeout(time.monotonic() - 1, "execute", [])
+
+
+def test_hung_llm_call_fails_the_task_at_its_deadline(make_service):
+    async def scenario():
+        service = make_service(HangingLLM())
+        request = TaskRequest(
+            prompt="hi", options={"timeout": 0.2, "reflection": "off"}
+        )
+        await service.task_store.create_task("t1", request)
+        started = time.monotonic()
+        await service.execute_task("t1", request)
+        elapsed = time.monotonic() - started
+        task = await service.get_task_status("t1")
+        metrics = service.task_executor.deadlines.get_metrics()
+        await service.close()
+        return elapsed, task, metrics
+
+    elapsed, task, metrics = asyncio.run(scenario())
+    assert elapsed < 2
+    assert task.status == TaskStatus.FAILED
+    assert "time budget" in task.error
+    assert metrics["execute"]["timeouts"] == 1
+
+
+def test_slow_call_is_hedged_and_first_response_wins():
+    async def scenario():
+        policy = DeadlinePolicy(window=50, percentile=0.95, min_samples=5)
+        for _ in range(5):
+            await policy.call("execute", lambda: asyncio.sleep(0.01), 5)
+
+        calls = []
+
+        async def request():
+            calls.append(time.monotonic())
+            # The first call stalls; the hedged duplicate answers quickly
+            if len(calls) == 1:
+                await asyncio.sleep(5)
+                return "primary"
+            await asyncio.sleep(0.01)
+            return "hedge"
+
+        started = time.monotonic()
+        result = await policy.call("execute", request, 10, hedge=True)
+        return time.monotonic() - started, result, len(calls), policy.get_metrics()
+
+    elapsed, result, calls, metrics = asyncio.run(scenario())
+    assert elapsed < 1
+    assert result == "hedge"
+    assert calls == 2
+    assert metrics["execute"]["hedged"] == 1
+    assert metrics["execute"]["hedge_wins"] == 1
+    assert metrics["execute"]["calls"] == 6
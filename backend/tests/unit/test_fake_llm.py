@@ -0,0 +1,75 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from benchmarks.load import compare
+from src.core.config import settings
+from src.core.rate_limiter import is_retryable
+from src.integrations.fake_llm import FakeChatModel, FakeLLMError
+from src.schemas.task import TaskRequest, TaskStatus
+from src.services.event_hub import EventHub
+from src.services.task_service import TaskService
+from src.storage.task_store import TaskStore
+
+
+def test_fake_model_replies_deterministically_and_streams_the_same_text():
+    async def scenario():
+        model = FakeChatModel(latency_mean=0)
+        messages = [HumanMessage(content="hello")]
+        first = await model.ainvoke(messages)
+        second = await FakeChatModel(latency_mean=0).ainvoke(messages)
+        other = await model.ainvoke([HumanMessage(content="goodbye")])
+        chunks = [chunk.content async for chunk in model.astream(messages)]
+        return first.content, second.content, other.content, chunks
+
+    first, second, other, chunks = asyncio.run(scenario())
+    assert first == second
+    assert first != other
+    assert len(chunks) > 1
+    assert "".join(chunks) == first
+
+
+def test_fake_model_latency_and_error_injection():
+    model = FakeChatModel(latency="lognormal", latency_mean=0.2, seed=1)
+    samples = [model.sample_latency() for _ in range(2000)]
+    assert 0.17 < sum(samples) / len(samples) < 0.23
+    assert FakeChatModel(latency="fixed", latency_mean=0.3).sample_latency() == 0.3
+
+    failing = FakeChatModel(latency_mean=0, error_rate=1.0, error_status=429)
+    with pytest.raises(FakeLLMError) as raised:
+        asyncio.run(failing.ainvoke([HumanMessage(content="hi")]))
+    assert raised.value.status_code == 429
+    assert is_retryable(raised.value)
+
+
+def test_fake_backend_runs_tasks_offline(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BACKEND", "fake")
+    monkeypatch.setattr(settings, "FAKE_LLM_LATENCY_MEAN", 0.0)
+
+    async def scenario():
+        service = TaskService(TaskStore(), EventHub())
+        request = TaskRequest(
+            prompt="Outline the steps to plan a release",
+            options={"reflection": "inline", "cache": False},
+        )
+        await service.task_store.create_task("t1", request)
+        await service.execute_task("t1", request)
+        task = await service.get_task_status("t1")
+        await service.close()
+        return task
+
+    task = asyncio.run(scenario())
+    assert task.status == TaskStatus.COMPLETED
+    assert task.output
+    assert task.metadata["reflection"]
+
+
+def test_benchmark_comparison_flags_regressions():
+    baseline = {"throughput": 20.0, "latency_p95": 0.2, "latency_p99": 0.3}
+    assert compare({"throughput": 19.0, "latency_p95": 0.21}, baseline) == []
+    regressions = compare({"throughput": 10.0, "latency_p95": 0.5}, baseline)
+    assert [r.split(":")[0] for r in regressions] == ["throughput", "latency_p95"]
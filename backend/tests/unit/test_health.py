@@ -27,6 +27,6 @@ def test_root_endpoint():
     response = client.get("/")
     assert response.status_code == 200
     data = response.json()
-    assert data["message"] == "TaskFlow API is running"
+    assert data["message"] == "TaskFlow API is running!"
     assert data["version"] == "1.0.0"
     assert data["status"] == "healthy"
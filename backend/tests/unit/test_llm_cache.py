@@ -0,0 +1,73 @@
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.core.llm_cache import LLMCache, MemoryCacheTier, make_cache_key
+
+
+class CountingLLM:
+    """Chat model stand-in that counts its calls"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, prompt, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(content=f"answer {self.calls}")
+
+
+def test_memory_tier_evicts_least_recently_used():
+    """Entry and size bounds evict the least recently used entries"""
+    tier = MemoryCacheTier(max_entries=2, max_bytes=1000, ttl=60)
+    tier.set("a", "1")
+    tier.set("b", "2")
+    tier.get("a")
+    tier.set("c", "3")
+    assert tier.get("b") is None
+    assert tier.get("a") == "1"
+    assert tier.evictions == 1
+
+    tier = MemoryCacheTier(max_entries=10, max_bytes=5, ttl=60)
+    tier.set("a", "abc")
+    tier.set("b", "def")
+    assert tier.get("a") is None
+    assert tier.size == 3
+
+
+def test_disk_tier_survives_new_cache(tmp_path):
+    """Responses written to disk are found by a fresh cache"""
+    path = str(tmp_path / "cache.db")
+    key = make_cache_key("gpt-4", 0.7, 100, None, "hello")
+
+    async def scenario():
+        await LLMCache(disk_path=path).set(key, "world")
+        cache = LLMCache(disk_path=path)
+        return await cache.get(key), cache.get_metrics()
+
+    value, metrics = asyncio.run(scenario())
+    assert value == "world"
+    assert metrics["disk_hits"] == 1
+
+
+def test_repeat_prompts_skip_the_llm_unless_opted_out(make_executor):
+    """Identical prompts are served from cache; options.cache=False bypasses it"""
+
+    async def scenario():
+        llm = CountingLLM()
+        executor = make_executor(llm)
+        executor.llm_cache = LLMCache(disk_path="")
+        state = {"task_id": "t1", "model": "gpt-4", "options": {}}
+        first = await executor._invoke_llm(state, "same prompt", "execute")
+        second = await executor._invoke_llm(state, "same prompt", "execute")
+        bypass = await executor._invoke_llm(
+            {**state, "options": {"cache": False}}, "same prompt", "execute"
+        )
+        usage = executor.token_usage.get_metrics()["nodes"]["execute"]
+        return first, second, bypass, llm.calls, usage
+
+    first, second, bypass, calls, usage = asyncio.run(scenario())
+    assert (first, second, bypass, calls) == ("answer 1", "answer 1", "answer 2", 2)
+    # Cache hits still count towards the token statistics
+    assert usage["calls"] == 3 and usage["cached"] == 1
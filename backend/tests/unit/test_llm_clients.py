@@ -0,0 +1,52 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.core.config import settings
+from src.integrations.llm_clients import LLMClientRegistry
+
+
+def test_clients_are_reused_per_configuration():
+    """Equal settings share a client, different settings get their own"""
+    registry = LLMClientRegistry(factory=lambda **params: dict(params))
+
+    first = registry.get("gpt-4", 0.7, 4000)
+    assert registry.get("gpt-4", 0.7, 4000) is first
+    other = registry.get("gpt-4o-mini", 0.0, 500)
+
+    assert other is not first
+    assert other["model"] == "gpt-4o-mini"
+    assert registry.get_metrics()["created"] == 2
+    assert registry.get_metrics()["reused"] == 1
+
+
+def test_idle_and_excess_clients_are_evicted():
+    """Clients past the idle TTL or the size cap are dropped"""
+    registry = LLMClientRegistry(
+        idle_ttl=0, max_clients=1, factory=lambda **params: object()
+    )
+    first = registry.get("a")
+    assert registry.get("a") is not first
+
+    registry.idle_ttl = 60
+    registry.get("b")
+    registry.get("c")
+    assert list(key[0] for key in registry.clients) == ["c"]
+
+
+def test_model_clients_share_one_http_pool(monkeypatch):
+    """Real clients are built on the same async HTTP client"""
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
+
+    async def scenario():
+        registry = LLMClientRegistry()
+        first = registry.get("gpt-4")
+        second = registry.get("gpt-4o-mini")
+        shared = first.http_async_client is second.http_async_client
+        await registry.close()
+        return shared, registry.http_client
+
+    shared, http_client = asyncio.run(scenario())
+    assert shared
+    assert http_client is None
@@ -0,0 +1,108 @@
+import json
+import logging
+import queue
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.core import logging as log_setup
+from src.core.config import settings
+from src.core.logging import (
+    ContextFilter,
+    DroppingQueueHandler,
+    JSONFormatter,
+    RateLimitFilter,
+    log_context,
+)
+
+
+def make_record(message="hello %s", args=("world",), level=logging.INFO, lineno=1):
+    return logging.LogRecord("test", level, "test.py", lineno, message, args, None)
+
+
+def test_json_output_carries_task_context():
+    """Records logged inside log_context include its fields"""
+    with log_context(task_id="t1"):
+        with log_context(node="execute"):
+            record = make_record()
+            ContextFilter().filter(record)
+    outside = make_record()
+    ContextFilter().filter(outside)
+
+    entry = json.loads(JSONFormatter().format(record))
+    assert entry["message"] == "hello world"
+    assert entry["level"] == "INFO"
+    assert (entry["task_id"], entry["node"]) == ("t1", "execute")
+    assert "task_id" not in json.loads(JSONFormatter().format(outside))
+
+
+def test_full_queue_drops_and_counts():
+    """The queue handler never blocks; overflow is counted"""
+    handler = DroppingQueueHandler(queue.Queue(2))
+    for _ in range(5):
+        handler.handle(make_record())
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+    # Arguments are merged before the record leaves the caller
+    assert handler.queue.get_nowait().msg == "hello world"
+
+
+def test_rate_limit_applies_per_call_site_below_warning():
+    """Hot call sites are capped and report how many records were skipped"""
+    sampler = RateLimitFilter(rate=2)
+    passed = [sampler.filter(make_record(lineno=10)) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+    assert sampler.filter(make_record(lineno=11))
+    assert sampler.filter(make_record(level=logging.ERROR, lineno=10))
+    assert sampler.suppressed == 3
+
+    # The next record through after the window resets reports the gap
+    sampler.windows[("test.py", 10)][0] -= 1.0
+    record = make_record(lineno=10)
+    assert sampler.filter(record)
+    assert record.suppressed == 3
+
+
+def test_async_logging_writes_rotating_file(tmp_path):
+    """Records reach the file through the writer thread and rotate by size"""
+    saved = (settings.LOG_FILE, settings.LOG_MAX_BYTES, settings.LOG_JSON)
+    path = tmp_path / "app.log"
+    settings.LOG_FILE, settings.LOG_MAX_BYTES, settings.LOG_JSON = str(path), 400, True
+    try:
+        log_setup.setup_logging()
+        logger = logging.getLogger("tests.logging")
+        for i in range(10):
+            logger.warning(f"record {i}")
+        metrics = log_setup.get_logging_metrics()
+        log_setup.shutdown_logging()
+    finally:
+        settings.LOG_FILE, settings.LOG_MAX_BYTES, settings.LOG_JSON = saved
+        log_setup.setup_logging()
+
+    assert metrics["async"] and metrics["dropped"] == 0
+    last = json.loads(path.read_text().splitlines()[-1])
+    assert last["message"] == "record 9"
+    assert (tmp_path / "app.log.1").exists()
+
+
+def test_sync_logging_filters_each_record_once(tmp_path):
+    """Every output gets the same records and each suppression counts once"""
+    saved = (settings.LOG_FILE, settings.LOG_ASYNC, settings.LOG_RATE_LIMIT)
+    path = tmp_path / "app.log"
+    settings.LOG_FILE, settings.LOG_ASYNC, settings.LOG_RATE_LIMIT = str(path), False, 4
+    try:
+        log_setup.setup_logging()
+        logger = logging.getLogger("tests.logging")
+        logger.setLevel(logging.INFO)
+        for i in range(10):
+            logger.info(f"record {i}")
+        metrics = log_setup.get_logging_metrics()
+        lines = path.read_text().splitlines()
+    finally:
+        settings.LOG_FILE, settings.LOG_ASYNC, settings.LOG_RATE_LIMIT = saved
+        logger.setLevel(logging.NOTSET)
+        log_setup.setup_logging()
+
+    assert not metrics["async"]
+    assert len(lines) == 4
+    assert metrics["rate_limited"] == 6
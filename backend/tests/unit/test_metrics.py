@@ -0,0 +1,101 @@
+import asyncio
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.core.dependencies import get_task_service
+from src.core.metrics import REGISTRY
+from src.main import app
+from src.schemas.task import TaskRequest
+from src.services.scheduler import TaskScheduler
+
+client = TestClient(app)
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_endpoint_counts_requests_per_route():
+    before = sample(
+        "taskflow_http_requests_total",
+        method="GET",
+        route="/api/v1/status/health",
+        status="200",
+    )
+    assert client.get("/api/v1/status/health").status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "taskflow_node_duration_seconds" in response.text
+    after = sample(
+        "taskflow_http_requests_total",
+        method="GET",
+        route="/api/v1/status/health",
+        status="200",
+    )
+    assert after == before + 1
+
+
+def test_task_run_records_node_llm_and_task_metrics(recording_llm, make_service):
+    async def scenario():
+        service = make_service(recording_llm)
+        request = TaskRequest(
+            prompt="Research two options, then compare them",
+            options={"reflection": "off"},
+        )
+        await service.task_store.create_task("t1", request)
+        await service.execute_task("t1", request)
+        await service.close()
+
+    nodes = {
+        node: sample("taskflow_node_duration_seconds_count", node=node)
+        for node in ("plan", "execute")
+    }
+    calls = sample("taskflow_llm_call_duration_seconds_count", node="execute")
+    tasks = sample("taskflow_task_duration_seconds_count", status="completed")
+
+    asyncio.run(scenario())
+
+    for node, count in nodes.items():
+        assert sample("taskflow_node_duration_seconds_count", node=node) == count + 1
+    assert sample("taskflow_llm_call_duration_seconds_count", node="execute") == (
+        calls + 1
+    )
+    assert sample("taskflow_llm_tokens_count", node="plan", kind="prompt") >= 1
+    assert sample("taskflow_task_duration_seconds_count", status="completed") == (
+        tasks + 1
+    )
+    assert sample("taskflow_tasks_in_flight") == 0
+
+
+def test_system_status_reports_live_service_state():
+    data = client.get("/api/v1/status").json()
+    assert data["services"]["ai_services"] == "available"
+    assert data["services"]["task_executor"] in ("running", "stopped")
+    assert isinstance(data["uptime"], float)
+    assert client.get("/api/v1/status/health").json()["timestamp"] != (
+        "2024-01-01T00:00:00Z"
+    )
+
+
+def test_queue_depth_follows_the_process_scheduler():
+    """Other schedulers do not take over the queue depth gauge"""
+    scheduler = get_task_service().scheduler
+    scheduler.queued.add("waiting")
+    try:
+        TaskScheduler(None)
+        assert sample("taskflow_tasks_queued") == 1
+    finally:
+        scheduler.queued.discard("waiting")
+
+
+def test_memory_gauges_report_the_process_store():
+    usage = get_task_service().task_store.get_memory_usage()
+    assert sample("taskflow_retained_tasks") == usage.get("tasks", 0)
+    assert sample("taskflow_store_bytes") == usage.get("finished_bytes", 0)
+    assert sample("process_rss_bytes") > 0
+    assert "taskflow_store_bytes" in client.get("/metrics").text
@@ -0,0 +1,114 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.core.config import settings
+from src.core.rate_limiter import CircuitBreaker, LLMGovernor, TokenBucket
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FlakyCall:
+    """Fails with the given status codes before answering"""
+
+    def __init__(self, *statuses: int):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.statuses:
+            raise ProviderError(self.statuses.pop(0))
+        return "ok"
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_RETRY_BASE_DELAY", 0.01)
+    monkeypatch.setattr(settings, "LLM_RETRY_MAX_DELAY", 0.05)
+
+
+def test_token_bucket_waits_once_the_burst_is_spent():
+    async def scenario():
+        bucket = TokenBucket(60000)  # 1000 units per second
+        first = await bucket.acquire(60000)
+        started = time.monotonic()
+        second = await bucket.acquire(100)
+        return first, second, time.monotonic() - started
+
+    first, second, elapsed = asyncio.run(scenario())
+    assert first == 0
+    assert second > 0
+    assert 0.05 < elapsed < 1
+
+
+def test_retryable_errors_are_retried_and_others_raised():
+    async def scenario():
+        governor = LLMGovernor(max_retries=3)
+        flaky = FlakyCall(429, 503)
+        result = await governor.call(flaky, tokens=10)
+        bad_request = FlakyCall(400)
+        with pytest.raises(ProviderError):
+            await governor.call(bad_request)
+        return result, flaky.calls, bad_request.calls, governor.get_metrics()
+
+    result, calls, bad_calls, metrics = asyncio.run(scenario())
+    assert result == "ok"
+    assert calls == 3
+    assert bad_calls == 1
+    assert metrics["retries"] == 2
+    assert metrics["breaker_state"] == "closed"
+
+
+def test_open_breaker_queues_callers_until_a_probe_succeeds():
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+        governor = LLMGovernor(max_retries=0, breaker=breaker)
+        for _ in range(2):
+            with pytest.raises(ProviderError):
+                await governor.call(FlakyCall(500))
+        opened = breaker.state
+        started = time.monotonic()
+        results = await asyncio.gather(*(governor.call(FlakyCall()) for _ in range(3)))
+        return opened, time.monotonic() - started, results, governor.get_metrics()
+
+    opened, waited, results, metrics = asyncio.run(scenario())
+    assert opened == "open"
+    assert waited >= 0.15
+    assert results == ["ok", "ok", "ok"]
+    assert metrics["breaker_state"] == "closed"
+    assert metrics["breaker_opens"] == 1
+
+
+def test_wrapped_provider_failure_counts_against_the_breaker():
+    """An interrupted stream is not retried but still trips the breaker"""
+    calls = []
+
+    async def interrupted():
+        calls.append(1)
+        try:
+            raise ProviderError(503)
+        except ProviderError as e:
+            raise RuntimeError("stream interrupted") from e
+
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        governor = LLMGovernor(max_retries=3, breaker=breaker)
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await governor.call(interrupted)
+        return governor.get_metrics()
+
+    metrics = asyncio.run(scenario())
+    assert len(calls) == 2
+    assert metrics["retries"] == 0
+    assert metrics["failures"] == 2
+    assert metrics["breaker_state"] == "open"
@@ -0,0 +1,60 @@
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.models.records import StepRecord, pack_text, unpack_text
+from src.schemas.step import StepLog, StepStatus
+from src.schemas.task import TaskStatus
+from src.storage.task_store import TaskStore
+
+
+def test_large_text_is_compressed_and_restored():
+    """Only text past the threshold that actually shrinks is compressed"""
+    long = "the plan has many repeated words " * 500
+    packed = pack_text(long)
+    assert isinstance(packed, bytes) and len(packed) < len(long)
+    assert unpack_text(packed) == long
+    assert pack_text("short") == "short"
+    assert pack_text(None) is None
+
+
+def test_step_record_round_trip_interns_names():
+    """A stored step converts back to an equal StepLog"""
+    step = StepLog(
+        id="t1_planning",
+        task_id="t1",
+        step_name="".join(["Plan", "ning"]),
+        status=StepStatus.COMPLETED,
+        message="x" * 5000,
+        details={"prompt_tokens": 10},
+        started_at=datetime(2026, 1, 1),
+    )
+    record = StepRecord.from_log(step)
+    other = StepRecord.from_log(step.model_copy(update={"step_name": "Planning"}))
+
+    assert record.step_name is other.step_name
+    assert isinstance(record.message, bytes)
+    assert record.to_log("t1") == step
+
+
+def test_store_compresses_finished_output():
+    """Finished output is held compressed and read back unchanged"""
+
+    async def scenario():
+        store = TaskStore()
+        await store.create_task("t1", None)
+        await store.append_output("t1", "y" * 3000)
+        await store.append_output("t1", "y" * 3000)
+        running = store.tasks["t1"].output
+        await store.update_task_status(
+            "t1", TaskStatus.COMPLETED, completed_at=datetime.utcnow()
+        )
+        return running, store.tasks["t1"].output, await store.get_task("t1")
+
+    running, finished, task = asyncio.run(scenario())
+    assert isinstance(running, str)
+    assert isinstance(finished, bytes)
+    assert task.output == "y" * 6000
+    assert task.metadata == {}
@@ -0,0 +1,60 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.schemas.task import TaskRequest, TaskStatus
+
+
+def test_deferred_reflection_runs_after_completion(recording_llm, make_service):
+    """The task completes after execute; reflection lands in metadata later"""
+
+    async def scenario():
+        llm = recording_llm
+        llm.reflection_gate.clear()
+        service = make_service(llm)
+        request = TaskRequest(
+            prompt="hi", options={"reflection": "deferred", "route": "plan"}
+        )
+        await service.task_store.create_task("t1", request)
+        await service.execute_task("t1", request)
+        completed = await service.get_task_status("t1")
+        calls_at_completion = len(llm.prompts)
+
+        llm.reflection_gate.set()
+        await service.reflections.queue.join()
+        reflected = await service.get_task_status("t1")
+        await service.close()
+        return completed, calls_at_completion, reflected
+
+    completed, calls, reflected = asyncio.run(scenario())
+    assert completed.status == TaskStatus.COMPLETED
+    assert completed.metadata["reflection_status"] == "pending"
+    assert calls == 2
+    assert reflected.metadata["reflection_status"] == "completed"
+    assert reflected.metadata["reflection"] == "reply 3"
+
+
+def test_reflection_can_be_disabled_or_sampled_out(recording_llm, make_service):
+    """reflection=off and a zero sample rate both skip the reflection call"""
+
+    async def scenario():
+        llm = recording_llm
+        service = make_service(llm)
+        for task_id, options in [
+            ("off", {"reflection": "off", "route": "plan"}),
+            (
+                "sampled",
+                {"reflection": "inline", "reflection_sample_rate": 0, "route": "plan"},
+            ),
+        ]:
+            request = TaskRequest(prompt="hi", options=options)
+            await service.task_store.create_task(task_id, request)
+            await service.execute_task(task_id, request)
+        metrics = service.reflections.get_metrics()
+        await service.close()
+        return len(llm.prompts), metrics
+
+    calls, metrics = asyncio.run(scenario())
+    assert calls == 4
+    assert metrics["submitted"] == 0
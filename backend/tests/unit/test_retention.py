@@ -0,0 +1,62 @@
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.schemas.task import TaskStatus
+from src.services.retention import RetentionSweeper
+from src.storage.task_store import TaskStore
+
+
+async def finished_store(count: int) -> TaskStore:
+    store = TaskStore()
+    for i in range(count):
+        await store.create_task(f"t{i}", None)
+        await store.update_task_status(
+            f"t{i}",
+            TaskStatus.COMPLETED,
+            output="x" * 100,
+            completed_at=datetime.utcnow() - timedelta(minutes=count - i),
+        )
+    return store
+
+
+def test_oldest_finished_tasks_are_evicted_first():
+    """Count and byte limits evict in completion order; running tasks stay"""
+
+    async def scenario():
+        store = await finished_store(3)
+        await store.create_task("running", None)
+        by_count = await store.evict_tasks(max_tasks=3, max_bytes=10**9, ttl=3600)
+        size = store.finished["t2"][1]
+        by_bytes = await store.evict_tasks(max_tasks=100, max_bytes=size, ttl=3600)
+        return by_count, by_bytes, store
+
+    by_count, by_bytes, store = asyncio.run(scenario())
+    assert [t.id for t in by_count] == ["t0"]
+    assert [t.id for t in by_bytes] == ["t1"]
+    assert sorted(store.tasks) == ["running", "t2"]
+    assert store.get_memory_usage()["finished_tasks"] == 1
+    assert store.statistics.snapshot()["completed_tasks"] == 3
+
+
+def test_sweeper_archives_expired_tasks(tmp_path):
+    """Tasks past the TTL are written to the archive and dropped"""
+    archive = tmp_path / "archive.jsonl"
+
+    async def scenario():
+        store = await finished_store(2)
+        sweeper = RetentionSweeper(store, ttl=90, archive_path=str(archive))
+        evicted = await sweeper.sweep()
+        return evicted, await store.get_task("t0"), sweeper.get_metrics()
+
+    evicted, task, metrics = asyncio.run(scenario())
+    assert evicted == 1
+    assert task is None
+    assert [json.loads(line)["id"] for line in archive.read_text().splitlines()] == [
+        "t0"
+    ]
+    assert metrics["archived"] == 1
+    assert metrics["store"]["tasks"] == 1
@@ -0,0 +1,83 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.agents.router import DIRECT, FULL, PLANNED, TaskRouter
+from src.schemas.task import TaskRequest, TaskStatus
+
+
+def test_router_chooses_route_from_prompt_and_options():
+    router = TaskRouter()
+    assert router.choose({"prompt": "Translate 'hello' to French"}) == DIRECT
+    assert router.choose({"prompt": "First outline the plan, then write it"}) == PLANNED
+    assert router.choose({"prompt": "word " * 200}) == PLANNED
+    assert (
+        router.choose({"prompt": "Compare two designs", "reflection_mode": "inline"})
+        == FULL
+    )
+    assert router.choose({"prompt": "hi", "options": {"route": "full"}}) == FULL
+    assert (
+        router.choose(
+            {"prompt": "hi", "options": {"route": "full"}, "reflection_mode": "off"}
+        )
+        == PLANNED
+    )
+    assert router.choose({"prompt": "hi", "plan": "1. say hi"}) == PLANNED
+
+
+def test_simple_prompt_skips_planning_call(recording_llm, make_service):
+    """A direct route makes a single LLM call and is counted in statistics"""
+
+    async def scenario():
+        llm = recording_llm
+        service = make_service(llm)
+        tasks = [
+            ("simple", "What is the capital of France?"),
+            ("complex", "Research three databases, then compare them"),
+        ]
+        for task_id, prompt in tasks:
+            request = TaskRequest(prompt=prompt, options={"reflection": "off"})
+            await service.task_store.create_task(task_id, request)
+            await service.execute_task(task_id, request)
+        simple = await service.get_task_status("simple")
+        stats = await service.get_statistics()
+        await service.close()
+        return llm.prompts, simple, stats["routing"]
+
+    prompts, simple, routing = asyncio.run(scenario())
+    assert len(prompts) == 3
+    assert prompts[0].startswith("What is the capital")
+    assert simple.status == TaskStatus.COMPLETED
+    assert simple.metadata["route"] == DIRECT
+    assert routing["routes"][DIRECT]["count"] == 1
+    assert routing["routes"][PLANNED]["count"] == 1
+    assert routing["saved_seconds"] >= 0
+
+
+def test_full_route_does_not_override_disabled_reflection(recording_llm, make_service):
+    """Requesting the full route never runs reflection that was turned off"""
+
+    async def scenario():
+        llm = recording_llm
+        service = make_service(llm)
+        options = [
+            {"reflection": "off", "route": "full"},
+            {"reflection_sample_rate": 0, "route": "full"},
+        ]
+        tasks = []
+        for i, task_options in enumerate(options):
+            request = TaskRequest(prompt="Say hi", options=task_options)
+            await service.task_store.create_task(f"t{i}", request)
+            await service.execute_task(f"t{i}", request)
+            tasks.append(await service.get_task_status(f"t{i}"))
+        await service.close()
+        return llm.prompts, tasks
+
+    prompts, tasks = asyncio.run(scenario())
+    assert len(prompts) == 4
+    for task in tasks:
+        assert task.status == TaskStatus.COMPLETED
+        assert task.metadata["route"] == PLANNED
+        assert "reflection" not in task.metadata
+        assert "Reflection" not in [step.step_name for step in task.steps]
@@ -0,0 +1,116 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.schemas.task import TaskRequest
+from src.services.scheduler import TaskScheduler, QueueFullError
+
+
+def test_concurrency_is_bounded_by_worker_count():
+    """No more than max_workers tasks run at once"""
+
+    async def scenario():
+        running = 0
+        peak = 0
+
+        async def runner(task_id, task_request):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        scheduler = TaskScheduler(runner, max_workers=2, max_queue_size=10)
+        for i in range(6):
+            await scheduler.submit(f"task-{i}", TaskRequest(prompt="hi"))
+        await scheduler.queue.join()
+        await scheduler.stop()
+        return peak, scheduler.get_metrics()
+
+    peak, metrics = asyncio.run(scenario())
+    assert peak == 2
+    assert metrics["processed"] == 6
+    assert metrics["queue_depth"] == 0
+
+
+def test_higher_priority_runs_first():
+    """Lower priority values are dequeued first"""
+
+    async def scenario():
+        order = []
+
+        async def runner(task_id, task_request):
+            order.append(task_id)
+
+        scheduler = TaskScheduler(runner, max_workers=1, max_queue_size=10)
+        scheduler.start()
+        # The worker cannot run until we yield, so both tasks are queued first
+        await scheduler.submit("low", TaskRequest(prompt="a", options={"priority": 9}))
+        await scheduler.submit("high", TaskRequest(prompt="b", options={"priority": 0}))
+        await scheduler.queue.join()
+        await scheduler.stop()
+        return order
+
+    assert asyncio.run(scenario()) == ["high", "low"]
+
+
+def test_full_queue_raises_with_retry_after():
+    """Submissions beyond the queue bound are rejected"""
+
+    async def scenario():
+        async def runner(task_id, task_request):
+            await asyncio.sleep(1)
+
+        scheduler = TaskScheduler(runner, max_workers=1, max_queue_size=1)
+        await scheduler.submit("a", TaskRequest(prompt="a"))
+        with pytest.raises(QueueFullError) as exc_info:
+            await scheduler.submit("b", TaskRequest(prompt="b"))
+        await scheduler.stop()
+        return exc_info.value, scheduler.get_metrics()
+
+    error, metrics = asyncio.run(scenario())
+    assert error.retry_after >= 1
+    assert metrics["rejected"] == 1
+
+
+def test_cancelling_a_queued_task_frees_its_slot():
+    """A cancelled task no longer counts against the queue bound"""
+
+    async def scenario():
+        async def runner(task_id, task_request):
+            await asyncio.sleep(1)
+
+        scheduler = TaskScheduler(runner, max_workers=1, max_queue_size=1)
+        await scheduler.submit("a", TaskRequest(prompt="a"))
+        assert await scheduler.cancel("a")
+        await scheduler.submit("b", TaskRequest(prompt="b"))
+        with pytest.raises(QueueFullError):
+            await scheduler.submit("c", TaskRequest(prompt="c"))
+        depth = scheduler.depth()
+        await scheduler.stop()
+        return depth
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_batch_is_admitted_all_or_nothing():
+    """A batch that does not fit is rejected without queueing any task"""
+
+    async def scenario():
+        async def runner(task_id, task_request):
+            pass
+
+        scheduler = TaskScheduler(runner, max_workers=1, max_queue_size=3)
+        scheduler.start()
+        batch = [(f"task-{i}", TaskRequest(prompt="hi")) for i in range(2)]
+        await scheduler.submit_many(batch)
+        with pytest.raises(QueueFullError):
+            await scheduler.submit_many(batch)
+        depth = scheduler.get_metrics()["queue_depth"]
+        await scheduler.stop()
+        return depth
+
+    assert asyncio.run(scenario()) == 2
@@ -0,0 +1,113 @@
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+from chromadb import Documents, EmbeddingFunction, Embeddings
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.integrations.semantic_cache import SemanticCache
+from src.schemas.task import TaskRequest
+from src.services.event_hub import EventHub
+from src.services.task_service import TaskService
+from src.storage.task_store import TaskStore
+
+
+class BagOfWords(EmbeddingFunction):
+    """Deterministic embedding so tests do not download a model"""
+
+    def __init__(self):
+        pass
+
+    def __call__(self, input: Documents) -> Embeddings:
+        embeddings = []
+        for text in input:
+            vector = [0.0] * 64
+            for word in text.lower().split():
+                vector[sum(word.encode()) % 64] += 1.0
+            embeddings.append(vector)
+        return embeddings
+
+
+def make_cache() -> SemanticCache:
+    return SemanticCache(
+        tempfile.mkdtemp(), threshold=0.9, embedding_function=BagOfWords()
+    )
+
+
+def test_batched_lookups_match_same_context_only():
+    """Concurrent lookups share a batch and respect the request context"""
+
+    async def scenario():
+        cache = make_cache()
+        cache.add("t1", "summarize the report", "ctx", "plan", "summary", 3.0)
+        results = await asyncio.gather(
+            cache.lookup("Summarize the  report", "ctx"),
+            cache.lookup("summarize the report", "other"),
+            cache.lookup("write a poem", "ctx"),
+        )
+        await cache.close()
+        return results, cache.get_metrics()
+
+    (hit, other_context, unrelated), metrics = asyncio.run(scenario())
+    assert hit.task_id == "t1" and hit.output == "summary"
+    assert other_context is None and unrelated is None
+    assert metrics["hits"] == 1 and metrics["lookups"] == 3
+    assert metrics["saved_seconds"] == 3.0
+
+
+def test_close_drains_every_pending_batch():
+    """Inserts and lookups beyond one batch are all handled at shutdown"""
+
+    async def scenario():
+        cache = SemanticCache(
+            tempfile.mkdtemp(), max_batch=2, embedding_function=BagOfWords()
+        )
+        for i in range(5):
+            cache.add(f"t{i}", f"prompt number {i}", "ctx", None, "out", 1.0)
+        lookups = [
+            asyncio.ensure_future(cache.lookup(f"question {i}", "ctx"))
+            for i in range(3)
+        ]
+        await asyncio.sleep(0)
+        await cache.close()
+        return cache.collection.count(), await asyncio.gather(*lookups)
+
+    stored, results = asyncio.run(scenario())
+    assert stored == 5
+    assert results == [None, None, None]
+
+
+def test_executor_reuses_output_of_similar_task():
+    """A near-duplicate prompt is answered without running the workflow"""
+
+    async def scenario():
+        service = TaskService(TaskStore(), EventHub())
+        executor = service.task_executor
+        executor.semantic_cache = make_cache()
+        request = TaskRequest(prompt="summarize the report")
+        state = {
+            "model": request.model,
+            "temperature": request.temperature,
+            "max_tokens": request.max_tokens,
+            "system_prompt": request.system_prompt,
+        }
+        executor.semantic_cache.add(
+            "t0",
+            request.prompt,
+            executor._semantic_context(state),
+            "plan",
+            "summary",
+            2.0,
+        )
+        await service.task_store.create_task("t1", request)
+        result = await executor.execute(
+            "t1", TaskRequest(prompt="Summarize the report")
+        )
+        await executor.close()
+        return result, await service.get_statistics()
+
+    result, stats = asyncio.run(scenario())
+    assert result["output"] == "summary"
+    assert result["metadata"]["semantic_cache"]["task_id"] == "t0"
+    assert stats["semantic_cache"]["hit_rate"] == 1
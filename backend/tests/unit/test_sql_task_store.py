@@ -0,0 +1,224 @@
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.schemas.step import StepLog, StepStatus
+from src.schemas.task import TaskRequest, TaskStatus
+from src.storage.sql_task_store import SQLTaskStore
+
+
+def make_step(task_id: str, name: str) -> StepLog:
+    return StepLog(
+        id=f"{task_id}_{name.lower()}",
+        task_id=task_id,
+        step_name=name,
+        status=StepStatus.COMPLETED,
+        message=name,
+    )
+
+
+def test_tasks_and_steps_survive_restart(tmp_path):
+    """Tasks and buffered steps are persisted and read back after reopening"""
+    url = f"sqlite:///{tmp_path / 'tasks.db'}"
+
+    async def write():
+        store = SQLTaskStore(url, flush_interval=60)
+        await store.start()
+        await store.create_task("t1", TaskRequest(prompt="hello"))
+        await store.add_step("t1", make_step("t1", "Planning"))
+        await store.add_step("t1", make_step("t1", "Execution"))
+
+        # Buffered steps are visible before they are flushed
+        task = await store.get_task("t1")
+        assert [s.step_name for s in task.steps] == ["Planning", "Execution"]
+        assert store.pending_steps
+
+        await store.update_task_status(
+            "t1", TaskStatus.COMPLETED, output="done", completed_at=datetime.utcnow()
+        )
+        await store.close()
+
+    async def read():
+        store = SQLTaskStore(url)
+        await store.start()
+        task = await store.get_task("t1")
+        stats = await store.get_statistics()
+        await store.close()
+        return task, stats
+
+    asyncio.run(write())
+    task, stats = asyncio.run(read())
+    assert task.status == TaskStatus.COMPLETED
+    assert task.output == "done"
+    assert [s.step_name for s in task.steps] == ["Planning", "Execution"]
+    assert stats["total_tasks"] == 1
+    assert stats["completed_tasks"] == 1
+
+
+def test_steps_are_flushed_in_batches(tmp_path):
+    """Filling a batch triggers a flush without waiting for the interval"""
+    url = f"sqlite:///{tmp_path / 'tasks.db'}"
+
+    async def scenario():
+        store = SQLTaskStore(url, flush_interval=60, batch_size=3)
+        await store.start()
+        await store.create_task("t1", None)
+        for name in ["A", "B", "C"]:
+            await store.add_step("t1", make_step("t1", name))
+        for _ in range(50):
+            if not store.pending_steps:
+                break
+            await asyncio.sleep(0.01)
+        pending = len(store.pending_steps)
+        await store.close()
+        return pending
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_cursor_pagination(tmp_path):
+    """Keyset pages follow (started_at, id) order"""
+    url = f"sqlite:///{tmp_path / 'tasks.db'}"
+
+    async def scenario():
+        store = SQLTaskStore(url)
+        await store.start()
+        base = datetime(2025, 1, 1)
+        for i in range(5):
+            await store.create_task(f"t{i}", None)
+            await store.update_task_status(
+                f"t{i}", TaskStatus.RUNNING, started_at=base + timedelta(minutes=i)
+            )
+        first = await store.list_tasks(limit=3)
+        second = await store.list_tasks(
+            limit=3, cursor=(first[-1].started_at, first[-1].id)
+        )
+        await store.close()
+        return [t.id for t in first], [t.id for t in second]
+
+    assert asyncio.run(scenario()) == (["t4", "t3", "t2"], ["t1", "t0"])
+
+
+def test_batch_created_in_one_transaction(tmp_path):
+    """Batch tasks are created together and summarized per status"""
+    url = f"sqlite:///{tmp_path / 'tasks.db'}"
+
+    async def scenario():
+        store = SQLTaskStore(url)
+        await store.start()
+        tasks = [(f"t{i}", TaskRequest(prompt=f"p{i}")) for i in range(3)]
+        await store.create_tasks(tasks, batch_id="b1")
+        await store.update_task_status(
+            "t0", TaskStatus.COMPLETED, completed_at=datetime.utcnow()
+        )
+        summary = await store.get_batch_summary("b1")
+        listed = await store.list_batch_tasks("b1", limit=2)
+        missing = await store.get_batch_summary("nope")
+        await store.close()
+        return summary, listed, missing
+
+    summary, listed, missing = asyncio.run(scenario())
+    assert summary["total"] == 3
+    assert summary["statuses"]["pending"] == 2
+    assert summary["finished"] == 1
+    assert not summary["complete"]
+    assert len(listed) == 2 and listed[0].metadata["batch_id"] == "b1"
+    assert missing is None
+
+
+def test_steps_are_upserted_by_id(tmp_path):
+    """A step replaces its earlier record whether or not that was flushed"""
+    url = f"sqlite:///{tmp_path / 'tasks.db'}"
+
+    def step(name, status, progress=None):
+        return make_step("t1", name).model_copy(
+            update={"status": status, "progress": progress}
+        )
+
+    async def scenario():
+        store = SQLTaskStore(url, flush_interval=60)
+        await store.start()
+        await store.create_task("t1", None)
+        await store.add_step("t1", step("Planning", StepStatus.RUNNING))
+        await store.flush()
+        await store.add_step("t1", step("Planning", StepStatus.COMPLETED))
+        await store.add_step("t1", step("Execution", StepStatus.RUNNING, 0.2))
+        await store.add_step("t1", step("Execution", StepStatus.RUNNING, 0.5))
+        buffered = len(store.pending_steps)
+        before = await store.get_task("t1")
+        await store.close()
+
+        store = SQLTaskStore(url)
+        await store.start()
+        after = await store.get_task("t1")
+        await store.close()
+        return buffered, before, after
+
+    buffered, before, after = asyncio.run(scenario())
+    assert buffered == 2
+    for task in (before, after):
+        assert [(s.step_name, s.status) for s in task.steps] == [
+            ("Planning", StepStatus.COMPLETED),
+            ("Execution", StepStatus.RUNNING),
+        ]
+        assert task.steps[1].progress == 0.5
+
+
+def test_finished_task_keeps_its_status(tmp_path):
+    """A status written by another store instance is not overwritten"""
+    url = f"sqlite:///{tmp_path / 'tasks.db'}"
+
+    async def scenario():
+        worker = SQLTaskStore(url)
+        api = SQLTaskStore(url)
+        await worker.start()
+        await api.start()
+        await worker.create_task("t1", None)
+        await worker.update_task_status("t1", TaskStatus.RUNNING)
+        cancelled = await api.update_task_status("t1", TaskStatus.CANCELLED)
+        completed = await worker.update_task_status(
+            "t1", TaskStatus.COMPLETED, output="late"
+        )
+        task = await api.get_task("t1")
+        stats = await worker.get_statistics()
+        await worker.close()
+        await api.close()
+        return cancelled, completed, task, stats
+
+    cancelled, completed, task, stats = asyncio.run(scenario())
+    assert cancelled and not completed
+    assert task.status == TaskStatus.CANCELLED
+    assert task.output is None
+    assert stats["completed_tasks"] == 0
+
+
+def test_steps_of_deleted_task_do_not_fail_the_batch(tmp_path):
+    """Only the orphaned steps are dropped from a flush"""
+    url = f"sqlite:///{tmp_path / 'tasks.db'}"
+
+    async def scenario():
+        store = SQLTaskStore(url, flush_interval=60)
+        await store.start()
+        await store.create_task("kept", None)
+        await store.create_task("gone", None)
+        await store.add_step("kept", make_step("kept", "Planning"))
+        await store.add_step("gone", make_step("gone", "Planning"))
+        # Deleted by another process, so the buffered step is still here
+        other = SQLTaskStore(url)
+        await other.start()
+        await other.delete_task("gone")
+        await other.close()
+        await store.flush()
+        await store.add_step("kept", make_step("kept", "Execution"))
+        await store.close()
+
+        store = SQLTaskStore(url)
+        await store.start()
+        task = await store.get_task("kept")
+        await store.close()
+        return task
+
+    task = asyncio.run(scenario())
+    assert [s.step_name for s in task.steps] == ["Planning", "Execution"]
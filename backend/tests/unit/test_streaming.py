@@ -0,0 +1,111 @@
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.agents.streaming import OutputBuffer
+from src.core.config import settings
+
+
+class ChunkedLLM:
+    """Minimal chat model stand-in that streams fixed chunks"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def astream(self, messages, **kwargs):
+        for chunk in self.chunks:
+            yield SimpleNamespace(content=chunk)
+
+
+def test_buffer_coalesces_chunks():
+    """Small chunks are written together with their offsets"""
+
+    async def scenario():
+        writes = []
+
+        async def on_flush(text, offset):
+            writes.append((offset, text))
+
+        buffer = OutputBuffer(on_flush, interval=60, max_chars=5)
+        for chunk in ["ab", "cd", "ef", "g"]:
+            await buffer.append(chunk)
+        await buffer.flush()
+        return writes, buffer.text
+
+    writes, text = asyncio.run(scenario())
+    assert writes == [(0, "abcdef"), (6, "g")]
+    assert text == "abcdefg"
+
+
+def test_execute_node_streams_partial_output(make_service):
+    """Streamed output reaches the store and subscribers as it arrives"""
+
+    async def scenario():
+        service = make_service(ChunkedLLM(["Hel", "lo ", "world"]))
+        executor = service.task_executor
+        await service.task_store.create_task("t1", None)
+        queue = service.event_hub.subscribe("t1")
+
+        state = {
+            "task_id": "t1",
+            "prompt": "greet",
+            "plan": "say hello",
+            "options": {"stream": True},
+        }
+        state = await executor._execute_task(state)
+        partial = await service.get_task_output("t1", offset=3)
+
+        deltas = []
+        while not queue.empty():
+            event = queue.get_nowait()
+            if event["type"] == "output":
+                deltas.append(event["data"]["delta"])
+        return state["output"], partial, "".join(deltas)
+
+    output, partial, streamed = asyncio.run(scenario())
+    assert output == "Hello world"
+    assert streamed == "Hello world"
+    assert partial["delta"] == "lo world"
+    assert partial["offset"] == len("Hello world")
+
+
+def test_streaming_step_reports_progress_in_place(monkeypatch, make_service):
+    """Progress updates replace the Execution step, which keeps its start"""
+    monkeypatch.setattr(settings, "STREAM_FLUSH_CHARS", 1)
+    monkeypatch.setattr(settings, "STEP_PROGRESS_INTERVAL", 1e-9)
+
+    async def scenario():
+        service = make_service(ChunkedLLM(["Hel", "lo ", "world"]))
+        executor = service.task_executor
+        await service.task_store.create_task("t1", None)
+        queue = service.event_hub.subscribe("t1")
+
+        state = {
+            "task_id": "t1",
+            "prompt": "greet",
+            "plan": "say hello",
+            "options": {"stream": True},
+        }
+        await executor._execute_task(state)
+        task = await service.get_task_status("t1")
+
+        steps = []
+        while not queue.empty():
+            event = queue.get_nowait()
+            if event["type"] == "step":
+                steps.append(event["data"])
+        return task, steps
+
+    task, steps = asyncio.run(scenario())
+    progress = [step["progress"] for step in steps if step["progress"] is not None]
+    assert len(progress) > 1
+    assert progress == sorted(progress) and progress[-1] == 1.0
+    assert len({step["started_at"] for step in steps}) == 1
+    assert [step.step_name for step in task.steps] == ["Execution"]
+    execution = task.steps[0]
+    assert (
+        execution.duration
+        == (execution.completed_at - execution.started_at).total_seconds()
+    )
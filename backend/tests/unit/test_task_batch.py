@@ -0,0 +1,103 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.core.dependencies import get_task_service
+from src.main import app
+from src.schemas.task import TaskRequest, TaskStatus
+from src.services.event_hub import EventHub
+from src.services.scheduler import QueueFullError, TaskScheduler
+from src.services.task_service import TaskService
+from src.storage.task_store import TaskStore
+
+
+class RecordingService:
+    """Task service stand-in that records submitted batches"""
+
+    def __init__(self):
+        self.batches = []
+
+    async def submit_batch(self, task_requests):
+        self.batches.append(task_requests)
+        return "b1", [f"t{i}" for i in range(len(task_requests))]
+
+
+def test_batch_endpoint_accepts_array_and_ndjson():
+    """Both body formats are validated and submitted as one batch"""
+    service = RecordingService()
+    app.dependency_overrides[get_task_service] = lambda: service
+    try:
+        client = TestClient(app)
+        array = client.post(
+            "/api/v1/tasks:batch", json=[{"prompt": "a"}, {"prompt": "b"}]
+        )
+        ndjson = client.post(
+            "/api/v1/tasks:batch",
+            content="\n".join(json.dumps({"prompt": p}) for p in "xyz") + "\n",
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        invalid = client.post(
+            "/api/v1/tasks:batch", json=[{"prompt": "ok"}, {"prompt": ""}]
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert array.status_code == 200
+    assert array.json()["task_ids"] == ["t0", "t1"]
+    assert ndjson.status_code == 200
+    assert [r.prompt for r in service.batches[1]] == ["x", "y", "z"]
+    assert invalid.status_code == 422
+    assert invalid.json()["detail"][0]["loc"][0] == 1
+    assert len(service.batches) == 2
+
+
+def test_batch_progress_is_aggregated():
+    """Batch status counts tasks per status as they finish"""
+
+    async def scenario():
+        async def leave_pending(task_id, task_request):
+            pass
+
+        service = TaskService(TaskStore(), EventHub())
+        service.scheduler = TaskScheduler(leave_pending)
+        batch_id, task_ids = await service.submit_batch(
+            [TaskRequest(prompt="a"), TaskRequest(prompt="b")]
+        )
+        await service.task_store.update_task_status(task_ids[0], TaskStatus.FAILED)
+        status = await service.get_batch_status(batch_id)
+        await service.close()
+        return status
+
+    status = asyncio.run(scenario())
+    assert status["total"] == 2
+    assert status["statuses"]["failed"] == 1
+    assert status["progress"] == 0.5
+
+
+def test_rejected_batch_leaves_nothing_behind():
+    """A batch refused by a full queue is removed along with its tasks"""
+
+    async def scenario():
+        async def block(task_id, task_request):
+            await asyncio.Event().wait()
+
+        service = TaskService(TaskStore(), EventHub())
+        service.scheduler = TaskScheduler(block, max_workers=1, max_queue_size=2)
+        requests = [TaskRequest(prompt="a"), TaskRequest(prompt="b")]
+        await service.submit_batch(requests)
+        await asyncio.sleep(0)
+        for _ in range(3):
+            with pytest.raises(QueueFullError):
+                await service.submit_batch(requests)
+        usage = service.task_store.get_memory_usage()
+        await service.close()
+        return usage
+
+    usage = asyncio.run(scenario())
+    assert usage["tasks"] == 2
+    assert usage["batches"] == 1
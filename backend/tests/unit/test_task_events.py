@@ -0,0 +1,95 @@
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.schemas.step import StepStatus
+from src.schemas.task import TaskStatus
+from src.services.event_hub import EventHub
+from src.services.task_service import TaskService
+from src.storage.task_store import TaskStore
+
+
+def test_subscriber_gets_replay_then_live_steps_and_result():
+    """Earlier steps are replayed once, then live events until the result"""
+
+    async def scenario():
+        service = TaskService(TaskStore(), EventHub())
+        executor = service.task_executor
+        await service.task_store.create_task("t1", None)
+        await executor._add_step("t1", "Planning", StepStatus.RUNNING, "planning")
+
+        events = []
+
+        async def consume():
+            async for event in service.stream_events("t1"):
+                events.append(event)
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        await executor._add_step("t1", "Planning", StepStatus.COMPLETED, "plan")
+        await service._finish_task(
+            "t1", TaskStatus.COMPLETED, output="done", completed_at=datetime.utcnow()
+        )
+        await asyncio.wait_for(consumer, timeout=1)
+        return events, service.event_hub.get_metrics()
+
+    events, metrics = asyncio.run(scenario())
+    assert [(e["type"], e["data"].get("status")) for e in events] == [
+        ("step", "running"),
+        ("step", "completed"),
+        ("result", "completed"),
+    ]
+    assert events[-1]["data"]["output"] == "done"
+    assert "steps" not in events[-1]["data"]
+    assert metrics["subscribers"] == 0
+
+
+def test_slow_subscriber_drops_oldest_events():
+    """A full subscriber queue keeps the newest events"""
+
+    async def scenario():
+        hub = EventHub(queue_size=2)
+        queue = hub.subscribe("t1")
+        for i in range(3):
+            hub.publish("t1", "step", {"n": i})
+        return [queue.get_nowait()["data"]["n"] for _ in range(2)], hub.dropped
+
+    assert asyncio.run(scenario()) == ([1, 2], 1)
+
+
+def test_dropped_output_is_backfilled_from_the_store():
+    """Output deltas lost to a full queue are resent from the stored output"""
+
+    async def scenario():
+        service = TaskService(TaskStore(), EventHub(queue_size=2))
+        await service.task_store.create_task("t1", None)
+
+        events = []
+
+        async def consume():
+            async for event in service.stream_events("t1"):
+                events.append(event)
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        offset = 0
+        for delta in ("one ", "two ", "three ", "four"):
+            await service.task_executor._publish_output("t1", delta, offset)
+            offset += len(delta)
+        await service._finish_task(
+            "t1", TaskStatus.COMPLETED, completed_at=datetime.utcnow()
+        )
+        await asyncio.wait_for(consumer, timeout=1)
+        return events, service.event_hub.dropped
+
+    events, dropped = asyncio.run(scenario())
+    assert dropped
+    text = ""
+    for event in events:
+        if event["type"] == "output":
+            assert event["data"]["offset"] <= len(text)
+            text = text[: event["data"]["offset"]] + event["data"]["delta"]
+    assert text == "one two three four"
+    assert events[-1]["type"] == "result"
@@ -0,0 +1,81 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.core.dependencies import get_task_service
+from src.main import app
+from src.schemas.step import StepLog, StepStatus
+from src.schemas.task import TaskResult, TaskStatus
+
+
+class StaticService:
+    """Task service stand-in returning one mutable task"""
+
+    def __init__(self):
+        self.task = TaskResult(
+            id="t1",
+            status=TaskStatus.RUNNING,
+            output="partial",
+            steps=[self.step("plan", StepStatus.COMPLETED)],
+            metadata={"route": "plan"},
+            started_at=datetime(2026, 1, 1, 12, 0, 0),
+        )
+
+    @staticmethod
+    def step(name, status):
+        return StepLog(id=name, task_id="t1", step_name=name, status=status)
+
+    async def get_task_status(self, task_id):
+        return self.task if task_id == "t1" else None
+
+
+def request_status(service, params=None, headers=None):
+    app.dependency_overrides[get_task_service] = lambda: service
+    try:
+        return TestClient(app).get(
+            "/api/v1/tasks/t1/status", params=params, headers=headers
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_unchanged_task_returns_304():
+    """A matching If-None-Match gets an empty 304 until the task changes"""
+    service = StaticService()
+    first = request_status(service)
+    etag = first.headers["ETag"]
+    unchanged = request_status(service, headers={"If-None-Match": etag})
+    service.task.steps.append(service.step("execute", StepStatus.RUNNING))
+    changed = request_status(service, headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert first.json()["steps"][0]["status"] == "completed"
+    assert first.json()["started_at"] == "2026-01-01T12:00:00"
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_fields_projection_and_step_cursor():
+    """Only requested fields and steps after since_step are returned"""
+    service = StaticService()
+    service.task.steps.append(service.step("execute", StepStatus.RUNNING))
+    projected = request_status(service, {"fields": "status,output"})
+    delta = request_status(service, {"since_step": 1})
+    full = request_status(service)
+    unknown = request_status(service, {"fields": "status,secret"})
+
+    assert projected.json() == {"id": "t1", "status": "running", "output": "partial"}
+    assert [step["id"] for step in delta.json()["steps"]] == ["execute"]
+    # The running step may still change, so polling resumes from it
+    assert delta.headers["X-Next-Step"] == "1"
+    # Different projections of one task must not share an ETag
+    assert (
+        len({projected.headers["ETag"], delta.headers["ETag"], full.headers["ETag"]})
+        == 3
+    )
+    assert unknown.status_code == 400
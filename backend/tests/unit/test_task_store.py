@@ -0,0 +1,154 @@
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.core.dependencies import get_task_service, get_task_store
+from src.schemas.step import StepLog, StepStatus
+from src.schemas.task import TaskStatus
+from src.storage.task_store import TaskStore
+
+
+def test_components_share_one_store():
+    """Service and executor write to the store the routers read"""
+    service = get_task_service()
+    assert service.task_store is get_task_store()
+    assert service.task_executor.task_store is get_task_store()
+
+
+def test_steps_are_attached_on_read():
+    """Steps added concurrently all show up on the task"""
+
+    async def scenario():
+        store = TaskStore()
+        await store.create_task("t1", None)
+        await asyncio.gather(
+            *(
+                store.add_step(
+                    "t1",
+                    StepLog(
+                        id=f"t1_{i}",
+                        task_id="t1",
+                        step_name=f"Step {i}",
+                        status=StepStatus.COMPLETED,
+                    ),
+                )
+                for i in range(50)
+            )
+        )
+        await store.update_task_status("t1", TaskStatus.RUNNING)
+        return store, await store.get_task("t1")
+
+    store, task = asyncio.run(scenario())
+    assert task.status == TaskStatus.RUNNING
+    assert len(task.steps) == 50
+    # The stored record itself does not carry a copy of the step list
+    assert not hasattr(store.tasks["t1"], "steps")
+
+
+def test_steps_are_replaced_in_place():
+    """A step with a known id replaces the earlier record at its position"""
+
+    def step(name, status):
+        return StepLog(
+            id=f"t1_{name.lower()}", task_id="t1", step_name=name, status=status
+        )
+
+    async def scenario():
+        store = TaskStore()
+        await store.create_task("t1", None)
+        await store.add_step("t1", step("Planning", StepStatus.RUNNING))
+        await store.add_step("t1", step("Execution", StepStatus.RUNNING))
+        await store.add_step("t1", step("Planning", StepStatus.COMPLETED))
+        return await store.get_task("t1")
+
+    task = asyncio.run(scenario())
+    assert [(s.step_name, s.status) for s in task.steps] == [
+        ("Planning", StepStatus.COMPLETED),
+        ("Execution", StepStatus.RUNNING),
+    ]
+
+
+def test_cursor_pagination_with_status_filter():
+    """Cursor pages walk the index newest first without repeats"""
+
+    async def scenario():
+        store = TaskStore()
+        base = datetime(2025, 1, 1)
+        for i in range(10):
+            await store.create_task(f"t{i}", None)
+            status = TaskStatus.COMPLETED if i % 2 else TaskStatus.FAILED
+            await store.update_task_status(
+                f"t{i}", status, started_at=base + timedelta(minutes=i)
+            )
+
+        pages = []
+        cursor = None
+        while True:
+            page = await store.list_tasks(
+                limit=2, cursor=cursor, status=TaskStatus.COMPLETED
+            )
+            if not page:
+                break
+            pages.append([t.id for t in page])
+            cursor = (page[-1].started_at, page[-1].id)
+
+        window = await store.list_tasks(
+            limit=10,
+            started_after=base + timedelta(minutes=3),
+            started_before=base + timedelta(minutes=6),
+        )
+        return pages, [t.id for t in window]
+
+    pages, window = asyncio.run(scenario())
+    assert pages == [["t9", "t7"], ["t5", "t3"], ["t1"]]
+    assert window == ["t5", "t4", "t3"]
+
+
+def test_statistics_follow_status_transitions():
+    """Counters and duration percentiles update on each transition"""
+
+    async def scenario():
+        store = TaskStore()
+        base = datetime(2025, 1, 1)
+        for i in range(1, 101):
+            await store.create_task(f"t{i}", None)
+            await store.update_task_status(f"t{i}", TaskStatus.RUNNING, started_at=base)
+            await store.update_task_status(
+                f"t{i}",
+                TaskStatus.COMPLETED if i <= 90 else TaskStatus.FAILED,
+                completed_at=base + timedelta(seconds=i),
+            )
+        await store.create_task("pending", None)
+        return await store.get_statistics(), await store.get_statistics("5m")
+
+    stats, recent = asyncio.run(scenario())
+    assert stats["total_tasks"] == 101
+    assert stats["completed_tasks"] == 90
+    assert stats["failed_tasks"] == 10
+    assert stats["pending_tasks"] == 1
+    assert stats["average_duration"] == 45.5
+    assert abs(stats["duration"]["p50"] - 45) <= 1
+    assert abs(stats["duration"]["p99"] - 89) <= 1
+    assert recent["finished_tasks"] == 100
+    assert recent["completed_tasks"] == 90
+
+
+def test_finished_task_keeps_its_status():
+    """A late completion does not overwrite a cancellation"""
+
+    async def scenario():
+        store = TaskStore()
+        await store.create_task("t1", None)
+        await store.update_task_status("t1", TaskStatus.RUNNING)
+        cancelled = await store.update_task_status("t1", TaskStatus.CANCELLED)
+        completed = await store.update_task_status(
+            "t1", TaskStatus.COMPLETED, output="late"
+        )
+        return cancelled, completed, await store.get_task("t1")
+
+    cancelled, completed, task = asyncio.run(scenario())
+    assert cancelled and not completed
+    assert task.status == TaskStatus.CANCELLED
+    assert task.output is None
@@ -0,0 +1,124 @@
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.core.config import settings
+from src.schemas.task import TaskRequest, TaskStatus
+from src.utils import tokens
+from src.utils.tokens import completion_limit, count_tokens, trim_to_tokens
+
+
+class VerboseLLM:
+    """Chat model stand-in whose plan is far longer than the plan budget"""
+
+    def __init__(self):
+        self.prompts = []
+        self.max_tokens = []
+
+    async def ainvoke(self, messages, **kwargs):
+        self.prompts.append(messages[-1].content)
+        self.max_tokens.append(kwargs.get("max_tokens"))
+        if len(self.prompts) == 1:
+            return SimpleNamespace(content="step " * 5000)
+        return SimpleNamespace(content="done")
+
+
+def test_trim_keeps_start_and_end_within_budget():
+    text = "start " + "filler " * 3000 + "end"
+    trimmed = trim_to_tokens(text, 100)
+    assert trimmed.startswith("start")
+    assert trimmed.endswith("end")
+    assert "tokens omitted" in trimmed
+    assert count_tokens(trimmed) < 150
+    assert trim_to_tokens("short", 100) == "short"
+
+
+def test_failed_encoding_load_is_retried(monkeypatch):
+    """A load that failed falls back to estimates and is tried again later"""
+    attempts = []
+
+    def load(name):
+        attempts.append(name)
+        if len(attempts) == 1:
+            raise ConnectionError("download failed")
+        return "encoding"
+
+    fake = SimpleNamespace(get_encoding=load, encoding_for_model=load)
+    monkeypatch.setitem(sys.modules, "tiktoken", fake)
+    monkeypatch.setattr(tokens, "_encodings", {})
+    monkeypatch.setattr(tokens, "_failed_at", {})
+
+    assert tokens.get_encoding() is None
+    assert tokens.get_encoding() is None
+    tokens._failed_at[None] -= tokens.ENCODING_RETRY_INTERVAL
+    assert tokens.get_encoding() == "encoding"
+    assert tokens.get_encoding() == "encoding"
+    assert len(attempts) == 2
+
+
+def test_completion_limit_fits_the_context_window():
+    assert completion_limit(100, 4000, "gpt-4") == 4000
+    clipped = completion_limit(6000, 4000, "gpt-4")
+    assert settings.TOKEN_MIN_COMPLETION <= clipped <= 8192 - 6000
+    assert completion_limit(6000, 4000, "gpt-4o") == 4000
+    with pytest.raises(ValueError):
+        completion_limit(8100, 4000, "gpt-4")
+
+
+def test_prior_stage_text_is_trimmed_and_tokens_recorded(make_service):
+    async def scenario():
+        llm = VerboseLLM()
+        service = make_service(llm)
+        request = TaskRequest(
+            prompt="Plan the steps to migrate a database",
+            options={"reflection": "off"},
+        )
+        await service.task_store.create_task("t1", request)
+        await service.execute_task("t1", request)
+        task = await service.get_task_status("t1")
+        stats = await service.get_statistics()
+        await service.close()
+        return llm, task, stats["tokens"]
+
+    llm, task, tokens = asyncio.run(scenario())
+    assert task.status == TaskStatus.COMPLETED
+    assert count_tokens(llm.prompts[1]) < settings.TOKEN_PLAN_BUDGET + 200
+    steps = {step.step_name: step for step in task.steps}
+    planning = steps["Planning"].details
+    execution = steps["Execution"].details
+    assert planning["completion_tokens"] >= 5000
+    assert execution["trimmed"] is True
+    assert execution["prompt_tokens"] == count_tokens(llm.prompts[1])
+    assert task.metadata["tokens"]["completion_tokens"] == (
+        planning["completion_tokens"] + execution["completion_tokens"]
+    )
+    assert tokens["nodes"]["execute"]["trimmed"] == 1
+
+
+def test_clipped_calls_share_one_client(make_service):
+    """Each call passes its own max_tokens to the task's one client"""
+
+    async def scenario():
+        llm = VerboseLLM()
+        service = make_service(llm)
+        request = TaskRequest(
+            prompt="word " * 4000,
+            model="gpt-4",
+            max_tokens=4000,
+            options={"reflection": "off"},
+        )
+        await service.task_store.create_task("t1", request)
+        await service.execute_task("t1", request)
+        metrics = service.task_executor.llm_clients.get_metrics()
+        await service.close()
+        return llm, metrics
+
+    llm, metrics = asyncio.run(scenario())
+    assert metrics["created"] == 1
+    assert len(llm.max_tokens) == 2
+    assert all(limit < 4000 for limit in llm.max_tokens)
+    assert llm.max_tokens[0] != llm.max_tokens[1]
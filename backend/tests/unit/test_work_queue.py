@@ -0,0 +1,325 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.core.config import settings
+from src.schemas.step import StepStatus
+from src.schemas.task import TaskRequest, TaskStatus
+from src.services.event_hub import EventHub
+from src.services.leased_scheduler import LeasedTaskScheduler
+from src.services.scheduler import QueueFullError
+from src.services.task_service import TaskService
+from src.services.work_queue import SQLiteWorkQueue
+from src.storage.sql_task_store import SQLTaskStore
+from src.storage.task_store import TaskStore
+
+
+def test_lease_order_heartbeat_and_expiry(tmp_path):
+    """Tasks lease by priority, and an expired lease is handed out again"""
+
+    async def scenario():
+        queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+        await queue.enqueue(
+            [
+                ("low", TaskRequest(prompt="a"), 9),
+                ("high", TaskRequest(prompt="b"), 0),
+            ]
+        )
+        first = await queue.lease("w1", 0.05)
+        assert await queue.heartbeat("high", "w1", 0.05)
+        assert not await queue.heartbeat("high", "w2", 0.05)
+
+        second = await queue.lease("w1", 30)
+        assert await queue.lease("w2", 30) is None
+        await asyncio.sleep(0.1)
+        # w1 stopped sending heartbeats for "high"
+        retried = await queue.lease("w2", 30)
+        assert not await queue.heartbeat("high", "w1", 30)
+        await queue.complete("high", "w2")
+        await queue.complete("low", "w1")
+        empty = await queue.lease("w1", 30)
+        await queue.close()
+        return first, second, retried, empty
+
+    first, second, retried, empty = asyncio.run(scenario())
+    assert (first.task_id, first.attempts) == ("high", 1)
+    assert first.task_request.prompt == "b"
+    assert second.task_id == "low"
+    assert (retried.task_id, retried.attempts) == ("high", 2)
+    assert empty is None
+
+
+def test_enqueue_is_all_or_nothing_and_idempotent(tmp_path):
+    """Capacity is checked for the whole batch and duplicates are ignored"""
+
+    async def scenario():
+        queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+        request = TaskRequest(prompt="a")
+        assert await queue.enqueue([("a", request, 5), ("b", request, 5)], 3)
+        assert not await queue.enqueue([("c", request, 5), ("d", request, 5)], 3)
+        assert await queue.enqueue([("a", request, 5)], 3)
+        pending = queue.pending
+        await queue.close()
+        return pending
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_cancel_drops_pending_and_revokes_leases(tmp_path):
+    """Cancelling a leased task makes the worker's heartbeat fail"""
+
+    async def scenario():
+        queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+        request = TaskRequest(prompt="a")
+        await queue.enqueue([("queued", request, 5), ("running", request, 0)])
+        await queue.lease("w1", 30)
+        results = (
+            await queue.cancel("queued"),
+            await queue.cancel("running"),
+            await queue.cancel("missing"),
+            await queue.heartbeat("running", "w1", 30),
+            await queue.lease("w2", 30),
+        )
+        await queue.close()
+        return results
+
+    assert asyncio.run(scenario()) == (True, True, False, False, None)
+
+
+def test_schedulers_share_one_queue_file(tmp_path):
+    """An API-only scheduler enqueues and two worker schedulers share the work"""
+
+    async def scenario():
+        path = str(tmp_path / "queue.db")
+        ran = {}
+
+        def make_runner(name):
+            async def runner(task_id, task_request):
+                await asyncio.sleep(0.01)
+                ran[task_id] = name
+
+            return runner
+
+        api = LeasedTaskScheduler(
+            make_runner("api"), SQLiteWorkQueue(path), run_workers=False
+        )
+        workers = []
+        for name in ("w1", "w2"):
+            scheduler = LeasedTaskScheduler(
+                make_runner(name),
+                SQLiteWorkQueue(path),
+                max_workers=2,
+                run_workers=True,
+                poll_interval=0.01,
+            )
+            scheduler.worker_id = name
+            scheduler.start()
+            workers.append(scheduler)
+
+        await api.submit_many(
+            [(f"task-{i}", TaskRequest(prompt="hi")) for i in range(8)]
+        )
+        for _ in range(200):
+            if len(ran) == 8:
+                break
+            await asyncio.sleep(0.02)
+        for scheduler in [api] + workers:
+            await scheduler.stop()
+        return ran
+
+    ran = asyncio.run(scenario())
+    assert len(ran) == 8
+    assert set(ran.values()) == {"w1", "w2"}
+
+
+def test_shared_queue_full_raises(tmp_path):
+    """Submitting past the shared queue size raises QueueFullError"""
+
+    async def scenario():
+        async def runner(task_id, task_request):
+            pass
+
+        scheduler = LeasedTaskScheduler(
+            runner,
+            SQLiteWorkQueue(str(tmp_path / "queue.db")),
+            max_queue_size=1,
+            run_workers=False,
+        )
+        await scheduler.submit("a", TaskRequest(prompt="a"))
+        with pytest.raises(QueueFullError):
+            await scheduler.submit("b", TaskRequest(prompt="b"))
+        depth = scheduler.depth()
+        await scheduler.stop()
+        return depth
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_lost_lease_stops_the_run(tmp_path):
+    """A task cancelled through another node stops on the worker's next heartbeat"""
+
+    async def scenario():
+        path = str(tmp_path / "queue.db")
+        started = asyncio.Event()
+        stopped = asyncio.Event()
+
+        async def runner(task_id, task_request):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                stopped.set()
+                raise
+
+        worker = LeasedTaskScheduler(
+            runner,
+            SQLiteWorkQueue(path),
+            max_workers=1,
+            run_workers=True,
+            visibility_timeout=0.15,
+            poll_interval=0.01,
+        )
+        api = LeasedTaskScheduler(runner, SQLiteWorkQueue(path), run_workers=False)
+        worker.start()
+        await api.submit("slow", TaskRequest(prompt="a"))
+        await asyncio.wait_for(started.wait(), 2)
+        assert await api.cancel("slow")
+        await asyncio.wait_for(stopped.wait(), 2)
+        await asyncio.sleep(0.05)
+        metrics = worker.get_metrics()
+        await worker.stop()
+        await api.stop()
+        return metrics
+
+    metrics = asyncio.run(scenario())
+    assert metrics["lost_leases"] == 1
+    assert metrics["active_tasks"] == 0
+
+
+def test_cancelled_task_is_not_completed_by_its_worker(tmp_path):
+    """The worker's run ends without overwriting the cancellation"""
+
+    async def scenario():
+        path = str(tmp_path / "queue.db")
+        service = TaskService(TaskStore(), EventHub())
+        executor = service.task_executor
+        started = asyncio.Event()
+
+        async def execute(task_id, task_request):
+            await executor._add_step(
+                task_id, "Execution", StepStatus.RUNNING, "Executing task"
+            )
+            started.set()
+            await asyncio.sleep(10)
+            return {"output": "late", "metadata": {}}
+
+        executor.execute = execute
+        worker = LeasedTaskScheduler(
+            service.execute_task,
+            SQLiteWorkQueue(path),
+            max_workers=1,
+            run_workers=True,
+            visibility_timeout=0.15,
+            poll_interval=0.01,
+        )
+        api = LeasedTaskScheduler(None, SQLiteWorkQueue(path), run_workers=False)
+        worker.start()
+        await service.task_store.create_task("t1", None)
+        await api.submit("t1", TaskRequest(prompt="a"))
+        await asyncio.wait_for(started.wait(), 2)
+        # What the API node does on cancel, sharing the store with the worker
+        assert await api.cancel("t1")
+        await service.task_store.update_task_status("t1", TaskStatus.CANCELLED)
+        for _ in range(100):
+            if worker.get_metrics()["lost_leases"]:
+                break
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        task = await service.get_task_status("t1")
+        await worker.stop()
+        await api.stop()
+        await service.close()
+        return task, executor.step_starts
+
+    task, step_starts = asyncio.run(scenario())
+    assert task.status == TaskStatus.CANCELLED
+    assert task.output is None
+    assert step_starts == {}
+
+
+def test_task_is_abandoned_after_max_attempts(tmp_path):
+    """A task whose leases keep expiring is failed instead of run again"""
+
+    async def scenario():
+        path = str(tmp_path / "queue.db")
+        queue = SQLiteWorkQueue(path)
+        await queue.enqueue([("crashy", TaskRequest(prompt="a"), 5)])
+        # Two workers died holding the task
+        for _ in range(2):
+            await queue.lease("dead", 0.01)
+            await asyncio.sleep(0.02)
+        await queue.close()
+
+        abandoned = []
+
+        async def runner(task_id, task_request):
+            raise AssertionError("should not run")
+
+        async def on_exhausted(task_id, attempts):
+            abandoned.append((task_id, attempts))
+
+        worker = LeasedTaskScheduler(
+            runner,
+            SQLiteWorkQueue(path),
+            on_exhausted=on_exhausted,
+            max_workers=1,
+            run_workers=True,
+            poll_interval=0.01,
+            max_attempts=2,
+        )
+        worker.start()
+        for _ in range(100):
+            if abandoned:
+                break
+            await asyncio.sleep(0.01)
+        await worker.stop()
+        return abandoned
+
+    assert asyncio.run(scenario()) == [("crashy", 2)]
+
+
+def test_resume_leaves_queued_tasks_pending(tmp_path, monkeypatch):
+    """A restarting node neither double counts queued tasks nor fails them"""
+    monkeypatch.setattr(settings, "TASK_STORE_BACKEND", "sql")
+    monkeypatch.setattr(settings, "TASK_QUEUE_BACKEND", "sqlite")
+    monkeypatch.setattr(settings, "TASK_QUEUE_DB_PATH", str(tmp_path / "queue.db"))
+    monkeypatch.setattr(settings, "TASK_QUEUE_MAX_SIZE", 2)
+    monkeypatch.setattr(settings, "TASK_QUEUE_RUN_WORKERS", False)
+    url = f"sqlite:///{tmp_path / 'tasks.db'}"
+
+    async def scenario():
+        stores = [SQLTaskStore(url), SQLTaskStore(url)]
+        for store in stores:
+            await store.start()
+        first = TaskService(stores[0], EventHub())
+        await first.submit_task("a", TaskRequest(prompt="a"))
+        await first.submit_task("b", TaskRequest(prompt="b"))
+        # Created by a node that stopped before queueing it
+        await stores[0].create_task("c", TaskRequest(prompt="c"))
+
+        second = TaskService(stores[1], EventHub())
+        resumed = await second.resume_tasks()
+        statuses = [(await stores[1].get_task(task_id)).status for task_id in "abc"]
+        depth = await second.scheduler.queue.count()
+        for service in (first, second):
+            await service.close()
+            await service.task_store.close()
+        return resumed, statuses, depth
+
+    resumed, statuses, depth = asyncio.run(scenario())
+    assert resumed == 0
+    assert statuses == [TaskStatus.PENDING] * 3
+    assert depth == 2